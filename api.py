@@ -1,22 +1,42 @@
-from fastapi import FastAPI, BackgroundTasks
+from fastapi import FastAPI, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse, FileResponse
 from fastapi.staticfiles import StaticFiles
+from pydantic import BaseModel
 
-import os
+from contextlib import asynccontextmanager
 from datetime import datetime
 from pathlib import Path
+from typing import List, Optional
 import logging
 
-from util.trigger_process import trigger_process, get_mmut_dir, is_valid_uuid, read_info_json
+from util.trigger_process import get_mmut_dir, is_valid_uuid
+from util.mmut_index import get_mmut_index
+from util.docker_clients import ping_docker
+from util.run_manager import get_run_manager, RunQueueFull
+from util.metrics import get_metrics, CONTENT_TYPE_LATEST
+from util.helper import get_config
+from util.warmup import start_warm_up
+from util.validation import get_validation_cache
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Prefect, rdflib & Co. erst nach dem Start im Hintergrund laden
+    if get_config("api").get("warmup", True):
+        start_warm_up()
+    yield
+
+
 app = FastAPI(
     title="MMUT Transformation API",
     description="API to trigger Docker-based transformation flows",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Mount static files
@@ -40,41 +60,83 @@ async def api_info():
             "api_info": "GET /api/info",
             "trigger_flow_by_id": "GET /trigger-flow/{mmut_id}",
             "trigger_flow_default": "GET /trigger-flow",
+            "trigger_flows": "POST /trigger-flows",
             "list_mmut_dags": "GET /list-mmut-dags",
+            "validate": "GET /validate/{mmut_id}",
+            "run_status": "GET /runs/{run_id}",
+            "metrics": "GET /metrics",
             "health": "GET /health"
         }
     }
 
 
 @app.get("/list-mmut-dags")
-async def list_mmut_dags():
-    """List all available mmut dags"""
+async def list_mmut_dags(request: Request, name: Optional[str] = None,
+                         offset: int = Query(0, ge=0), limit: Optional[int] = Query(None, ge=1)):
+    """List all available mmut dags, optionally filtered by name and paginated"""
 
-    dags = []
-    for f in os.listdir(get_mmut_dir()):
-        id = str(f)
-        if is_valid_uuid(id):
+    index = get_mmut_index()
+    await run_in_threadpool(index.refresh)
 
-            info = read_info_json(id)
+    etag = f'W/"{index.etag}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+
+    dags, total = index.list(name=name, offset=offset, limit=limit)
+    return JSONResponse(
+        headers={"ETag": etag},
+        content={
+            "dags": dags,
+            "total": total,
+            "offset": offset,
+            "limit": limit
+        }
+    )
+
+@app.get("/validate/{mmut_id}")
+async def validate_mmut(mmut_id: str):
+    """Check a process model without compiling it, all violations at once"""
+    if not is_valid_uuid(mmut_id):
+        return JSONResponse(
+            status_code=400,
+            content={
+                "message": f"Invalid MMUT ID format for {mmut_id}",
+                "status": "error"
+            }
+        )
+    mmut_path = Path(get_mmut_dir()) / mmut_id
+    if not mmut_path.is_dir():
+        return JSONResponse(
+            status_code=404,
+            content={
+                "message": f"MMUT {mmut_id} not found",
+                "status": "error"
+            }
+        )
+
+    result = await run_in_threadpool(get_validation_cache().validate, str(mmut_path))
+    return {"mmut_id": mmut_id, **result}
 
-            dags.append({
-                "id": id,
-                "info": info
-            })
-  
-    return {
-        "dags": dags
-    }
 
 @app.get("/trigger-flow/{mmut_id}")
-async def trigger_flow_by_id(mmut_id: str, background_tasks: BackgroundTasks):
+async def trigger_flow_by_id(mmut_id: str, target: Optional[List[str]] = Query(None), reuse_outputs: bool = False):
 
     """
-    Trigger the transformation process for a specific MMUT ID
+    Trigger the transformation process for a specific MMUT ID,
+    optionally only for the given target processes and their ancestors
     """
-    
+
     try:
-        trigger_process(mmut_id)
+        run = await get_run_manager().submit(mmut_id, targets=target, reuse_outputs=reuse_outputs)
+    except RunQueueFull as e:
+        return JSONResponse(
+            status_code=429,
+            headers={"Retry-After": "10"},
+            content={
+                "message": str(e),
+                "status": "rejected"
+            }
+        )
     except ValueError as e:
         return JSONResponse(
             status_code=500,
@@ -89,11 +151,60 @@ async def trigger_flow_by_id(mmut_id: str, background_tasks: BackgroundTasks):
         content={
             "message": f"Flow for MMUT {mmut_id} triggered successfully",
             "mmut_id": mmut_id,
+            "targets": run.targets,
+            "steps": run.steps,
+            "run_id": run.run_id,
             "status": "started"
         }
     )
 
 
+class TriggerFlowsRequest(BaseModel):
+    mmut_ids: List[str]
+
+
+@app.post("/trigger-flows")
+async def trigger_flows(request: TriggerFlowsRequest):
+    """
+    Trigger the transformation processes for many MMUT IDs at once
+    """
+
+    try:
+        runs = await run_in_threadpool(get_run_manager().submit_batch, request.mmut_ids)
+    except RunQueueFull as e:
+        return JSONResponse(
+            status_code=429,
+            headers={"Retry-After": "10"},
+            content={
+                "message": str(e),
+                "status": "rejected"
+            }
+        )
+
+    return JSONResponse(
+        status_code=202,
+        content={
+            "message": f"{len(runs)} flows triggered",
+            "runs": runs
+        }
+    )
+
+
+@app.get("/runs/{run_id}")
+async def get_run_status(run_id: str):
+    """Status of a run started via /trigger-flow"""
+    run = get_run_manager().get(run_id)
+    if run is None:
+        return JSONResponse(
+            status_code=404,
+            content={
+                "message": f"Run {run_id} not found",
+                "status": "error"
+            }
+        )
+    return run.to_dict()
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -105,6 +216,8 @@ async def health_check():
         "mmut_dir": Path(get_mmut_dir()).exists(),
         "docker_socket": Path("/var/run/docker.sock").exists(),
     }
+    # blockierender Aufruf, nicht im Event-Loop
+    checks["docker_ping"] = checks["docker_socket"] and await run_in_threadpool(ping_docker)
     status = "UP" if all(checks.values()) else "DEGRADED"
 
     return {
@@ -113,6 +226,13 @@ async def health_check():
         "checks": checks,
     }
 
+
+@app.get("/metrics")
+async def metrics():
+    """Phase timings and counters in the Prometheus text format"""
+    return Response(content=get_metrics().render(), media_type=CONTENT_TYPE_LATEST)
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
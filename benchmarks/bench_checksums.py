@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""Compare the throughput of the shared_checksums hash algorithms.
+
+Hashes one file of random bytes with every algorithm of
+util/checksums.py (the same code path as a report, mmap and
+8 MiB chunks) and prints MB/s, the best of --repeat runs.
+
+Run from the project root:
+
+    python benchmarks/bench_checksums.py --size-mb 512
+"""
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from bench_pipeline import _ensure_project_root_on_path
+
+
+def main() -> int:
+    _ensure_project_root_on_path()
+    from util.checksums import ALGORITHMS, hash_file
+
+    parser = argparse.ArgumentParser(description="Benchmark the shared_checksums hash algorithms.")
+    parser.add_argument("--size-mb", type=int, default=256, help="Size of the hashed file in MB")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per algorithm, the best one counts")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = Path(tmp) / "data.bin"
+        with open(file_path, "wb") as f:
+            for _ in range(args.size_mb):
+                f.write(os.urandom(1024 * 1024))
+
+        baseline = None
+        for algorithm in ALGORITHMS:
+            seconds = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                hash_file(file_path, algorithm)
+                seconds.append(time.perf_counter() - start)
+            rate = args.size_mb * 1024 * 1024 / min(seconds) / 1e6
+            baseline = baseline or rate
+            print(f"{algorithm:<8} {rate:8.0f} MB/s  {rate / baseline:5.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""Count Docker API connections per run: one client per task vs. the shared client.
+
+Starts a fake Docker daemon (HTTP/1.1 with keep-alive) on localhost and
+runs the API calls a docker task makes (create, start, logs, wait,
+remove) from a thread pool, like Prefect's task runner does:
+
+    python benchmarks/bench_docker_clients.py --tasks 50 --workers 8
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest.mock import patch
+
+
+def _ensure_project_root_on_path():
+    project_root = Path(__file__).resolve().parent.parent
+    if str(project_root) not in sys.path:
+        sys.path.insert(0, str(project_root))
+
+
+class FakeDaemon(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), FakeDaemonHandler)
+        self.connections = 0
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    def process_request(self, request, client_address):
+        with self.lock:
+            self.connections += 1
+        super().process_request(request, client_address)
+
+
+class FakeDaemonHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, body):
+        data = body if isinstance(body, bytes) else json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _handle(self):
+        with self.server.lock:
+            self.server.requests += 1
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        path = self.path.split("?")[0]
+        if path.endswith("/version"):
+            return self._reply(200, {"ApiVersion": "1.41", "Version": "fake"})
+        if path.endswith("/_ping"):
+            return self._reply(200, b"OK")
+        if path.endswith("/containers/create"):
+            return self._reply(201, {"Id": "c0ffee", "Warnings": []})
+        if path.endswith("/start"):
+            return self._reply(204, b"")
+        if path.endswith("/wait"):
+            return self._reply(200, {"StatusCode": 0})
+        if path.endswith("/logs"):
+            return self._reply(200, b"")
+        if path.endswith("/json"):
+            return self._reply(200, {"Id": "c0ffee", "Config": {"Tty": True},
+                                     "State": {"Status": "exited", "ExitCode": 0}})
+        if self.command == "DELETE":
+            return self._reply(204, b"")
+        return self._reply(404, {"message": "not found"})
+
+    do_GET = do_POST = do_DELETE = _handle
+
+
+def _task(get_client):
+    client = get_client()
+    container = client.containers.create("img", command=["echo"])
+    container.start()
+    container.wait()
+    container.logs()
+    container.remove(force=True)
+
+
+def _run(label, get_client, tasks, workers):
+    daemon = FakeDaemon()
+    thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+    thread.start()
+    base_url = f"tcp://127.0.0.1:{daemon.server_address[1]}"
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(lambda _: _task(lambda: get_client(base_url)), range(tasks)))
+    elapsed = time.perf_counter() - start
+    daemon.shutdown()
+    daemon.server_close()
+    print(f"{label:<24} connections {daemon.connections:5d}   requests {daemon.requests:5d}   {elapsed * 1000:8.1f} ms")
+
+
+def main() -> int:
+    _ensure_project_root_on_path()
+    from docker import DockerClient
+    from util import docker_clients
+
+    parser = argparse.ArgumentParser(description="Benchmark Docker client reuse.")
+    parser.add_argument("--tasks", type=int, default=50, help="Number of simulated docker tasks")
+    parser.add_argument("--workers", type=int, default=8, help="Task runner threads")
+    args = parser.parse_args()
+
+    print(f"{args.tasks} tasks, {args.workers} threads")
+    _run("new client per task", lambda base_url: DockerClient(base_url=base_url), args.tasks, args.workers)
+    with patch("util.docker_clients.get_config", return_value={}):
+        _run("shared client", docker_clients.get_docker_client, args.tasks, args.workers)
+    docker_clients.close_docker_clients()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""Compare the per-step dispatch overhead of the executor backends.
+
+Every step runs against a fake Docker client whose containers exit
+immediately, so the measured time is the orchestration overhead: the
+Prefect backend runs docker_flow on a temporary Prefect server (task
+states, futures, task runner), the native backend runs the same steps
+on its thread pool. Shapes are a chain (every step waits for the one
+before) and a fan (all steps ready at once).
+
+Run from the project root:
+
+    python benchmarks/bench_executors.py --steps 50,200
+"""
+import argparse
+import json
+import logging
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from bench_pipeline import _ensure_project_root_on_path, _git_commit
+
+LAYOUT = {"volumes": {"models": "/bench/models"}, "run_dirs": {"models": "/bench/models"}}
+
+
+def _processes(shape: str, steps: int):
+    from util.process_pipeline_builder import Process
+    processes = []
+    for i in range(steps):
+        deps = [f"s{i - 1}"] if shape == "chain" and i else None
+        processes.append(Process(f"s{i}", f"s{i}", "img", ["true"], {}, deps))
+    return processes
+
+
+def run_case(backend: str, shape: str, steps: int) -> dict:
+    from fake_docker import FakeDockerClient, patched_docker
+    from util.executors import EXECUTORS
+
+    executor = EXECUTORS[backend]({})
+    processes = _processes(shape, steps)
+    client = FakeDockerClient(images={"img": "sha256:bench"})
+    with patched_docker(client, layout=LAYOUT):
+        start = time.perf_counter()
+        executor.run(processes, "bench")
+        seconds = time.perf_counter() - start
+    assert len(client.started) == steps
+    return {"backend": backend, "shape": shape, "steps": steps,
+            "total_ms": seconds * 1000.0, "per_step_ms": seconds * 1000.0 / steps}
+
+
+def main() -> int:
+    _ensure_project_root_on_path()
+    from prefect.testing.utilities import prefect_test_harness
+
+    parser = argparse.ArgumentParser(description="Benchmark the executor backends.")
+    parser.add_argument("--steps", default="50,200", help="Comma-separated step counts")
+    parser.add_argument("--backends", default="native,prefect", help="Comma-separated backends")
+    parser.add_argument("--output", help="JSON result file (default: benchmarks/results/executors-<commit>.json)")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    results = []
+    # temporärer Prefect-Server für die Dauer des Benchmarks
+    with prefect_test_harness():
+        for backend in args.backends.split(","):
+            run_case(backend, "fan", 5)  # Warm-up
+            for steps in [int(s) for s in args.steps.split(",")]:
+                for shape in ("chain", "fan"):
+                    result = run_case(backend, shape, steps)
+                    print(f"{backend:<8} {shape:<6} {steps:>5} steps  {result['total_ms']:9.1f} ms  "
+                          f"{result['per_step_ms']:7.2f} ms/step")
+                    results.append(result)
+
+    commit = _git_commit()
+    output = Path(args.output) if args.output else \
+        Path(__file__).resolve().parent / "results" / f"executors-{commit}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({
+            "commit": commit,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "results": results,
+        }, f, indent=2)
+    print(f"Results written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""Measure pipeline compilation and dispatch on synthetic process models.
+
+For every shape (chain, fan, diamond) and size the benchmark generates
+an MMUT directory and measures:
+
+- parse:    Turtle files into a graph with the base ontology
+- build:    ProcessPipelineBuilder (graph of models and transformations)
+- toposort: topological sort of that graph
+- extract:  get_processes() (includes the sort), also per node
+- dispatch: every step through the ready queue and docker_task's body
+            against a fake Docker client (no Prefect server, no containers)
+
+Results are written as JSON so runs of different commits can be compared.
+Run from the project root:
+
+    python benchmarks/bench_pipeline.py --sizes 1000,10000
+    python benchmarks/bench_pipeline.py --compare benchmarks/results/pipeline-<old>.json
+"""
+import argparse
+import json
+import logging
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+METRICS = ("parse_ms", "build_ms", "toposort_ms", "extract_ms", "dispatch_ms")
+
+
+def _ensure_project_root_on_path():
+    project_root = Path(__file__).resolve().parent.parent
+    for path in (project_root, project_root / "tests"):
+        if str(path) not in sys.path:
+            sys.path.insert(0, str(path))
+
+
+def _time_ms(fn):
+    start = time.perf_counter()
+    result = fn()
+    return (time.perf_counter() - start) * 1000.0, result
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _dispatch(processes) -> None:
+    """Run all steps sequentially through the scheduler and docker_task's body."""
+    from fake_docker import FakeDockerClient, patched_docker
+    from util.docker_task import docker_task
+    from util.helper import to_valid_container_name
+    from util.scheduler import ReadyQueueScheduler
+
+    client = FakeDockerClient(images={"simple-mut": "sha256:bench"})
+    scheduler = ReadyQueueScheduler(processes, max_concurrency=1)
+    with patched_docker(client, flow_run_name="bench"):
+        while not scheduler.finished():
+            for process in scheduler.dispatchable():
+                docker_task.fn({
+                    "name": to_valid_container_name(process.name),
+                    "image": process.image,
+                    "image_digest": "sha256:bench",
+                    "command": process.command,
+                    "env": process.env,
+                    "resources": process.resources,
+                    "upstream": {},
+                    "volumes": {"models": "/bench/models"},
+                    "run_dirs": {"models": "/bench/models"},
+                })
+                scheduler.complete(process.id)
+
+
+def run_case(shape: str, size: int, repeat: int, dispatch: bool) -> dict:
+    import networkx as nx
+    from benchmarks.synthetic_mmut import write_mmut
+    from util import processes as processes_module
+    from util.process_pipeline_builder import ProcessPipelineBuilder
+
+    with tempfile.TemporaryDirectory() as tmp:
+        mmut_path, nodes, edges = write_mmut(Path(tmp), shape, size)
+        ttl_files = sorted(mmut_path.glob("*.ttl"))
+
+        def parse():
+            g = processes_module.new_mmut_graph()
+            for ttl in ttl_files:
+                g.parse(ttl, format="turtle")
+            return g
+
+        timings = {metric: [] for metric in METRICS}
+        for _ in range(repeat):
+            parse_ms, g = _time_ms(parse)
+            build_ms, builder = _time_ms(lambda: ProcessPipelineBuilder(g))
+            toposort_ms, _ = _time_ms(lambda: list(nx.topological_sort(builder.G)))
+            extract_ms, processes = _time_ms(builder.get_processes)
+            dispatch_ms = _time_ms(lambda: _dispatch(processes))[0] if dispatch else None
+            for metric, value in zip(METRICS, (parse_ms, build_ms, toposort_ms, extract_ms, dispatch_ms)):
+                timings[metric].append(value)
+
+    result = {"shape": shape, "size": size, "nodes": nodes, "edges": edges, "repeat": repeat}
+    for metric, values in timings.items():
+        result[metric] = statistics.median(values) if values[0] is not None else None
+    result["extract_per_node_us"] = result["extract_ms"] * 1000.0 / nodes
+    if result["dispatch_ms"] is not None:
+        result["dispatch_per_step_us"] = result["dispatch_ms"] * 1000.0 / nodes
+    return result
+
+
+def _print_result(result: dict, baseline: dict = None):
+    line = f"{result['shape']:<8} {result['nodes']:>6} nodes"
+    for metric in METRICS:
+        value = result.get(metric)
+        if value is None:
+            continue
+        line += f"  {metric[:-3]} {value:9.1f} ms"
+        if baseline and baseline.get(metric):
+            line += f" ({value / baseline[metric]:4.2f}x)"
+    print(line)
+
+
+def main() -> int:
+    _ensure_project_root_on_path()
+    from benchmarks.synthetic_mmut import SHAPES
+
+    parser = argparse.ArgumentParser(description="Benchmark pipeline compilation and dispatch.")
+    parser.add_argument("--shapes", default=",".join(SHAPES), help="Comma-separated shapes")
+    parser.add_argument("--sizes", default="1000,10000", help="Comma-separated approximate node counts")
+    parser.add_argument("--repeat", type=int, default=3, help="Measured runs per case (median is reported)")
+    parser.add_argument("--no-dispatch", action="store_true", help="Skip the dispatch measurement")
+    parser.add_argument("--output", help="JSON result file (default: benchmarks/results/pipeline-<commit>.json)")
+    parser.add_argument("--compare", help="Earlier JSON result file to compare against")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare, "r") as f:
+            for result in json.load(f)["results"]:
+                baseline[(result["shape"], result["size"])] = result
+
+    # Warm-up (imports, base ontology, Prefect task machinery)
+    run_case("chain", 10, 1, dispatch=not args.no_dispatch)
+
+    commit = _git_commit()
+    results = []
+    for size in [int(s) for s in args.sizes.split(",")]:
+        for shape in args.shapes.split(","):
+            result = run_case(shape, size, args.repeat, dispatch=not args.no_dispatch)
+            _print_result(result, baseline.get((shape, size)))
+            results.append(result)
+
+    output = Path(args.output) if args.output else \
+        Path(__file__).resolve().parent / "results" / f"pipeline-{commit}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({
+            "commit": commit,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "results": results,
+        }, f, indent=2)
+    print(f"Results written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
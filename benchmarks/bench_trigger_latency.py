@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Compare trigger compile latency with and without the cached base ontology.
+
+Run from the project root:
+
+    python benchmarks/bench_trigger_latency.py --repeat 50
+"""
+import argparse
+import logging
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+
+def _ensure_project_root_on_path():
+    project_root = Path(__file__).resolve().parent.parent
+    if str(project_root) not in sys.path:
+        sys.path.insert(0, str(project_root))
+
+
+def _time_ms(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000.0
+
+
+def _measure(fn_before, fn_after, repeat: int):
+    # Abwechselnd messen, damit Rauschen beide Varianten gleich trifft
+    before, after = [], []
+    for _ in range(repeat):
+        before.append(_time_ms(fn_before))
+        after.append(_time_ms(fn_after))
+    return before, after
+
+
+def _report(label: str, timings):
+    print(f"{label:<28} median {statistics.median(timings):8.2f} ms   "
+          f"min {min(timings):8.2f} ms   max {max(timings):8.2f} ms")
+
+
+def main() -> int:
+    _ensure_project_root_on_path()
+    from util import processes
+    from util.process_pipeline_builder import ProcessPipelineBuilder
+
+    default_mmut = Path(__file__).resolve().parent.parent / "tests" / "data" / "mmut" / "8014cf0a-8d29-4cdb-9563-6b0e9fcf4b8f"
+
+    parser = argparse.ArgumentParser(description="Benchmark get_processes latency.")
+    parser.add_argument("--mmut-path", default=str(default_mmut), help="MMUT directory with .ttl files")
+    parser.add_argument("--repeat", type=int, default=30, help="Number of measured runs per variant")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    def uncached():
+        # Verhalten vor dem Cache: Ontologie bei jedem Trigger neu parsen
+        g = processes.parse_base_ontology()
+        for file in os.listdir(args.mmut_path):
+            if file.endswith('.ttl'):
+                g.parse(os.path.join(args.mmut_path, file), format="turtle")
+        return ProcessPipelineBuilder(g).get_processes()
+
+    def cached():
+        return processes.compile_processes(args.mmut_path)
+
+    # Warm-up (imports, first parse of the base ontology)
+    uncached()
+    cached()
+
+    print(f"MMUT: {args.mmut_path} ({args.repeat} runs)")
+    print("base ontology graph:")
+    prepare_before, prepare_after = _measure(processes.parse_base_ontology, processes.new_mmut_graph, args.repeat)
+    _report("  before (parse mmut.ttl)", prepare_before)
+    _report("  after (cached ontology)", prepare_after)
+
+    print("trigger compile (get_processes):")
+    before, after = _measure(uncached, cached, args.repeat)
+    _report("  before (parse mmut.ttl)", before)
+    _report("  after (cached ontology)", after)
+    print(f"saved per trigger (median): {statistics.median(before) - statistics.median(after):.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
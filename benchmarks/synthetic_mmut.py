@@ -0,0 +1,123 @@
+"""Generate synthetic MMUT process models (Turtle) for benchmarks.
+
+Shapes, each sized by the approximate number of process nodes (micro
+models plus transformations):
+
+- chain:   M0 -> T0 -> M1 -> T1 -> ... (one long critical path)
+- fan:     one source model, a wide layer of transformations and models,
+           one transformation joining all of them into a sink model
+- diamond: fan-out/fan-in stages of width `width` repeated in sequence
+"""
+from pathlib import Path
+from typing import List, Tuple
+
+SHAPES = ("chain", "fan", "diamond")
+
+_PREFIXES = """@prefix MMUT: <http://frittenburger.de/ontology/mmut#> .
+@prefix rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#> .
+@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+@prefix s: <http://hpi.de/synthetic#> .
+
+"""
+
+
+class _Writer:
+    def __init__(self):
+        self.parts = [_PREFIXES]
+        self.nodes = 0
+        self.edges = 0
+
+    def _task(self, name: str, kind: str):
+        self.parts.append(
+            f"s:Task-{name} a MMUT:TaskDefinition ; rdfs:label \"{kind} {name}\" ;\n"
+            f"    MMUT:hasContainerProperties s:CP-{name} .\n"
+            f"s:CP-{name} a MMUT:ContainerProperties ; MMUT:image \"simple-mut\" ;\n"
+            f"    MMUT:hasCommandSequence [ a rdf:Seq ; rdf:_1 \"echo\" ; rdf:_2 \"{kind} {name}\" ] ;\n"
+            f"    MMUT:hasEnvironment s:Env-{name} .\n"
+            f"s:Env-{name} a MMUT:Environment ; MMUT:hasKeyValuePair s:KV-{name} .\n"
+            f"s:KV-{name} a MMUT:KeyValuePair ; MMUT:key \"OUT\" ;\n"
+            f"    MMUT:value \"{{{{resolve:system:modelpath}}}}{name}.ttl\" .\n\n")
+
+    def model(self, name: str, input_of: List[str] = ()) -> str:
+        self.nodes += 1
+        self.edges += len(input_of)
+        refs = "".join(f" ;\n    MMUT:isInputModelOf s:T-{t}" for t in input_of)
+        self.parts.append(f"s:M-{name} a MMUT:RDFMicroModel ; MMUT:hasTaskDefinition s:Task-M-{name}{refs} .\n")
+        self._task(f"M-{name}", "load")
+        return name
+
+    def transformation(self, name: str, outputs: List[str]) -> str:
+        self.nodes += 1
+        self.edges += len(outputs)
+        refs = "".join(f" ;\n    MMUT:hasOutputModel s:M-{m}" for m in outputs)
+        self.parts.append(f"s:T-{name} a MMUT:PythonScriptTransformation ; MMUT:hasTaskDefinition s:Task-T-{name}{refs} .\n")
+        self._task(f"T-{name}", "transform")
+        return name
+
+    def text(self) -> str:
+        return "".join(self.parts)
+
+
+def _chain(w: _Writer, nodes: int):
+    steps = max(1, (nodes - 1) // 2)
+    for i in range(steps):
+        w.transformation(str(i), [str(i + 1)])
+        w.model(str(i), [str(i)])
+    w.model(str(steps))
+
+
+def _stage(w: _Writer, prefix: str, source: str, width: int) -> str:
+    """Fan out from model `source` over width branches and join into a new model."""
+    join = f"{prefix}-join"
+    branches = []
+    for i in range(width):
+        branch = f"{prefix}-{i}"
+        w.transformation(branch, [branch])
+        w.model(branch, [join])
+        branches.append(branch)
+    w.transformation(join, [join])
+    w.parts.append(f"s:M-{source} MMUT:isInputModelOf "
+                   + ", ".join(f"s:T-{b}" for b in branches) + " .\n")
+    w.edges += width
+    return join
+
+
+def _fan(w: _Writer, nodes: int):
+    width = max(1, (nodes - 3) // 2)
+    sink = _stage(w, "fan", "source", width)
+    w.model("source")
+    w.model(sink)
+
+
+def _diamond(w: _Writer, nodes: int, width: int = 4):
+    stages = max(1, (nodes - 1) // (2 * width + 2))
+    source = "source"
+    w.model(source)
+    for stage in range(stages):
+        join = _stage(w, f"d{stage}", source, width)
+        if stage < stages - 1:
+            w.model(join)
+        source = join
+    w.model(source)
+
+
+def generate(shape: str, nodes: int) -> Tuple[str, int, int]:
+    """Turtle text of a synthetic process model and its node and edge count."""
+    w = _Writer()
+    if shape == "chain":
+        _chain(w, nodes)
+    elif shape == "fan":
+        _fan(w, nodes)
+    elif shape == "diamond":
+        _diamond(w, nodes)
+    else:
+        raise ValueError(f"Unknown shape: {shape} (expected one of {SHAPES})")
+    return w.text(), w.nodes, w.edges
+
+
+def write_mmut(directory: Path, shape: str, nodes: int) -> Tuple[Path, int, int]:
+    """Write a synthetic MMUT directory (one .ttl file), returns (path, nodes, edges)."""
+    text, node_count, edge_count = generate(shape, nodes)
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / f"synthetic-{shape}.ttl").write_text(text, encoding="utf-8")
+    return directory, node_count, edge_count
@@ -10,15 +10,55 @@ def _ensure_project_root_on_path():
         sys.path.insert(0, str(project_root))
 
 
+def run_batch(uuids) -> int:
+    """Compile all MMUTs in parallel and run them with the limits of config/runs.yaml."""
+    from util.helper import get_config
+    from util.run_manager import RunManager, RunQueueFull
+
+    config = get_config("runs")
+    # eigener Manager nur für diesen Batch: alle IDs dürfen warten
+    manager = RunManager(max_running=config.get("max_running", 4),
+                         max_queued=len(uuids),
+                         max_batch=len(uuids),
+                         batch_compile_processes=config.get("batch_compile_processes"))
+    try:
+        runs = manager.submit_batch(uuids)
+    except RunQueueFull as e:
+        print(f"Batch rejected: {e}", file=sys.stderr)
+        return 2
+    finally:
+        # Wartet, bis alle Läufe beendet sind
+        manager.shutdown(wait=True)
+
+    failed = 0
+    for run in runs:
+        record = manager.get(run["run_id"])
+        print(f"{record.mmut_id}  {record.status}" + (f"  {record.error}" if record.error else ""))
+        failed += record.status != "completed"
+    return 1 if failed else 0
+
+
 def main() -> int:
     _ensure_project_root_on_path()
     from util.trigger_process import trigger_process
 
-    parser = argparse.ArgumentParser(description="Run docker flow for a given UUID.")
-    parser.add_argument("uuid", type=str, help="UUID for the transformation run")
+    parser = argparse.ArgumentParser(description="Run docker flow for one or more UUIDs.")
+    parser.add_argument("uuid", type=str, nargs="+", help="UUID(s) for the transformation run")
+    parser.add_argument("--target", action="append", metavar="IRI",
+                        help="Only run this process and the steps it depends on (repeatable, single UUID only)")
+    parser.add_argument("--reuse-outputs", action="store_true",
+                        help="With --target: do not rerun ancestors whose outputs are in the step cache")
     args = parser.parse_args()
 
-    thread = trigger_process(args.uuid)
+    if args.target and len(args.uuid) > 1:
+        parser.error("--target needs exactly one UUID")
+    if args.reuse_outputs and not args.target:
+        parser.error("--reuse-outputs needs --target")
+
+    if len(args.uuid) > 1:
+        return run_batch(args.uuid)
+
+    thread = trigger_process(args.uuid[0], targets=args.target, reuse_outputs=args.reuse_outputs)
     thread.join()
     return 0
 
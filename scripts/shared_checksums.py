@@ -1,15 +1,55 @@
 #!/usr/bin/env python3
 import argparse
-import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 
-def sha256_file(file_path: Path) -> str:
-    digest = hashlib.sha256()
-    with file_path.open("rb") as handle:
-        for chunk in iter(lambda: handle.read(1024 * 1024), b""):
-            digest.update(chunk)
-    return digest.hexdigest()
+def _ensure_project_root_on_path():
+    project_root = Path(__file__).resolve().parent.parent
+    if str(project_root) not in sys.path:
+        sys.path.insert(0, str(project_root))
+
+
+_ensure_project_root_on_path()
+from util.checksums import ALGORITHMS, hash_file, sha256_file  # noqa: E402,F401
+
+MANIFEST_NAME = ".shared_checksums_manifest.json"
+
+
+class Manifest:
+    """Persistent file hashes keyed by (path, size, mtime_ns, inode)."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.entries = {}
+        self.seen = {}
+        if path.exists():
+            try:
+                self.entries = json.loads(path.read_text()).get("files", {})
+            except ValueError:
+                self.entries = {}
+
+    @staticmethod
+    def _signature(stat, algorithm: str):
+        return [stat.st_size, stat.st_mtime_ns, stat.st_ino, algorithm]
+
+    def lookup(self, file_path: Path, stat, algorithm: str):
+        entry = self.entries.get(str(file_path))
+        if entry is not None and entry[:4] == self._signature(stat, algorithm):
+            return entry[4]
+        return None
+
+    def record(self, file_path: Path, stat, algorithm: str, file_hash: str):
+        self.seen[str(file_path)] = self._signature(stat, algorithm) + [file_hash]
+
+    def save(self):
+        # nur Dateien behalten, die in diesem Lauf noch existierten
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        tmp_path.write_text(json.dumps({"version": 1, "files": self.seen}))
+        os.replace(tmp_path, self.path)
 
 
 def resolve_shared_path(cli_path: str | None) -> Path:
@@ -27,15 +67,29 @@ def resolve_shared_path(cli_path: str | None) -> Path:
     return Path("shared")
 
 
-def directory_report(directory: Path):
+def directory_report(directory: Path, algorithm: str = "sha256", jobs: int | None = None,
+                     manifest: Manifest | None = None):
     files = sorted([p for p in directory.rglob("*") if p.is_file()])
+
+    def checksum(file_path: Path):
+        if manifest is None:
+            return hash_file(file_path, algorithm)
+        stat = file_path.stat()
+        file_hash = manifest.lookup(file_path.resolve(), stat, algorithm)
+        if file_hash is None:
+            file_hash = hash_file(file_path, algorithm)
+        manifest.record(file_path.resolve(), stat, algorithm, file_hash)
+        return file_hash
+
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as pool:
+        file_hashes = list(pool.map(checksum, files))
+
     file_entries = []
-    for file_path in files:
+    for file_path, file_hash in zip(files, file_hashes):
         rel_path = file_path.relative_to(directory).as_posix()
-        file_hash = sha256_file(file_path)
         file_entries.append((rel_path, file_hash))
 
-    aggregate = hashlib.sha256()
+    aggregate = ALGORITHMS[algorithm]()
     for rel_path, file_hash in file_entries:
         aggregate.update(f"{rel_path}\t{file_hash}\n".encode("utf-8"))
 
@@ -44,12 +98,33 @@ def directory_report(directory: Path):
 
 def main() -> int:
     parser = argparse.ArgumentParser(
-        description="Compute SHA256 checksums for files in each folder under shared."
+        description="Compute checksums for files in each folder under shared."
     )
     parser.add_argument(
         "--shared-path",
         help="Path to the shared directory (defaults to /app/shared, /root/dev/shared, or ./shared).",
     )
+    parser.add_argument(
+        "--algorithm",
+        choices=sorted(ALGORITHMS),
+        default="sha256",
+        help="Hash algorithm; crc32 is faster and meant for change detection only (default: sha256).",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="Number of files hashed in parallel (defaults to the number of CPUs).",
+    )
+    parser.add_argument(
+        "--manifest",
+        help=f"Manifest of known file hashes (defaults to <shared-path>/{MANIFEST_NAME}).",
+    )
+    parser.add_argument(
+        "--no-manifest",
+        action="store_true",
+        help="Rehash every file and do not read or write a manifest.",
+    )
     args = parser.parse_args()
 
     shared_path = resolve_shared_path(args.shared_path)
@@ -57,6 +132,10 @@ def main() -> int:
         print(f"shared path not found: {shared_path}")
         return 1
 
+    manifest = None
+    if not args.no_manifest:
+        manifest = Manifest(Path(args.manifest) if args.manifest else shared_path / MANIFEST_NAME)
+
     subdirs = sorted([p for p in shared_path.iterdir() if p.is_dir()])
     if not subdirs:
         print(f"no folders found under {shared_path}")
@@ -64,7 +143,7 @@ def main() -> int:
 
     for folder in subdirs:
         print(f"Folder: {folder.name}")
-        file_entries, total_hash = directory_report(folder)
+        file_entries, total_hash = directory_report(folder, args.algorithm, args.jobs, manifest)
         if not file_entries:
             print("  (no files)")
         else:
@@ -73,6 +152,12 @@ def main() -> int:
         print(f"  Aggregate checksum: {total_hash}")
         print()
 
+    if manifest is not None:
+        try:
+            manifest.save()
+        except OSError as e:
+            print(f"could not write manifest {manifest.path}: {e}")
+
     return 0
 
 
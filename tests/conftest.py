@@ -14,3 +14,13 @@ def data_dir():
 
 
 
+
+
+@pytest.fixture(autouse=True)
+def pipeline_cache(tmp_path):
+    # kompilierte Pipelines nicht ins cache/pipelines des Repositorys schreiben
+    from util import processes
+    from util.pipeline_cache import PipelineCache
+    cache = PipelineCache(cache_dir=str(tmp_path / "pipelines"))
+    with mock.patch.object(processes, "_pipeline_cache", cache):
+        yield cache
@@ -0,0 +1,242 @@
+"""Minimal in-memory stand-in for docker.DockerClient used by the tests."""
+import itertools
+import logging
+import queue
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from unittest.mock import MagicMock, patch
+
+_ids = itertools.count(1)
+
+
+class FakeContainer:
+    def __init__(self, client, image, name=None, command=None, environment=None, **kwargs):
+        self.client = client
+        self.id = f"fake{next(_ids):08d}"
+        self.name = name
+        self.image = image
+        self.command = command
+        self.environment = environment
+        self.kwargs = kwargs
+        self.status = 'running'
+        self.exit_code = None
+        self.log_lines = list(client.log_lines)
+        self.removed = False
+        self._done = threading.Event()
+
+    @property
+    def attrs(self):
+        return {'State': {'Status': self.status, 'ExitCode': self.exit_code}}
+
+    def finish(self, exit_code=0):
+        self.exit_code = exit_code
+        self.status = 'exited'
+        self._done.set()
+        self.client.emit({
+            'Type': 'container', 'Action': 'die', 'id': self.id,
+            'Actor': {'ID': self.id, 'Attributes': {'exitCode': str(exit_code)}},
+        })
+
+    def reload(self):
+        self.client.api_calls += 1
+
+    def wait(self, timeout=None):
+        self.client.api_calls += 1
+        self._done.wait(timeout)
+        return {'StatusCode': self.exit_code}
+
+    def logs(self, stream=False, follow=False, **kwargs):
+        self.client.api_calls += 1
+        if not stream:
+            return b"".join(self.log_lines)
+        return self._stream_logs(follow)
+
+    def _stream_logs(self, follow):
+        if follow:
+            self._done.wait()
+        for line in self.log_lines:
+            yield line
+
+    def remove(self, force=False):
+        self.client.api_calls += 1
+        self.removed = True
+
+
+class _FakeContainers:
+    def __init__(self, client):
+        self.client = client
+
+    def run(self, image, detach=True, **kwargs):
+        container = FakeContainer(self.client, image, **kwargs)
+        self.client.started.append(container)
+        if self.client.on_run is not None:
+            self.client.on_run(container)
+        if kwargs.get('entrypoint') is not None:
+            # Keep-alive-Container (Warm-Pool) laufen, bis sie entfernt werden
+            return container
+        exit_code = self.client.exit_codes.get(kwargs.get('name'), 0)
+        timer = threading.Timer(self.client.duration, container.finish, args=(exit_code,))
+        timer.daemon = True
+        timer.start()
+        return container
+
+
+class _FakeImage:
+    def __init__(self, name, digest):
+        self.id = digest
+        self.tags = [name]
+        self.attrs = {'Config': {'Entrypoint': None}}
+
+
+class _FakeAPI:
+    """Low-level exec calls; exit codes by the joined command in exec_exit_codes."""
+
+    def __init__(self, client):
+        self.client = client
+        self.execs = {}
+
+    def exec_create(self, container, cmd, environment=None, **kwargs):
+        self.client.api_calls += 1
+        exec_id = f"exec{next(_ids):08d}"
+        self.execs[exec_id] = {'container': container, 'cmd': cmd, 'environment': environment}
+        return {'Id': exec_id}
+
+    def exec_start(self, exec_id, stream=False, **kwargs):
+        self.client.api_calls += 1
+        time.sleep(self.client.duration)
+        return iter(self.client.log_lines)
+
+    def exec_inspect(self, exec_id):
+        self.client.api_calls += 1
+        cmd = " ".join(self.execs[exec_id]['cmd'])
+        return {'ExitCode': self.client.exec_exit_codes.get(cmd, 0)}
+
+
+class _FakeImages:
+    """Local images as a dict name -> digest, pullable ones in registry."""
+
+    def __init__(self, images, registry, pull_duration):
+        self.local = images
+        self.registry = registry
+        self.pull_duration = pull_duration
+        self.pulls = []
+        self.active_pulls = 0
+        self.max_active_pulls = 0
+        self._lock = threading.Lock()
+
+    def get(self, name):
+        if name not in self.local:
+            raise LookupError(f"No such image: {name}")
+        return _FakeImage(name, self.local[name])
+
+    def pull(self, repository, tag=None, **kwargs):
+        if repository not in self.registry:
+            raise LookupError(f"pull access denied for {repository}")
+        with self._lock:
+            self.pulls.append(repository)
+            self.active_pulls += 1
+            self.max_active_pulls = max(self.max_active_pulls, self.active_pulls)
+        time.sleep(self.pull_duration)
+        with self._lock:
+            self.active_pulls -= 1
+            self.local[repository] = self.registry[repository]
+        return _FakeImage(repository, self.registry[repository])
+
+
+class FakeDockerClient:
+    """Containers 'run' for `duration` seconds and then emit a die event."""
+
+    def __init__(self, duration=0.0, exit_codes=None, log_lines=None, on_run=None, images=None,
+                 registry=None, pull_duration=0.0, exec_exit_codes=None):
+        self.duration = duration
+        self.on_run = on_run
+        self.images = _FakeImages(images if images is not None else {}, registry or {}, pull_duration)
+        self.exit_codes = exit_codes or {}
+        self.log_lines = log_lines or []
+        self.containers = _FakeContainers(self)
+        self.api = _FakeAPI(self)
+        self.exec_exit_codes = exec_exit_codes or {}
+        self.started = []
+        self.api_calls = 0
+        self.events_calls = 0
+        self._subscribers = []
+        self._lock = threading.Lock()
+
+    def emit(self, event):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            subscriber.put(event)
+
+    def events(self, decode=True, filters=None):
+        self.events_calls += 1
+        subscriber = queue.Queue()
+        with self._lock:
+            self._subscribers.append(subscriber)
+        return _FakeEventStream(subscriber)
+
+    def break_event_streams(self):
+        with self._lock:
+            subscribers, self._subscribers = self._subscribers, []
+        for subscriber in subscribers:
+            subscriber.put(ConnectionError("stream closed"))
+
+
+class _FakeEventStream:
+    def __init__(self, subscriber):
+        self._queue = subscriber
+
+    def __iter__(self):
+        while True:
+            event = self._queue.get()
+            if event is None:
+                return
+            if isinstance(event, Exception):
+                raise event
+            yield event
+
+    def close(self):
+        self._queue.put(None)
+
+
+@contextmanager
+def patched_docker(client, layout=None, step_cache=None, flow_run_name=None):
+    """Run steps against `client`: docker_step and flow_setup use it instead of a daemon.
+
+    client is one fake client for every daemon or a dict base_url ->
+    client (several hosts, see util/host_pool.py). layout replaces
+    prepare_run_layout, step_cache is what get_step_cache returns
+    (default: no cache), and with flow_run_name docker_task's body can be
+    called without a Prefect flow run.
+    """
+    from util.container_watcher import ContainerWatcher
+
+    clients = client if isinstance(client, dict) else None
+    watchers = {}
+    watchers_lock = threading.Lock()
+
+    def client_for(base_url=None):
+        return clients[base_url] if clients is not None else client
+
+    def watcher_for(base_url=None):
+        with watchers_lock:
+            if base_url not in watchers:
+                watchers[base_url] = ContainerWatcher(client_for(base_url))
+            return watchers[base_url]
+
+    with ExitStack() as stack:
+        stack.callback(lambda: [watcher.close() for watcher in watchers.values()])
+        for target in ("util.docker_step.get_docker_client", "util.flow_setup.get_docker_client"):
+            stack.enter_context(patch(target, side_effect=client_for))
+        stack.enter_context(patch("util.docker_step.get_container_watcher", side_effect=watcher_for))
+        stack.enter_context(patch("util.docker_step.get_config", return_value={}))
+        stack.enter_context(patch("util.docker_step.get_step_cache", return_value=step_cache))
+        if layout is not None:
+            stack.enter_context(patch("util.flow_setup.prepare_run_layout", return_value=layout))
+        if flow_run_name is not None:
+            runtime = MagicMock()
+            runtime.flow_run.name = flow_run_name
+            stack.enter_context(patch("util.docker_task.runtime", runtime))
+            stack.enter_context(patch("util.docker_task.get_run_logger", return_value=logging.getLogger("test")))
+        yield
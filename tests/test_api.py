@@ -0,0 +1,171 @@
+import threading
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from api import app
+from util.run_manager import RunManager
+from util.mmut_index import MmutIndex
+from util.validation import ValidationCache
+
+VALID_ID = "833eee11-12f7-400d-ada8-0733c37a5563"
+
+
+@pytest.fixture()
+def client(data_dir):
+    with patch("util.trigger_process.get_mmut_dir", return_value=data_dir / "mmut"):
+        yield TestClient(app)
+
+
+def _manager(**options):
+    return patch("api.get_run_manager", return_value=RunManager(**options))
+
+
+def test_trigger_returns_run_handle(client):
+    finished = threading.Event()
+
+    def fake_flow(processes, flow_name, mmut_id=None):
+        finished.set()
+        return True
+
+    with _manager(), patch("util.trigger_process.run_docker_flow_sync", side_effect=fake_flow):
+        response = client.get(f"/trigger-flow/{VALID_ID}")
+        assert response.status_code == 202
+        run_id = response.json()["run_id"]
+        assert finished.wait(5)
+
+        for _ in range(50):
+            run = client.get(f"/runs/{run_id}").json()
+            if run["status"] == "completed":
+                break
+            finished.wait(0.05)
+        assert run["status"] == "completed"
+        assert run["steps"] == 3
+        assert run["flow_name"] == f"mmut-{VALID_ID}"
+
+
+def test_trigger_invalid_mmut(client):
+    with _manager():
+        response = client.get("/trigger-flow/invalid-uuid")
+    assert response.status_code == 500
+    assert response.json()["status"] == "error"
+
+
+def test_queue_full_returns_429(client):
+    release = threading.Event()
+    manager = RunManager(max_running=1, max_queued=1)
+
+    def blocking_flow(processes, flow_name, mmut_id=None):
+        release.wait(5)
+        return True
+
+    with patch("api.get_run_manager", return_value=manager), \
+            patch("util.trigger_process.run_docker_flow_sync", side_effect=blocking_flow):
+        assert client.get(f"/trigger-flow/{VALID_ID}").status_code == 202
+        assert client.get(f"/trigger-flow/{VALID_ID}").status_code == 202
+        response = client.get(f"/trigger-flow/{VALID_ID}")
+        assert response.status_code == 429
+        assert "Retry-After" in response.headers
+
+        # Batches unterliegen derselben Grenze, wartende Läufe werden weiter zurückgegeben
+        other_id = "8014cf0a-8d29-4cdb-9563-6b0e9fcf4b8f"
+        assert client.post("/trigger-flows", json={"mmut_ids": [other_id]}).status_code == 429
+        response = client.post("/trigger-flows", json={"mmut_ids": [VALID_ID]})
+        assert response.status_code == 202
+        assert response.json()["runs"][0]["deduplicated"]
+
+        release.set()
+        manager.shutdown()
+        assert [run.status for run in manager.list()] == ["completed", "completed"]
+
+
+def test_unknown_run(client):
+    assert client.get("/runs/does-not-exist").status_code == 404
+
+
+def test_list_mmut_dags_etag(client):
+    with patch("api.get_mmut_index", return_value=MmutIndex(min_interval=0)):
+        response = client.get("/list-mmut-dags")
+        assert response.status_code == 200
+        assert response.json()["total"] == 4
+        etag = response.headers["ETag"]
+
+        response = client.get("/list-mmut-dags", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+
+        response = client.get("/list-mmut-dags", params={"limit": 2})
+        assert len(response.json()["dags"]) == 2
+
+        assert client.get("/list-mmut-dags", params={"offset": -1}).status_code == 422
+        assert client.get("/list-mmut-dags", params={"limit": 0}).status_code == 422
+
+
+def test_batch_trigger_dedupes_and_reports_per_id(client):
+    release = threading.Event()
+    flows = []
+
+    def blocking_flow(processes, flow_name, mmut_id=None):
+        flows.append(mmut_id)
+        release.wait(5)
+        return True
+
+    manager = RunManager(max_running=1)
+    other_id = "8014cf0a-8d29-4cdb-9563-6b0e9fcf4b8f"
+    with patch("api.get_run_manager", return_value=manager), \
+            patch("util.trigger_process.run_docker_flow_sync", side_effect=blocking_flow):
+        response = client.post("/trigger-flows", json={"mmut_ids": [VALID_ID, other_id, VALID_ID, "invalid-uuid"]})
+        assert response.status_code == 202
+        runs = response.json()["runs"]
+        assert [run["mmut_id"] for run in runs] == [VALID_ID, other_id, "invalid-uuid"]
+        assert runs[2]["status"] == "failed"
+
+        # other_id wartet noch (max_running=1): erneute Anfrage liefert denselben Lauf
+        again = client.post("/trigger-flows", json={"mmut_ids": [other_id]}).json()["runs"][0]
+        assert again["deduplicated"] and again["run_id"] == runs[1]["run_id"]
+
+        release.set()
+        manager.shutdown()
+    assert sorted(flows) == sorted([VALID_ID, other_id])
+    assert [manager.get(run["run_id"]).status for run in runs] == ["completed", "completed", "failed"]
+
+
+def test_batch_compiles_in_worker_processes(data_dir):
+    manager = RunManager(batch_compile_processes=2, batch_process_threshold=2)
+    mmut_ids = [VALID_ID, "8014cf0a-8d29-4cdb-9563-6b0e9fcf4b8f", "invalid-uuid"]
+    with patch("util.trigger_process.get_mmut_dir", return_value=data_dir / "mmut"):
+        results = manager._compile_many(mmut_ids)
+        pool = manager._batch_pool
+        # die Worker-Prozesse bleiben für den nächsten Batch bestehen
+        manager._compile_many(mmut_ids[:2])
+        assert manager._batch_pool is pool
+    manager.shutdown()
+    assert [len(p) if p else None for p, _, _ in results] == [3, 7, None]
+    assert results[2][2] is not None
+
+
+def test_validate_reports_violations_and_caches(client, data_dir):
+    with patch("api.get_mmut_dir", return_value=data_dir / "mmut"), \
+            patch("api.get_validation_cache", return_value=ValidationCache()):
+        valid = client.get(f"/validate/{VALID_ID}").json()
+        assert valid["valid"] is True
+        assert valid["violations"] == []
+        assert valid["cached"] is False
+        assert client.get(f"/validate/{VALID_ID}").json()["cached"] is True
+
+        loop = client.get("/validate/25350c66-f832-4c8d-b1cf-5b49e890806d").json()
+        assert loop["valid"] is False
+        assert [v["kind"] for v in loop["violations"]] == ["cycle"]
+        assert len(loop["violations"][0]["nodes"]) == 4
+
+        assert client.get("/validate/invalid-uuid").status_code == 400
+        assert client.get("/validate/44f138a6-5c58-4b62-8770-ac5f4739ac44").status_code == 404
+
+
+def test_trigger_with_targets_runs_only_their_ancestors(client):
+    target = "http://hpi.de/test-valid#PythonScriptTransformation-a"
+    with _manager(), patch("util.trigger_process.run_docker_flow_sync", return_value=True):
+        response = client.get(f"/trigger-flow/{VALID_ID}", params={"target": target})
+        assert response.status_code == 202
+        assert response.json()["targets"] == [target]
+        assert response.json()["steps"] == 2
+
+        assert client.get(f"/trigger-flow/{VALID_ID}", params={"target": "http://unknown"}).status_code == 500
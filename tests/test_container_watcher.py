@@ -0,0 +1,65 @@
+import threading
+import time
+from util.container_watcher import ContainerWatcher
+from fake_docker import FakeDockerClient
+
+
+def test_exit_code_from_die_event():
+    client = FakeDockerClient(duration=0.2, exit_codes={"bad": 3})
+    watcher = ContainerWatcher(client)
+    assert watcher.wait(client.containers.run("img", name="good")) == 0
+    assert watcher.wait(client.containers.run("img", name="bad")) == 3
+
+
+def test_waiter_woken_by_die_event():
+    client = FakeDockerClient(duration=3600)
+    watcher = ContainerWatcher(client)
+    container = client.containers.run("img", name="step")
+
+    def finish():
+        time.sleep(0.1)
+        container.finish(4)
+
+    threading.Thread(target=finish).start()
+    assert watcher.wait(container, timeout=5) == 4
+    # Exit-Code aus dem Event: nur der eine reload, kein container.wait()
+    assert client.api_calls == 1
+
+
+def test_already_exited_container():
+    client = FakeDockerClient(duration=3600)
+    watcher = ContainerWatcher(client)
+    container = client.containers.run("img", name="early")
+    container.finish(7)
+    assert watcher.wait(container, timeout=1) == 7
+
+
+def test_one_stream_serves_all_tasks():
+    client = FakeDockerClient(duration=0.1)
+    watcher = ContainerWatcher(client)
+    containers = [client.containers.run("img", name=f"c{i}") for i in range(20)]
+    results = []
+    threads = [threading.Thread(target=lambda c=c: results.append(watcher.wait(c, timeout=5))) for c in containers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [0] * 20
+    assert client.events_calls == 1
+    # kein Polling: höchstens ein reload je Container
+    assert client.api_calls <= 20
+
+
+def test_fallback_when_stream_breaks():
+    client = FakeDockerClient(duration=3600)
+    watcher = ContainerWatcher(client)
+    container = client.containers.run("img", name="step")
+
+    def breaker():
+        time.sleep(0.1)
+        client.break_event_streams()
+        time.sleep(0.1)
+        container.finish(5)
+
+    threading.Thread(target=breaker).start()
+    assert watcher.wait(container, timeout=5) == 5
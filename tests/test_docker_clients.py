@@ -0,0 +1,33 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch, MagicMock
+from util import docker_clients
+
+
+def test_one_client_per_daemon_across_threads():
+    with patch("util.docker_clients._create_client", side_effect=lambda base_url, timeout=None: MagicMock()) as create:
+        docker_clients.close_docker_clients()
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            clients = list(pool.map(lambda _: docker_clients.get_docker_client(), range(32)))
+        remote = docker_clients.get_docker_client("tcp://build-1:2375")
+        assert len({id(c) for c in clients}) == 1
+        assert remote is not clients[0]
+        assert create.call_count == 2
+        docker_clients.close_docker_clients()
+
+
+def test_failed_ping_keeps_shared_client():
+    shared = MagicMock()
+    broken = MagicMock()
+    broken.ping.side_effect = ConnectionError("daemon gone")
+    healthy = MagicMock()
+    with patch("util.docker_clients._create_client", side_effect=[shared, broken, healthy]) as create:
+        docker_clients.close_docker_clients()
+        assert docker_clients.get_docker_client() is shared
+        assert not docker_clients.ping_docker()
+        broken.close.assert_called_once()
+        # eigener Client mit kurzem Timeout, der geteilte bleibt offen
+        assert create.call_args.kwargs["timeout"] == 5
+        shared.close.assert_not_called()
+        assert docker_clients.ping_docker()
+        assert docker_clients.get_docker_client() is shared
+        docker_clients.close_docker_clients()
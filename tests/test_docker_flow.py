@@ -0,0 +1,31 @@
+import pytest
+from prefect.testing.utilities import prefect_test_harness
+from util.docker_flow import docker_flow
+from util.process_pipeline_builder import Process, serialize_processes
+from fake_docker import FakeDockerClient, patched_docker
+
+LAYOUT = {"volumes": {"models": "/host/models"}, "run_dirs": {"models": "/tmp/models"}}
+
+
+@pytest.fixture(scope="module")
+def prefect_server():
+    # temporärer Prefect-Server für die Flows dieses Moduls
+    with prefect_test_harness():
+        yield
+
+
+def _p(id, deps=None):
+    return Process(id, id, "img", ["run", id], {}, deps)
+
+
+def test_ready_queue_respects_limit_and_skips_downstream(prefect_server):
+    running = []
+    client = FakeDockerClient(duration=0.1, images={"img": "sha256:x"}, exit_codes={"a": 1})
+    client.on_run = lambda c: running.append(sum(x.status == "running" for x in client.started))
+    processes = [_p("a"), _p("b", ["a"]), _p("c"), _p("d"), _p("e", ["c"])]
+
+    with patched_docker(client, layout=LAYOUT), pytest.raises(Exception, match="exit code 1"):
+        docker_flow(serialize_processes(processes), max_concurrency=2)
+
+    assert sorted(c.name for c in client.started) == ["a", "c", "d", "e"]
+    assert max(running) <= 2
@@ -0,0 +1,61 @@
+import os
+import pytest
+from unittest.mock import patch
+from util import helper
+
+
+@pytest.fixture()
+def config_dir(tmp_path):
+    config_dir = tmp_path / "config"
+    config_dir.mkdir()
+    (config_dir / "shared.yaml").write_text(
+        f"root_path: /host\n"
+        f"local_path: {tmp_path / 'shared'}\n"
+        "shared_paths:\n"
+        "  - key: models\n"
+        "    folder: [input, output]\n"
+    )
+    (tmp_path / "shared").mkdir()
+    with patch("util.helper.get_config_dir", return_value=str(config_dir)):
+        yield config_dir
+
+
+def test_shared_config_parsed_once(config_dir):
+    with patch("util.helper.yaml.safe_load", wraps=helper.yaml.safe_load) as mock_load:
+        helper.get_shared_config()
+        for _ in range(20):
+            helper.get_shared_config()
+        assert mock_load.call_count <= 1
+
+        shared_yaml = config_dir / "shared.yaml"
+        shared_yaml.write_text(shared_yaml.read_text().replace("/host", "/other"))
+        os.utime(shared_yaml, ns=(0, 10**18))
+        assert helper.get_shared_config()["root_path"] == "/other"
+
+    shared_yaml.unlink()
+    with pytest.raises(FileNotFoundError):
+        helper.get_shared_config()
+
+
+def test_config_parsed_once_and_optional(config_dir):
+    assert helper.get_config("runs") == {}
+    runs_yaml = config_dir / "runs.yaml"
+    runs_yaml.write_text("max_running: 2\n")
+    with patch("util.helper.yaml.safe_load", wraps=helper.yaml.safe_load) as mock_load:
+        for _ in range(20):
+            assert helper.get_config("runs") == {"max_running": 2}
+        assert mock_load.call_count == 1
+
+        runs_yaml.write_text("max_running: 3\n")
+        os.utime(runs_yaml, ns=(0, 10**18))
+        assert helper.get_config("runs") == {"max_running": 3}
+
+
+def test_prepare_run_layout(config_dir, tmp_path):
+    with patch("util.helper._mkdir", wraps=helper._mkdir) as mock_mkdir:
+        layout = helper.prepare_run_layout("run-1", ["logs"])
+    local = tmp_path / "shared" / "flow-run-1"
+    assert layout["volumes"] == {"models": os.path.join("/host", str(tmp_path / "shared"), "flow-run-1", "models")}
+    assert layout["run_dirs"] == {"models": str(local / "models"), "logs": str(local / "logs")}
+    assert (local / "models" / "input").is_dir() and (local / "models" / "output").is_dir()
+    assert mock_mkdir.call_count == 5
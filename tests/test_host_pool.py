@@ -0,0 +1,128 @@
+import logging
+import threading
+from unittest.mock import patch, MagicMock
+import pytest
+from util.host_pool import Host, HostPool
+from util.native_flow import run_native_flow
+from util.process_pipeline_builder import Process
+from fake_docker import FakeDockerClient, patched_docker
+
+LAYOUT = {"volumes": {"models": "/shared/flow-x/models"}, "run_dirs": {"models": "/tmp/models"}}
+
+
+def _pool():
+    return HostPool([Host("a", "tcp://a:2375", capacity=2, root_path="/mnt/a"),
+                     Host("b", "tcp://b:2375", capacity=2)])
+
+
+def test_places_on_least_loaded_host():
+    pool = _pool()
+    assert [pool.place([]).name for _ in range(4)] == ["a", "b", "a", "b"]
+
+
+def test_prefers_host_of_upstream_steps():
+    pool = _pool()
+    pool.place([])
+    assert pool.place(["a"]).name == "a"
+    # a ist voll, daher der am wenigsten ausgelastete Host
+    assert pool.place(["a"]).name == "b"
+
+
+def test_no_host_when_every_slot_is_taken():
+    pool = HostPool([Host("a", capacity=1)])
+    pool.place([])
+    assert pool.place([]) is None
+    pool.release("a")
+    assert pool.place([]).name == "a"
+
+
+def test_admits_against_the_resources_of_each_host():
+    pool = _pool()
+    pool.set_limits(lambda host: {"cpus": 4.0} if host.name == "a" else {"cpus": 2.0})
+    request = {"cpus": 2.0}
+    assert [pool.place([], request).name for _ in range(3)] == ["a", "b", "a"]
+    # a hat 4 von 4 CPUs vergeben, b 2 von 2
+    assert pool.place([], request) is None
+    pool.release("b", request)
+    assert pool.place(["a"], request).name == "b"
+    # größer als jeder Host: läuft allein auf einem freien Host
+    pool = _pool()
+    pool.set_limits(lambda host: {"cpus": 2.0})
+    assert pool.place([], {"cpus": 16.0}).name == "a"
+
+
+def test_auto_capacity_asks_the_daemon_of_each_host():
+    from util.flow_setup import host_capacity
+    infos = {"tcp://a:2375": {"NCPU": 8, "MemTotal": 100}, "tcp://b:2375": {"NCPU": 2, "MemTotal": 50}}
+    pool = _pool()
+    with patch("util.flow_setup.get_docker_client", side_effect=lambda base_url=None: MagicMock(info=lambda: infos[base_url])):
+        pool.set_limits(lambda host: host_capacity("auto", host.base_url))
+    assert pool.hosts["a"].limits == {"cpus": 8.0, "memory": 100}
+    assert pool.hosts["b"].limits == {"cpus": 2.0, "memory": 50}
+
+
+def test_rejects_duplicate_or_missing_hosts():
+    with pytest.raises(ValueError):
+        HostPool([])
+    with pytest.raises(ValueError):
+        HostPool([Host("a"), Host("a")])
+
+
+def test_place_rebases_volumes_and_picks_daemon():
+    from util.flow_setup import place
+    pool = _pool()
+    hosts = {}
+    run_params = {"volumes": {"models": "/data/runs/flow-x/models"}, "mmut": "m"}
+    with patch("util.flow_setup.get_shared_config", return_value={"root_path": "/data"}):
+        first = place(Process("p1", "p1", "img", [], {}, None), run_params, pool, hosts, logging.getLogger())
+        second = place(Process("p2", "p2", "img", [], {}, ["p1"]), run_params, pool, hosts,
+                        logging.getLogger())
+
+    assert first["docker_host"] == "tcp://a:2375"
+    assert first["volumes"] == {"models": "/mnt/a/runs/flow-x/models"}
+    # Nachfolger läuft beim Vorgänger, die run_params bleiben unverändert
+    assert second["docker_host"] == "tcp://a:2375"
+    assert run_params["volumes"] == {"models": "/data/runs/flow-x/models"}
+    assert hosts["p2"].name == "a"
+
+
+def test_native_flow_runs_steps_on_fake_hosts():
+    pool = HostPool([Host("a", "tcp://a:2375", capacity=2), Host("b", "tcp://b:2375", capacity=1)])
+    clients = {host.base_url: FakeDockerClient(duration=0.05, images={"img": "sha256:x"})
+               for host in pool.hosts.values()}
+    running = {url: [] for url in clients}
+    for url, client in clients.items():
+        # laufende Container dieses Hosts beim Start eines weiteren
+        client.on_run = lambda c, url=url, client=client: running[url].append(
+            sum(x.status == "running" for x in client.started))
+    processes = [Process(f"s{i}", f"s{i}", "img", ["run"], {}, None) for i in range(6)] + \
+        [Process("join", "join", "img", ["run"], {}, ["s0", "s1"])]
+
+    with patched_docker(clients, layout=LAYOUT), \
+            patch("util.flow_setup.get_host_pool", return_value=pool), \
+            patch("util.flow_setup.get_shared_config", return_value={"root_path": "/host"}):
+        run_native_flow(processes, "test")
+
+    ran_on = {c.name: url for url, client in clients.items() for c in client.started}
+    assert sorted(ran_on) == sorted(p.id for p in processes)
+    assert set(ran_on.values()) == set(clients)
+    assert max(running["tcp://a:2375"]) <= 2 and max(running["tcp://b:2375"]) <= 1
+    # alle Plätze wieder frei
+    assert [host.running for host in pool.hosts.values()] == [0, 0]
+    assert all(host.used == {"cpus": 0.0, "memory": 0} for host in pool.hosts.values())
+
+
+def test_native_flow_waits_for_slots_taken_by_other_runs():
+    pool = HostPool([Host("a", "tcp://a:2375", capacity=1)])
+    client = FakeDockerClient(images={"img": "sha256:x"})
+    # ein anderer Lauf belegt den einzigen Platz und gibt ihn später frei
+    pool.place([])
+    threading.Timer(0.2, pool.release, args=("a",)).start()
+
+    with patched_docker({"tcp://a:2375": client}, layout=LAYOUT), \
+            patch("util.flow_setup.get_host_pool", return_value=pool), \
+            patch("util.flow_setup.get_shared_config", return_value={"root_path": "/host"}):
+        run_native_flow([Process("s0", "s0", "img", ["run"], {}, None)], "test")
+
+    assert [c.name for c in client.started] == ["s0"]
+    assert pool.hosts["a"].running == 0
@@ -0,0 +1,24 @@
+from util.image_prefetch import prefetch_images
+from fake_docker import FakeDockerClient
+
+
+def test_distinct_images_pulled_concurrently_with_limit():
+    registry = {f"img{i}": f"sha256:{i}" for i in range(6)}
+    client = FakeDockerClient(images={"local": "sha256:local"}, registry=registry, pull_duration=0.1)
+    images = ["local"] + [f"img{i}" for i in range(6)] * 3
+
+    result = prefetch_images(client, images, max_pulls=3)
+
+    assert sorted(client.images.pulls) == sorted(registry)
+    assert client.images.max_active_pulls == 3
+    assert result.digests == {"local": "sha256:local", **registry}
+    assert sorted(result.pulled) == sorted(registry)
+    # höchstens 3 gleichzeitig, also mindestens zwei Runden à 0.1s
+    assert result.seconds >= 0.2
+
+
+def test_missing_image_resolves_to_none():
+    client = FakeDockerClient()
+    result = prefetch_images(client, ["missing"])
+    assert result.digests == {"missing": None}
+    assert result.failed == ["missing"]
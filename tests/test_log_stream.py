@@ -0,0 +1,64 @@
+import pytest
+from unittest.mock import patch
+from util.docker_step import _run_container
+from util.log_stream import LogFollower, follow_logs
+from util.metrics import get_metrics
+from fake_docker import FakeDockerClient
+
+
+class RecordingLogger:
+    def __init__(self):
+        self.records = []
+
+    def info(self, message):
+        self.records.append(message)
+
+
+def test_batches_and_caps_tail():
+    logger = RecordingLogger()
+    follower = LogFollower(logger, batch_lines=100, batch_interval=3600, tail_lines=50)
+    for i in range(1000):
+        follower.feed(f"line {i}\n".encode())
+    tail = follower.close()
+
+    assert len(logger.records) == 10
+    assert logger.records[0].splitlines()[0] == "line 0"
+    assert follower.line_count == 1000
+    assert tail == [f"line {i}" for i in range(950, 1000)]
+
+
+def test_partial_lines_and_split_utf8():
+    logger = RecordingLogger()
+    follower = LogFollower(logger)
+    data = "grüße\nwelt".encode("utf-8")
+    for i in range(len(data)):
+        follower.feed(data[i:i + 1])
+    assert follower.close() == ["grüße", "welt"]
+    assert logger.records == ["grüße\nwelt"]
+
+
+def test_spool_keeps_full_output(tmp_path):
+    spool = tmp_path / "step.log"
+    follower = LogFollower(RecordingLogger(), tail_lines=2, spool_path=str(spool))
+    follower.feed(b"a\nb\nc\n")
+    assert follower.close() == ["b", "c"]
+    assert spool.read_text() == "a\nb\nc\n"
+
+
+def test_follow_container_logs():
+    client = FakeDockerClient(duration=0.05, log_lines=[b"one\n", b"two\n"])
+    container = client.containers.run("img", name="step")
+    logger = RecordingLogger()
+    assert follow_logs(container, logger, batch_interval=0.01) == ["one", "two"]
+    assert "\n".join(logger.records) == "one\ntwo"
+
+
+def test_container_removed_when_log_stream_breaks():
+    client = FakeDockerClient(duration=3600)
+    params = {"name": "step", "image": "img", "command": ["run"], "env": {},
+              "volumes": {"models": "/host/models"}, "run_dirs": {}}
+    with patch("util.docker_step.follow_logs", side_effect=ConnectionError("stream closed")), \
+            pytest.raises(ConnectionError):
+        _run_container(client, params, RecordingLogger(), get_metrics(), {})
+    # sonst scheitert der nächste Lauf am festen Containernamen
+    assert client.started[0].removed
@@ -0,0 +1,47 @@
+import logging
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from api import app
+from util import processes
+from util.metrics import Metrics
+
+VALID_ID = "833eee11-12f7-400d-ada8-0733c37a5563"
+
+
+def test_compile_phases_exposed_on_metrics_endpoint(data_dir):
+    metrics = Metrics()
+    with patch("util.processes.get_metrics", return_value=metrics), \
+            patch("api.get_metrics", return_value=metrics):
+        processes.get_processes(str(data_dir / "mmut" / VALID_ID), use_cache=False)
+        response = TestClient(app).get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    for phase in ("parse", "build", "extract"):
+        assert f'mmut_phase_duration_seconds_count{{image="",mmut="{VALID_ID}",phase="{phase}"}} 1.0' in response.text
+
+
+def test_failed_span_counts_error():
+    metrics = Metrics()
+    with pytest.raises(RuntimeError):
+        with metrics.span("start", image="img"):
+            raise RuntimeError("boom")
+    assert 'mmut_phase_errors_total{image="img",mmut="",phase="start"} 1.0' in metrics.render().decode()
+
+
+def test_structured_span_logs(caplog):
+    metrics = Metrics(log_spans=True)
+    with caplog.at_level(logging.INFO, logger="util.metrics"):
+        with metrics.span("pull", image="img"):
+            pass
+    assert '"span": "pull"' in caplog.text and '"image": "img"' in caplog.text
+
+
+def test_disabled_metrics_are_no_ops():
+    metrics = Metrics(enabled=False)
+    assert metrics.span("parse") is metrics.span("start", image="img")
+    with metrics.span("parse"):
+        pass
+    metrics.count("step_completed")
+    assert b"mmut_phase_duration_seconds_count" not in metrics.render()
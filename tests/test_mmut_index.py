@@ -0,0 +1,69 @@
+import json
+import os
+import pytest
+from unittest.mock import patch
+from util.mmut_index import MmutIndex
+
+IDS = [
+    "11111111-1111-4111-8111-111111111111",
+    "22222222-2222-4222-8222-222222222222",
+    "33333333-3333-4333-8333-333333333333",
+]
+
+
+@pytest.fixture()
+def mmut_dir(tmp_path):
+    for i, mmut_id in enumerate(IDS):
+        (tmp_path / mmut_id).mkdir()
+        (tmp_path / mmut_id / "info.json").write_text(json.dumps({"name": f"Flow {i}"}))
+    (tmp_path / "not-a-uuid").mkdir()
+    yield tmp_path
+
+
+def _index(mmut_dir):
+    return MmutIndex(mmut_dir=lambda: str(mmut_dir), min_interval=0)
+
+
+def test_lists_filters_and_paginates(mmut_dir):
+    index = _index(mmut_dir)
+    index.refresh()
+    dags, total = index.list()
+    assert total == 3
+    assert [dag["id"] for dag in dags] == IDS
+
+    dags, total = index.list(name="flow 1")
+    assert total == 1 and dags[0]["id"] == IDS[1]
+
+    dags, total = index.list(offset=1, limit=1)
+    assert total == 3 and [dag["id"] for dag in dags] == [IDS[1]]
+
+
+def test_unchanged_tree_is_not_reread(mmut_dir):
+    index = _index(mmut_dir)
+    index.refresh()
+    etag = index.etag
+    with patch("builtins.open") as mock_open, patch("os.listdir") as mock_listdir:
+        index.refresh()
+        mock_open.assert_not_called()
+        mock_listdir.assert_not_called()
+    assert index.etag == etag
+
+
+def test_incremental_updates(mmut_dir):
+    index = _index(mmut_dir)
+    index.refresh()
+    etag = index.etag
+
+    info_json = mmut_dir / IDS[0] / "info.json"
+    info_json.write_text(json.dumps({"name": "Renamed flow"}))
+    os.utime(info_json, ns=(0, 1))
+    index.refresh()
+    assert index.etag != etag
+    assert index.list(name="renamed")[1] == 1
+
+    new_id = "44444444-4444-4444-8444-444444444444"
+    (mmut_dir / new_id).mkdir()
+    os.utime(mmut_dir, ns=(0, 2))
+    index.refresh()
+    assert index.list()[1] == 4
+    assert index.list(name="")[0][-1] == {"id": new_id, "info": {}}
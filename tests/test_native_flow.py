@@ -0,0 +1,75 @@
+import logging
+from unittest.mock import patch
+import pytest
+from util.executors import NativeExecutor, get_executor
+from util.flow_setup import FlowSetup, run_ready_queue
+from util.native_flow import run_native_flow
+from util.process_pipeline_builder import Process
+from fake_docker import FakeDockerClient, patched_docker
+
+LAYOUT = {"volumes": {"models": "/host/models"}, "run_dirs": {"models": "/tmp/models"}}
+
+
+def _p(id, deps=None):
+    return Process(id, id, "img", ["run", id], {}, deps)
+
+
+def test_steps_start_after_their_dependencies():
+    started = {}
+    client = FakeDockerClient(duration=0.05, images={"img": "sha256:x"})
+    # beim Start eines Containers: welche sind schon beendet?
+    client.on_run = lambda c: started.setdefault(c.name, {x.name for x in client.started if x.status == "exited"})
+    processes = [_p("a"), _p("b", ["a"]), _p("c", ["a"]), _p("d", ["b", "c"])]
+
+    with patched_docker(client, layout=LAYOUT):
+        run_native_flow(processes, "test")
+
+    assert set(started) == {"a", "b", "c", "d"}
+    assert "a" in started["b"] and "a" in started["c"]
+    assert {"b", "c"} <= started["d"]
+
+
+def test_failed_step_skips_downstream_and_raises():
+    client = FakeDockerClient(images={"img": "sha256:x"}, exit_codes={"a": 1})
+    with patched_docker(client, layout=LAYOUT), pytest.raises(RuntimeError, match="1 step"):
+        run_native_flow([_p("a"), _p("b", ["a"]), _p("c")], "test")
+    assert sorted(c.name for c in client.started) == ["a", "c"]
+
+
+def test_max_workers_bounds_running_steps():
+    running = []
+    client = FakeDockerClient(duration=0.05, images={"img": "sha256:x"})
+    client.on_run = lambda c: running.append(sum(x.status == "running" for x in client.started))
+    with patched_docker(client, layout=LAYOUT):
+        run_native_flow([_p(f"s{i}") for i in range(6)], "test", max_workers=2)
+    assert len(client.started) == 6
+    assert max(running) <= 2
+
+
+def test_limits_that_start_nothing_are_rejected():
+    client = FakeDockerClient(images={"img": "sha256:x"})
+    config = {"scheduler": {"max_per_image": {"img": 0}}}
+    with patched_docker(client, layout=LAYOUT), \
+            patch("util.flow_setup.get_config", side_effect=lambda name: config.get(name, {})), \
+            pytest.raises(ValueError, match="max_per_image"):
+        run_native_flow([_p("a")], "test")
+    assert client.started == []
+
+    # ohne die Prüfung: die Schleife endet nicht stillschweigend
+    setup = FlowSetup("test", {}, {}, None, {"max_concurrency": 0, "max_per_image": None,
+                                             "capacity": None, "priority": "fifo"})
+    with pytest.raises(RuntimeError, match="1 step"):
+        run_ready_queue([_p("a")], setup, logging.getLogger("test"), submit=None, wait_any=None, outcome=None)
+
+
+def test_executor_backend_from_config():
+    with patch("util.executors._executor", None), \
+            patch("util.executors.get_config", return_value={"backend": "native", "max_workers": 3}):
+        executor = get_executor()
+    assert isinstance(executor, NativeExecutor)
+    assert executor.max_workers == 3
+
+    with patch("util.executors._executor", None), \
+            patch("util.executors.get_config", return_value={"backend": "dask"}), \
+            pytest.raises(ValueError):
+        get_executor()
@@ -0,0 +1,76 @@
+import os
+import shutil
+import pytest
+from unittest.mock import patch
+from util import processes
+from util.pipeline_cache import PipelineCache, mmut_fingerprint
+
+
+VALID_ID = "833eee11-12f7-400d-ada8-0733c37a5563"
+
+
+@pytest.fixture()
+def mmut_path(data_dir, tmp_path):
+    path = tmp_path / "mmut" / VALID_ID
+    shutil.copytree(data_dir / "mmut" / VALID_ID, path)
+    yield path
+
+
+@pytest.fixture()
+def cache(tmp_path):
+    cache = PipelineCache(cache_dir=str(tmp_path / "cache"))
+    with patch("util.processes.get_pipeline_cache", return_value=cache):
+        yield cache
+
+
+def test_repeat_trigger_skips_parsing(mmut_path, cache):
+    first = processes.get_processes(str(mmut_path))
+    assert len(first) == 3
+
+    with patch("util.processes.compile_processes") as mock_compile:
+        second = processes.get_processes(str(mmut_path))
+        mock_compile.assert_not_called()
+    assert [p.id for p in second] == [p.id for p in first]
+
+
+def test_disk_cache_survives_restart(mmut_path, cache):
+    processes.get_processes(str(mmut_path))
+
+    restarted = PipelineCache(cache_dir=cache.cache_dir)
+    with patch("util.processes.get_pipeline_cache", return_value=restarted):
+        with patch("util.processes.compile_processes") as mock_compile:
+            result = processes.get_processes(str(mmut_path))
+            mock_compile.assert_not_called()
+    assert len(result) == 3
+
+
+def test_fingerprint_changes_on_edit_add_remove(mmut_path):
+    key = mmut_fingerprint(str(mmut_path))
+    assert mmut_fingerprint(str(mmut_path)) == key
+
+    ttl = next(mmut_path.glob("*.ttl"))
+    with open(ttl, "a") as f:
+        f.write("\n")
+    edited = mmut_fingerprint(str(mmut_path))
+    assert edited != key
+
+    extra = mmut_path / "extra.ttl"
+    extra.write_text("")
+    added = mmut_fingerprint(str(mmut_path))
+    assert added not in (key, edited)
+
+    os.remove(extra)
+    assert mmut_fingerprint(str(mmut_path)) == edited
+
+    # Andere Dateien gehören nicht zum Schlüssel
+    (mmut_path / "info.json").write_text("{}")
+    assert mmut_fingerprint(str(mmut_path)) == edited
+
+
+def test_memory_lru_eviction(tmp_path):
+    cache = PipelineCache(cache_dir=str(tmp_path / "cache"), max_entries=2)
+    cache.put("a", [])
+    cache.put("b", [])
+    cache.get("a")
+    cache.put("c", [])
+    assert list(cache._entries.keys()) == ["a", "c"]
@@ -0,0 +1,197 @@
+import os
+import json
+import pytest
+import networkx as nx
+from rdflib import Graph, RDFS
+from obse.sparql_queries import SparQLWrapper
+from py_mmut_rdf import MMUT
+from util.processes import new_mmut_graph
+from util.process_pipeline_builder import ProcessPipelineBuilder, Process, serialize_processes, deserialize_processes
+from util.resolver import get_resolver
+
+
+ENV_TTL = """
+@prefix MMUT: <http://frittenburger.de/ontology/mmut#> .
+@prefix rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#> .
+@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+@prefix t: <http://hpi.de/test-env#> .
+
+t:Model-In a MMUT:SysMLMicroModel ;
+    MMUT:hasTaskDefinition t:Task-In ;
+    MMUT:isInputModelOf t:Transform .
+
+t:Transform a MMUT:PythonScriptTransformation ;
+    MMUT:hasTaskDefinition t:Task-Transform ;
+    MMUT:hasOutputModel t:Model-Out .
+
+t:Model-Out a MMUT:RDFMicroModel ;
+    MMUT:hasTaskDefinition t:Task-Out .
+
+t:Task-In a MMUT:TaskDefinition ; rdfs:label "load in" ;
+    MMUT:hasContainerProperties t:CP-In .
+t:Task-Transform a MMUT:TaskDefinition ; rdfs:label "transform" ;
+    MMUT:hasContainerProperties t:CP-Transform .
+t:Task-Out a MMUT:TaskDefinition ; rdfs:label "load out" ;
+    MMUT:hasContainerProperties t:CP-Out .
+
+t:CP-In a MMUT:ContainerProperties ; MMUT:image "img-in" ;
+    MMUT:hasCommandSequence [ a rdf:Seq ; rdf:_1 "echo" ; rdf:_2 "in" ] ;
+    MMUT:hasEnvironment t:Env-Empty .
+t:CP-Out a MMUT:ContainerProperties ; MMUT:image "img-out" ;
+    MMUT:hasCommandSequence [ a rdf:Seq ; rdf:_1 "echo" ] ;
+    MMUT:hasEnvironment t:Env-Empty .
+t:CP-Transform a MMUT:ContainerProperties ; MMUT:image "img-transform" ;
+    MMUT:hasCommandSequence [ a rdf:Seq ;
+        rdf:_1 "python" ; rdf:_2 "a" ; rdf:_3 "b" ; rdf:_4 "c" ; rdf:_5 "d" ;
+        rdf:_6 "e" ; rdf:_7 "f" ; rdf:_8 "g" ; rdf:_9 "h" ; rdf:_10 "i" ;
+        rdf:_11 "{{resolve:system:modelpath}}out" ] ;
+    MMUT:hasEnvironment t:Env-Transform .
+
+t:Env-Empty a MMUT:Environment .
+t:Env-Transform a MMUT:Environment ;
+    MMUT:hasKeyValuePair t:KV-1, t:KV-2, t:KV-3 .
+t:KV-1 a MMUT:KeyValuePair ; MMUT:key "INPUT" ; MMUT:value "{{resolve:system:modelpath}}in.ttl" .
+t:KV-2 a MMUT:KeyValuePair ; MMUT:key "MODE" ; MMUT:value "fast" .
+t:KV-3 a MMUT:KeyValuePair ; MMUT:key "EMPTY" ; MMUT:value "" .
+"""
+
+
+def reference_processes(g: Graph):
+    """Per-node SPARQL extraction as originally implemented."""
+    builder = ProcessPipelineBuilder(g)
+    resolver = get_resolver()
+    sparql_wrapper = SparQLWrapper(g)
+    processes = []
+    for step in nx.topological_sort(builder.G):
+        predecessors = list(builder.G.predecessors(step))
+        dependencies = [str(pred) for pred in predecessors] if predecessors else None
+        p_task_definition = sparql_wrapper.get_out_references(step, MMUT.hasTaskDefinition)[0]
+        p_container_property = sparql_wrapper.get_single_out_reference(p_task_definition, MMUT.hasContainerProperties)
+        image = sparql_wrapper.get_single_object_property(p_container_property, MMUT.image)
+        p_command_sequence = sparql_wrapper.get_single_out_reference(p_container_property, MMUT.hasCommandSequence)
+        command = [resolver.resolve(str(lit)) for lit in sparql_wrapper.get_sequence(p_command_sequence)]
+        p_environment = sparql_wrapper.get_single_out_reference(p_container_property, MMUT.hasEnvironment)
+        env = {}
+        for p_key_value in sparql_wrapper.get_out_references(p_environment, MMUT.hasKeyValuePair):
+            key = sparql_wrapper.get_single_object_property(p_key_value, MMUT.key)
+            value = sparql_wrapper.get_single_object_property(p_key_value, MMUT.value)
+            env[key] = resolver.resolve(value)
+        name = sparql_wrapper.get_single_object_property(p_task_definition, RDFS.label)
+        processes.append(Process(str(step), name, image, command, env, dependencies))
+    return processes
+
+
+def _as_tuples(processes):
+    return [(p.id, p.name, p.image, p.command, list(p.env.items()), p.dependencies) for p in processes]
+
+
+def _load(paths=(), data=None):
+    g = new_mmut_graph()
+    for path in paths:
+        g.parse(path, format="turtle")
+    if data:
+        g.parse(data=data, format="turtle")
+    return g
+
+
+@pytest.mark.parametrize("mmut_id", [
+    "833eee11-12f7-400d-ada8-0733c37a5563",
+    "8014cf0a-8d29-4cdb-9563-6b0e9fcf4b8f",
+])
+def test_bulk_extraction_matches_sparql(data_dir, mmut_id):
+    mmut_path = data_dir / "mmut" / mmut_id
+    g = _load(paths=[mmut_path / f for f in os.listdir(mmut_path) if f.endswith(".ttl")])
+    assert _as_tuples(ProcessPipelineBuilder(g).get_processes()) == _as_tuples(reference_processes(g))
+
+
+def test_bulk_extraction_env_and_long_sequence():
+    g = _load(data=ENV_TTL)
+    processes = ProcessPipelineBuilder(g).get_processes()
+    assert _as_tuples(processes) == _as_tuples(reference_processes(g))
+
+    transform = processes[1]
+    assert transform.command[-1] == "/share/models/out"
+    assert transform.command[:3] == ["python", "a", "b"]
+    assert transform.env["INPUT"] == "/share/models/in.ttl"
+    assert transform.env["MODE"] == "fast"
+
+
+def test_container_resources():
+    data = ENV_TTL.replace(
+        't:CP-Transform a MMUT:ContainerProperties ; MMUT:image "img-transform" ;',
+        't:CP-Transform a MMUT:ContainerProperties ; MMUT:image "img-transform" ;\n'
+        '    MMUT:cpus 1.5 ; MMUT:memLimit "2g" ; MMUT:cpusetCpus "0-3" ;')
+    processes = ProcessPipelineBuilder(_load(data=data)).get_processes()
+    assert processes[1].resources == {"cpus": 1.5, "mem_limit": "2g", "cpuset_cpus": "0-3"}
+    assert processes[0].resources == {}
+
+
+def test_serialization_roundtrip(data_dir):
+    mmut_path = data_dir / "mmut" / "8014cf0a-8d29-4cdb-9563-6b0e9fcf4b8f"
+    g = _load(paths=[mmut_path / f for f in os.listdir(mmut_path) if f.endswith(".ttl")])
+    processes = ProcessPipelineBuilder(g).get_processes()
+
+    payload = serialize_processes(processes)
+    assert deserialize_processes(json.loads(json.dumps(payload))) == processes
+    assert all(isinstance(i, int) for row in payload["processes"] for i in (row[5] or []))
+
+    # mit Ressourcen: xsd:decimal (cpus 1.5) wird zu float, nicht zu Decimal
+    data = ENV_TTL.replace(
+        't:CP-Transform a MMUT:ContainerProperties ; MMUT:image "img-transform" ;',
+        't:CP-Transform a MMUT:ContainerProperties ; MMUT:image "img-transform" ;\n'
+        '    MMUT:cpus 1.5 ; MMUT:memLimit "2g" ; MMUT:pidsLimit 64 ;')
+    with_resources = ProcessPipelineBuilder(_load(data=data)).get_processes()
+    encoded = json.dumps(serialize_processes(with_resources))
+    assert deserialize_processes(json.loads(encoded)) == with_resources
+    assert with_resources[1].resources == {"cpus": 1.5, "mem_limit": "2g", "pids_limit": 64}
+    assert type(with_resources[1].resources["cpus"]) is float
+
+    with pytest.raises(ValueError):
+        deserialize_processes({**payload, "version": 0})
+    with pytest.raises(ValueError):
+        serialize_processes(list(reversed(processes)))
+
+
+def test_validate_reports_all_violations_at_once():
+    data = ENV_TTL.replace('t:CP-Out a MMUT:ContainerProperties ; MMUT:image "img-out" ;',
+                           't:CP-Out a MMUT:ContainerProperties ;')
+    data = data.replace('t:Model-In a MMUT:SysMLMicroModel ;\n    MMUT:hasTaskDefinition t:Task-In ;',
+                        't:Model-In a MMUT:SysMLMicroModel ;\n    MMUT:hasTaskDefinition t:Task-In, t:Task-Out ;')
+    data += """
+t:Transform MMUT:hasOutputModel t:Model-Typo .
+t:Model-Out MMUT:isInputModelOf t:Transform-Back .
+t:Transform-Back a MMUT:PythonScriptTransformation ; MMUT:hasOutputModel t:Model-In .
+"""
+    builder = ProcessPipelineBuilder(_load(data=data))
+    violations = builder.validate()
+    kinds = sorted(v["kind"] for v in violations)
+    assert kinds == ["cycle", "dangling_dependency", "duplicate_task_definition",
+                     "missing_image", "missing_task_definition"]
+
+    cycle = next(v for v in violations if v["kind"] == "cycle")
+    assert sorted(cycle["nodes"]) == sorted(f"http://hpi.de/test-env#{n}" for n in
+                                            ("Model-In", "Transform", "Model-Out", "Transform-Back"))
+    assert next(v for v in violations if v["kind"] == "dangling_dependency")["node"].endswith("Model-Typo")
+    assert next(v for v in violations if v["kind"] == "missing_task_definition")["node"].endswith("Transform-Back")
+    with pytest.raises(ValueError, match="Zyklen"):
+        builder.get_processes()
+
+
+def test_validate_checks_what_compilation_needs():
+    data = ENV_TTL.replace('t:Task-In a MMUT:TaskDefinition ; rdfs:label "load in" ;', 't:Task-In a MMUT:TaskDefinition ;')
+    data = data.replace('MMUT:hasCommandSequence [ a rdf:Seq ; rdf:_1 "echo" ] ;\n    MMUT:hasEnvironment t:Env-Empty .',
+                        'MMUT:hasCommandSequence [ a rdf:Seq ; rdf:_1 "echo" ] .')
+    data = data.replace('t:KV-2 a MMUT:KeyValuePair ; MMUT:key "MODE" ;', 't:KV-2 a MMUT:KeyValuePair ;')
+    builder = ProcessPipelineBuilder(_load(data=data))
+    violations = builder.validate()
+    assert sorted(v["node"].rsplit("#", 1)[1] for v in violations) == ["Model-In", "Model-Out", "Transform"]
+    assert all(v["kind"] == "invalid_task_definition" for v in violations)
+    with pytest.raises(ValueError, match="nicht erstellt"):
+        builder.get_processes()
+
+
+@pytest.mark.parametrize("mmut_id", ["833eee11-12f7-400d-ada8-0733c37a5563", "8014cf0a-8d29-4cdb-9563-6b0e9fcf4b8f"])
+def test_validate_accepts_valid_models(data_dir, mmut_id):
+    mmut_path = data_dir / "mmut" / mmut_id
+    g = _load(paths=[mmut_path / f for f in os.listdir(mmut_path) if f.endswith(".ttl")])
+    assert ProcessPipelineBuilder(g).validate() == []
@@ -0,0 +1,91 @@
+import os
+import pytest
+from unittest.mock import patch
+from util.resolver import SecretsStore, Resolver, dependencies_current, register_resolver
+from util.pipeline_cache import PipelineCache
+
+
+@pytest.fixture()
+def secrets_file(tmp_path):
+    path = tmp_path / "secrets.yaml"
+    path.write_text("db:\n  password: s3cret\n")
+    yield path
+
+
+def test_secrets_loaded_once_and_reloaded_on_change(secrets_file):
+    store = SecretsStore(str(secrets_file))
+    with patch("util.resolver.yaml.safe_load", wraps=__import__("yaml").safe_load) as mock_load:
+        resolver = Resolver(store.load())
+        for _ in range(50):
+            assert resolver.resolve("pw={{resolve:secrets:db:password}}") == "pw=s3cret"
+        store.load()
+        assert mock_load.call_count == 1
+
+        secrets_file.write_text("db:\n  password: rotated\n")
+        os.utime(secrets_file, ns=(0, 10**18))
+        assert Resolver(store.load()).resolve("{{resolve:secrets:db:password}}") == "rotated"
+        assert mock_load.call_count == 2
+
+
+def test_several_placeholders_in_one_value():
+    resolver = Resolver({"db": {"user": "u", "password": "p"}})
+    value = "{{resolve:secrets:db:user}}:{{resolve:secrets:db:password}}@{{resolve:system:modelpath}}"
+    assert resolver.resolve(value) == "u:p@/share/models/"
+
+
+def test_unknown_or_missing_placeholders_raise():
+    resolver = Resolver({})
+    with pytest.raises(ValueError):
+        resolver.resolve("{{resolve:unknown:x}}")
+    with pytest.raises(ValueError):
+        resolver.resolve("{{resolve:secrets:db:password}}")
+
+
+def test_env_and_file_namespaces(tmp_path, monkeypatch):
+    token = tmp_path / "token"
+    token.write_text("abc\n")
+    monkeypatch.setenv("MMUT_TEST_VALUE", "42")
+
+    resolver = Resolver({})
+    with patch("util.resolver.get_config", return_value={"env_prefixes": ["MMUT_"], "file_root": str(tmp_path)}):
+        assert resolver.resolve("{{resolve:env:MMUT_TEST_VALUE}}") == "42"
+        assert resolver.resolve(f"{{{{resolve:file:{token}}}}}") == "abc"
+        assert resolver.resolve("{{resolve:file:token}}") == "abc"
+    assert dependencies_current(resolver.used)
+
+    monkeypatch.setenv("MMUT_TEST_VALUE", "43")
+    assert not dependencies_current(resolver.used)
+
+
+def test_env_and_file_restricted_to_allowlist(tmp_path, monkeypatch):
+    monkeypatch.setenv("API_PASSWORD", "s3cret")
+    resolver = Resolver({})
+    with patch("util.resolver.get_config", return_value={}):
+        with pytest.raises(ValueError):
+            resolver.resolve("{{resolve:env:API_PASSWORD}}")
+        with pytest.raises(ValueError):
+            resolver.resolve("{{resolve:file:/etc/hostname}}")
+    with patch("util.resolver.get_config", return_value={"env_prefixes": ["MMUT_"], "file_root": str(tmp_path)}):
+        with pytest.raises(ValueError):
+            resolver.resolve("{{resolve:env:API_PASSWORD}}")
+        with pytest.raises(ValueError):
+            resolver.resolve("{{resolve:file:../secrets.yaml}}")
+    assert resolver.used == {}
+
+
+def test_custom_namespace():
+    register_resolver("upper")(lambda resolver, argument: argument.upper())
+    assert Resolver({}).resolve("{{resolve:upper:abc}}") == "ABC"
+
+
+def test_pipeline_cache_misses_when_env_changed(tmp_path, monkeypatch):
+    cache = PipelineCache(cache_dir=str(tmp_path / "cache"))
+    monkeypatch.setenv("MMUT_TEST_VALUE", "1")
+    resolver = Resolver({})
+    with patch("util.resolver.get_config", return_value={"env_prefixes": ["MMUT_"]}):
+        resolver.resolve("{{resolve:env:MMUT_TEST_VALUE}}")
+    cache.put("key", ["processes"], resolver.used)
+
+    assert PipelineCache(cache_dir=cache.cache_dir).get("key") == ["processes"]
+    monkeypatch.setenv("MMUT_TEST_VALUE", "2")
+    assert cache.get("key") is None
@@ -0,0 +1,28 @@
+from unittest.mock import patch
+from scripts.run_transformations import run_batch
+from util.run_manager import RunQueueFull
+
+
+def test_batch_larger_than_the_queue_runs_every_id(capsys):
+    uuids = [f"mmut-{i}" for i in range(40)]
+    flows = []
+
+    def fake_flow(processes, flow_name, mmut_id=None):
+        flows.append(mmut_id)
+        return True
+
+    # 40 IDs > max_running + max_queued (Standard 32) eines normalen Managers
+    with patch("util.helper.get_config", return_value={"max_running": 2}), \
+            patch("util.run_manager.RunManager._compile_many",
+                  side_effect=lambda mmut_ids: [([], f"flow-{m}", None) for m in mmut_ids]), \
+            patch("util.trigger_process.run_docker_flow_sync", side_effect=fake_flow):
+        assert run_batch(uuids) == 0
+    assert sorted(flows) == sorted(uuids)
+    assert capsys.readouterr().out.count("completed") == 40
+
+
+def test_rejected_batch_exits_non_zero(capsys):
+    with patch("util.helper.get_config", return_value={}), \
+            patch("util.run_manager.RunManager.submit_batch", side_effect=RunQueueFull("Run queue is full")):
+        assert run_batch(["a", "b"]) == 2
+    assert "Run queue is full" in capsys.readouterr().err
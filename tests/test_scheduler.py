@@ -0,0 +1,78 @@
+import pytest
+from util.process_pipeline_builder import Process
+from util.scheduler import ReadyQueueScheduler, simulate_schedule, parse_capacity
+
+
+def _p(id, deps=None, image="img", resources=None):
+    return Process(id=id, name=id, image=image, command=[], env={}, dependencies=deps, resources=resources or {})
+
+
+def _wide_and_chain():
+    # vier kurze unabhängige Schritte vor einer langen Kette in topologischer Reihenfolge
+    return [
+        _p("s1"), _p("s2"), _p("s3"), _p("s4"),
+        _p("c1"), _p("c2", ["c1"]), _p("c3", ["c2"]),
+    ]
+
+
+def test_respects_dependencies_and_global_limit():
+    scheduler = ReadyQueueScheduler(_wide_and_chain(), max_concurrency=2, priority="fifo")
+    started = [p.id for p in scheduler.dispatchable()]
+    assert started == ["s1", "s2"]
+    assert scheduler.dispatchable() == []
+
+    scheduler.complete("s1")
+    assert [p.id for p in scheduler.dispatchable()] == ["s3"]
+
+
+def test_per_image_limit():
+    processes = [_p("a1", image="a"), _p("a2", image="a"), _p("b1", image="b")]
+    scheduler = ReadyQueueScheduler(processes, max_per_image={"a": 1})
+    assert sorted(p.id for p in scheduler.dispatchable()) == ["a1", "b1"]
+    scheduler.complete("a1")
+    assert [p.id for p in scheduler.dispatchable()] == ["a2"]
+
+
+def test_failure_skips_downstream_only():
+    scheduler = ReadyQueueScheduler(_wide_and_chain())
+    scheduler.dispatchable()
+    scheduler.complete("c1", success=False)
+    assert scheduler.skipped == {"c2", "c3"}
+    for process_id in ["s1", "s2", "s3", "s4"]:
+        scheduler.complete(process_id)
+    assert scheduler.finished()
+
+
+def test_unknown_dependency():
+    with pytest.raises(ValueError):
+        ReadyQueueScheduler([_p("a", ["missing"])])
+
+
+def test_critical_path_reduces_makespan():
+    processes = _wide_and_chain()
+    durations = {p.id: 1.0 for p in processes}
+
+    fifo = simulate_schedule(processes, durations, max_concurrency=2, priority="fifo")
+    critical_path = simulate_schedule(processes, durations, max_concurrency=2)
+    unbounded = simulate_schedule(processes, durations)
+
+    assert fifo == 5.0
+    assert critical_path == 4.0
+    assert unbounded == 3.0
+
+
+def test_capacity_admission():
+    def heavy(id, cpus, memory="1g"):
+        return _p(id, resources={"cpus": cpus, "mem_limit": memory})
+
+    processes = [heavy("a", 4), heavy("b", 3), heavy("c", 2), heavy("big", 16)]
+    scheduler = ReadyQueueScheduler(processes, priority="fifo", capacity=parse_capacity({"cpus": 8, "memory": "16g"}))
+    # a (4) und b (3) passen, c (2) würde 8 CPUs überschreiten
+    assert [p.id for p in scheduler.dispatchable()] == ["a", "b"]
+    scheduler.complete("a")
+    assert [p.id for p in scheduler.dispatchable()] == ["c"]
+    scheduler.complete("b")
+    scheduler.complete("c")
+    # größer als der Host: läuft allein
+    assert [p.id for p in scheduler.dispatchable()] == ["big"]
+    assert scheduler.used["cpus"] == 16
@@ -0,0 +1,56 @@
+import hashlib
+import os
+import zlib
+import pytest
+from pathlib import Path
+from unittest.mock import patch
+from scripts import shared_checksums
+from scripts.shared_checksums import Manifest, directory_report
+
+
+@pytest.fixture()
+def folder(tmp_path):
+    folder = tmp_path / "flow-a"
+    (folder / "models" / "sub").mkdir(parents=True)
+    (folder / "models" / "a.ttl").write_text("a" * 10)
+    (folder / "models" / "sub" / "b.bin").write_bytes(os.urandom(3 * 1024 * 1024))
+    (folder / "models" / "empty").write_bytes(b"")
+    yield folder
+
+
+def _reference_report(directory: Path):
+    """Sequential SHA-256 report as originally implemented."""
+    entries = []
+    for file_path in sorted(p for p in directory.rglob("*") if p.is_file()):
+        entries.append((file_path.relative_to(directory).as_posix(), hashlib.sha256(file_path.read_bytes()).hexdigest()))
+    aggregate = hashlib.sha256()
+    for rel_path, file_hash in entries:
+        aggregate.update(f"{rel_path}\t{file_hash}\n".encode("utf-8"))
+    return entries, aggregate.hexdigest()
+
+
+def test_sha256_aggregate_unchanged(folder, tmp_path):
+    assert directory_report(folder, jobs=4) == _reference_report(folder)
+    manifest = Manifest(tmp_path / "manifest.json")
+    assert directory_report(folder, jobs=4, manifest=manifest) == _reference_report(folder)
+
+
+def test_manifest_skips_unchanged_files(folder, tmp_path):
+    manifest_path = tmp_path / "manifest.json"
+    manifest = Manifest(manifest_path)
+    first = directory_report(folder, manifest=manifest)
+    manifest.save()
+
+    (folder / "models" / "a.ttl").write_text("changed!!!")
+    with patch("scripts.shared_checksums.hash_file", wraps=shared_checksums.hash_file) as mock_hash:
+        second = directory_report(folder, manifest=Manifest(manifest_path))
+    assert [call.args[0].name for call in mock_hash.call_args_list] == ["a.ttl"]
+    assert second != first
+    assert second == _reference_report(folder)
+
+
+def test_crc32_mode(folder):
+    entries, aggregate = directory_report(folder, algorithm="crc32")
+    assert directory_report(folder, algorithm="crc32") == (entries, aggregate)
+    assert dict(entries)["models/sub/b.bin"] == f"{zlib.crc32((folder / 'models' / 'sub' / 'b.bin').read_bytes()):08x}"
+    assert aggregate != directory_report(folder)[1]
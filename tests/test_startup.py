@@ -0,0 +1,58 @@
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Dürfen beim Start von API und CLI nicht geladen werden (erst bei Bedarf bzw. im Warm-up)
+HEAVY_MODULES = ("prefect", "rdflib", "networkx", "docker", "obse", "py_mmut_rdf")
+
+MODULES = ("api", "util.trigger_process")
+
+# Importzeit von api ohne FastAPI, relativ zu "import fastapi" im selben Interpreter.
+# Aufgezeichnet: etwa 0.18 (api ohne Prefect, docker-py und RDF-Stack); großzügiger Spielraum.
+IMPORT_BUDGET = 0.5
+
+
+def _loaded_heavy_modules(module: str) -> list:
+    # frischer Interpreter, damit andere Tests nichts vorab geladen haben
+    code = (f"import sys, {module}; "
+            f"print(' '.join(sorted({{name.split('.')[0] for name in sys.modules}} & set({HEAVY_MODULES!r}))))")
+    result = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True)
+    return result.stdout.split()
+
+
+@pytest.mark.parametrize("module", MODULES)
+def test_startup_skips_heavy_modules(module):
+    loaded = _loaded_heavy_modules(module)
+    assert loaded == [], f"{module} imports {loaded} at startup"
+
+
+def _top_level_import_times(code: str) -> dict:
+    """Cumulative -X importtime microseconds of the top-level imports of code."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=PROJECT_ROOT,
+                            capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \| (\S+)$", line)
+        if match:
+            times[match.group(2)] = times.get(match.group(2), 0) + int(match.group(1))
+    return times
+
+
+def test_api_import_time_within_budget():
+    # fastapi zuerst: die Zeit von api enthält dann nur dessen eigene Importe
+    times = _top_level_import_times("import fastapi, api")
+    ratio = times["api"] / times["fastapi"]
+    assert ratio < IMPORT_BUDGET, f"import api takes {ratio:.2f}x the time of import fastapi"
+
+
+def test_warm_up_loads_pipeline_dependencies():
+    from util import processes
+    from util.warmup import start_warm_up
+    start_warm_up().join(60)
+    assert processes._base_graph is not None
+    assert "prefect" in sys.modules
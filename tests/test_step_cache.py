@@ -0,0 +1,139 @@
+import json
+import os
+from util.docker_task import docker_task
+from util.step_cache import OutputWindow, StepCache
+from fake_docker import FakeDockerClient, patched_docker
+
+IMAGES = {"loader": "sha256:aaa", "transform": "sha256:bbb"}
+
+
+class Pipeline:
+    """Runs docker_task's body outside Prefect for a chain source -> derived."""
+
+    def __init__(self, tmp_path):
+        self.tmp_path = tmp_path
+        self.source_content = "v1"
+        self.runs = 0
+        self.cache = StepCache(cache_dir=str(tmp_path / "cache"))
+        self.client = FakeDockerClient(on_run=self._on_run, images=IMAGES)
+
+    def _on_run(self, container):
+        if container.name == "source":
+            (self.models / "source.ttl").write_text(self.source_content)
+        else:
+            (self.models / "derived.ttl").write_text((self.models / "source.ttl").read_text().upper())
+
+    def run(self, reuse_derived=False):
+        self.runs += 1
+        self.models = self.tmp_path / f"flow-{self.runs}" / "models"
+        self.models.mkdir(parents=True)
+        with patched_docker(self.client, step_cache=self.cache, flow_run_name=str(self.runs)):
+            if reuse_derived:
+                # Teillauf: nur die Ausgaben des letzten Laufs übernehmen
+                return None, docker_task.fn({**self._params("derived", "transform", {}), "reuse_outputs": True})
+            source = docker_task.fn(self._params("source", "loader", {}))
+            derived = docker_task.fn(self._params("derived", "transform", {"source": source}))
+        return source, derived
+
+    def _params(self, name, image, upstream):
+        return {"name": name, "image": image, "command": ["run", name], "env": {}, "upstream": upstream,
+                "volumes": {"models": "/host/models"}, "run_dirs": {"models": str(self.models)}}
+
+    def started(self):
+        return [c.name for c in self.client.started]
+
+
+def test_unchanged_inputs_restore_cached_outputs(tmp_path):
+    pipeline = Pipeline(tmp_path)
+    pipeline.run()
+    assert pipeline.started() == ["source", "derived"]
+
+    _, derived = pipeline.run()
+    # die Quelle läuft immer, der abgeleitete Schritt kommt aus dem Cache
+    assert pipeline.started() == ["source", "derived", "source"]
+    assert derived.name == "Cached"
+    assert (pipeline.models / "derived.ttl").read_text() == "V1"
+
+
+def test_changed_input_reruns_downstream(tmp_path):
+    pipeline = Pipeline(tmp_path)
+    pipeline.run()
+    pipeline.source_content = "v2"
+    _, derived = pipeline.run()
+    assert pipeline.started() == ["source", "derived", "source", "derived"]
+    assert isinstance(derived, str)
+    assert (pipeline.models / "derived.ttl").read_text() == "V2"
+
+
+def test_key_covers_image_command_env_and_upstream():
+    cache = StepCache(cache_dir="unused")
+    params = {"command": ["a"], "env": {"X": "1"}, "upstream": {"dep": "d1"}}
+    key = cache.key("sha256:1", params)
+    assert cache.key("sha256:2", params) != key
+    assert cache.key("sha256:1", {**params, "command": ["b"]}) != key
+    assert cache.key("sha256:1", {**params, "env": {"X": "2"}}) != key
+    assert cache.key("sha256:1", {**params, "upstream": {"dep": "d2"}}) != key
+    assert cache.key("sha256:1", {**params, "upstream": {"dep": None}}) is None
+    assert cache.key(None, params) is None
+    # Quellen nur mit cache_sources
+    assert cache.key("sha256:1", {**params, "upstream": {}}) is None
+    assert StepCache(cache_dir="unused", cache_sources=True).key("sha256:1", {**params, "upstream": {}}) is not None
+
+
+def test_reuse_outputs_restores_latest_outputs(tmp_path):
+    pipeline = Pipeline(tmp_path)
+    _, derived = pipeline.run(reuse_derived=True)
+    assert derived.is_failed()
+
+    pipeline.run()
+    _, derived = pipeline.run(reuse_derived=True)
+    assert pipeline.started() == ["source", "derived"]
+    assert derived.name == "Cached"
+    assert (pipeline.models / "derived.ttl").read_text() == "V1"
+
+
+def test_overlapping_steps_are_not_attributed(tmp_path):
+    cache = StepCache(cache_dir=str(tmp_path / "cache"))
+    models = tmp_path / "models"
+    models.mkdir()
+    first, second = OutputWindow(str(models)), OutputWindow(str(models))
+    (models / "a.ttl").write_text("a")
+    (models / "b.ttl").write_text("b")
+    # beide liefen gleichzeitig: wer was geschrieben hat, ist unklar
+    assert cache.store("first", first) is None
+    assert cache.store("second", second) is None
+    assert not (tmp_path / "cache" / "first").exists()
+
+    alone = OutputWindow(str(models))
+    (models / "c.ttl").write_text("c")
+    assert cache.store("alone", alone) is not None
+    with open(tmp_path / "cache" / "alone" / "manifest.json") as f:
+        assert [rel_path for rel_path, _ in json.load(f)["outputs"]] == ["c.ttl"]
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = StepCache(cache_dir=str(tmp_path / "cache"), max_entries=2, max_bytes=25)
+    models = tmp_path / "models"
+    models.mkdir()
+
+    def store(key, content, mtime):
+        window = OutputWindow(str(models))
+        (models / f"{key}.ttl").write_text(content)
+        cache.store(key, window)
+        os.utime(tmp_path / "cache" / key / "manifest.json", ns=(mtime, mtime))
+
+    store("a", "a" * 10, 1)
+    store("b", "b" * 10, 2)
+    # Wiederherstellen zählt als Verwendung: danach ist b der älteste Eintrag
+    assert cache.restore("a", str(tmp_path / "restored")) is not None
+    store("c", "c" * 10, 3)
+    assert sorted(os.listdir(tmp_path / "cache")) == ["a", "c"]
+
+    # max_bytes: ein großer Eintrag verdrängt auch den gerade verwendeten
+    store("d", "d" * 20, 4)
+    assert sorted(os.listdir(tmp_path / "cache")) == ["d"]
+
+    window = OutputWindow(str(models))
+    (models / "e.ttl").write_text("e" * 30)
+    assert cache.store("e", window) is not None
+    assert sorted(os.listdir(tmp_path / "cache")) == ["d"]
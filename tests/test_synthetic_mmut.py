@@ -0,0 +1,12 @@
+import pytest
+from benchmarks.synthetic_mmut import SHAPES, write_mmut
+from util.processes import compile_processes
+
+
+@pytest.mark.parametrize("shape", SHAPES)
+def test_synthetic_models_compile(tmp_path, shape):
+    mmut_path, nodes, edges = write_mmut(tmp_path, shape, 40)
+    processes = compile_processes(str(mmut_path))
+    assert len(processes) == nodes
+    assert sum(len(p.dependencies or []) for p in processes) == edges
+    assert processes[-1].env["OUT"].startswith("/share/models/")
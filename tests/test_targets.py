@@ -0,0 +1,32 @@
+import pytest
+from util.process_pipeline_builder import Process
+from util.targets import select_targets
+
+
+def _p(id, deps=None):
+    return Process(id, id, "img", ["run", id], {}, deps)
+
+
+# load-a -> t1 -> m1 -> t2 -> out ; load-b -> t3 -> side
+PROCESSES = [_p("load-a"), _p("load-b"), _p("t1", ["load-a"]), _p("t3", ["load-b"]), _p("m1", ["t1"]),
+             _p("side", ["t3"]), _p("t2", ["m1"]), _p("out", ["t2"])]
+
+
+def test_keeps_ancestor_closure_in_order():
+    selected = select_targets(PROCESSES, ["m1"])
+    assert [p.id for p in selected] == ["load-a", "t1", "m1"]
+    assert selected == PROCESSES[0:1] + PROCESSES[2:3] + PROCESSES[4:5]
+
+    assert [p.id for p in select_targets(PROCESSES, ["out", "side"])] == [p.id for p in PROCESSES]
+
+
+def test_stops_at_existing_outputs():
+    selected = select_targets(PROCESSES, ["out", "m1"], stop=lambda p: p.id in ("m1", "t1", "t2"))
+    # Ziele laufen immer; t1 und t2 übernehmen ihre Ausgaben, load-a wird nicht mehr gebraucht
+    assert [(p.id, p.dependencies, p.reuse_outputs) for p in selected] == [
+        ("t1", None, True), ("m1", ["t1"], False), ("t2", None, True), ("out", ["t2"], False)]
+
+
+def test_unknown_target_raises():
+    with pytest.raises(ValueError, match="missing"):
+        select_targets(PROCESSES, ["out", "missing"])
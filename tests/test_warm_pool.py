@@ -0,0 +1,100 @@
+import logging
+import time
+from util.metrics import Metrics
+from util.warm_pool import WarmPool
+from fake_docker import FakeDockerClient
+
+OPTIONS = {"volumes": {"/runs/flow-x/models": {"bind": "/share/models", "mode": "rw"}}}
+LOG_OPTIONS = {"batch_interval": 0.0}
+
+
+def _run(pool, client, command, options=OPTIONS, metrics=None, run="x"):
+    return pool.run(client, run, None, "img", command, {"A": "1"}, options, logging.getLogger("test"),
+                    metrics or Metrics(enabled=False), {"image": "img"}, LOG_OPTIONS)
+
+
+def test_steps_share_a_warm_container():
+    client = FakeDockerClient(images={"img": "sha256:x"}, log_lines=[b"hello\n"])
+    metrics = Metrics()
+    pool = WarmPool()
+    try:
+        assert _run(pool, client, ["echo", "1"], metrics=metrics) == (0, ["hello"])
+        assert _run(pool, client, ["echo", "2"], metrics=metrics) == (0, ["hello"])
+    finally:
+        pool.close()
+
+    assert len(client.started) == 1
+    assert client.started[0].kwargs["entrypoint"] == ["sleep", "infinity"]
+    assert [e["cmd"] for e in client.api.execs.values()] == [["echo", "1"], ["echo", "2"]]
+    assert b'mmut_events_total{event="warm_reused"} 1.0' in metrics.render()
+    # beim Schließen werden die Container im Hintergrund entfernt
+    assert client.started[0].removed
+
+
+def test_command_is_prefixed_with_image_entrypoint():
+    client = FakeDockerClient(images={"img": "sha256:x"})
+    pool = WarmPool()
+    try:
+        client.images.get = lambda name: type("Image", (), {"attrs": {"Config": {"Entrypoint": ["python"]}}})()
+        _run(pool, client, ["script.py"])
+    finally:
+        pool.close()
+    assert list(client.api.execs.values())[0]["cmd"] == ["python", "script.py"]
+
+
+def test_workers_are_recycled_after_max_uses_and_failures():
+    client = FakeDockerClient(images={"img": "sha256:x"}, exec_exit_codes={"false": 1})
+    pool = WarmPool(max_uses=2)
+    try:
+        _run(pool, client, ["true"])
+        _run(pool, client, ["true"])
+        assert _run(pool, client, ["false"])[0] == 1
+        _run(pool, client, ["true"])
+    finally:
+        pool.close()
+    # 2 Schritte im ersten, der fehlgeschlagene im zweiten, dann ein neuer
+    assert len(client.started) == 3
+    assert all(container.removed for container in client.started)
+
+
+def test_different_options_use_different_workers():
+    client = FakeDockerClient(images={"img": "sha256:x"})
+    pool = WarmPool()
+    try:
+        _run(pool, client, ["true"])
+        _run(pool, client, ["true"], options={**OPTIONS, "mem_limit": "1g"})
+    finally:
+        pool.close()
+    assert len(client.started) == 2
+
+
+def test_workers_are_retired_when_their_run_finishes():
+    client = FakeDockerClient(images={"img": "sha256:x"})
+    pool = WarmPool()
+    try:
+        _run(pool, client, ["true"])
+        _run(pool, client, ["true"], run="y")
+        pool.retire_run("x")
+        deadline = time.monotonic() + 2.0
+        while not client.started[0].removed and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert client.started[0].removed
+        assert not client.started[1].removed
+    finally:
+        pool.close()
+    assert len(client.started) == 2
+
+
+def test_idle_workers_are_reaped():
+    client = FakeDockerClient(images={"img": "sha256:x"})
+    pool = WarmPool(idle_timeout=0.1)
+    try:
+        _run(pool, client, ["true"])
+        deadline = time.monotonic() + 2.0
+        while not client.started[0].removed and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert client.started[0].removed
+        _run(pool, client, ["true"])
+    finally:
+        pool.close()
+    assert len(client.started) == 2
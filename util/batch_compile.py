@@ -0,0 +1,48 @@
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+from . import processes, trigger_process
+from .pipeline_cache import PipelineCache
+
+logger = logging.getLogger(__name__)
+
+
+def _init_worker(cache_dir: str):
+    # Basis-Ontologie einmal je Worker parsen, nicht je MMUT
+    logging.disable(logging.INFO)
+    processes.get_base_graph()
+    # derselbe Pipeline-Cache wie im aufrufenden Prozess
+    processes._pipeline_cache = PipelineCache(cache_dir=cache_dir)
+
+
+def compile_one(mmut_id: str, mmut_dir: Optional[str] = None) -> Tuple[Optional[list], Optional[str], Optional[str]]:
+    """prepare_run() that returns (processes, flow_name, error) instead of raising."""
+    try:
+        compiled, flow_name = trigger_process.prepare_run(mmut_id, mmut_dir)
+        return compiled, flow_name, None
+    except Exception as e:
+        return None, None, str(e)
+
+
+def create_pool(workers: int) -> ProcessPoolExecutor:
+    """Worker processes for compile_batch(), keep one for the life of the caller.
+
+    Each worker parses the base ontology once and uses the pipeline cache
+    directory of the calling process. Workers are spawned (not forked),
+    since the API process runs threads.
+    """
+    return ProcessPoolExecutor(max_workers=max(1, workers),
+                               mp_context=multiprocessing.get_context("spawn"),
+                               initializer=_init_worker,
+                               initargs=(processes.get_pipeline_cache().cache_dir,))
+
+
+def compile_batch(pool: ProcessPoolExecutor, mmut_ids: List[str], mmut_dir: Optional[str] = None,
+                  chunksize: int = 1) -> list:
+    """Compile many MMUTs in the pool's worker processes, results in the order of mmut_ids.
+
+    Unchanged pipelines come from the shared on-disk pipeline cache.
+    """
+    mmut_dir = str(mmut_dir or trigger_process.get_mmut_dir())
+    return list(pool.map(compile_one, mmut_ids, [mmut_dir] * len(mmut_ids), chunksize=chunksize))
@@ -0,0 +1,49 @@
+import hashlib
+import mmap
+import os
+import zlib
+from pathlib import Path
+
+_CHUNK = 8 * 1024 * 1024
+
+
+class _Crc32:
+    """zlib.crc32 behind the update/hexdigest interface of hashlib."""
+
+    def __init__(self):
+        self._value = 0
+
+    def update(self, data):
+        self._value = zlib.crc32(data, self._value)
+
+    def hexdigest(self) -> str:
+        return f"{self._value:08x}"
+
+
+ALGORITHMS = {
+    "sha256": hashlib.sha256,
+    # etwa doppelt so schnell wie sha256 (auch mit SHA-NI), nur zur Änderungserkennung
+    "crc32": _Crc32,
+}
+
+
+def hash_file(file_path: Path, algorithm: str = "sha256") -> str:
+    """Hex digest of a file, read through mmap in 8 MiB chunks."""
+    digest = ALGORITHMS[algorithm]()
+    with open(file_path, "rb") as handle:
+        size = os.fstat(handle.fileno()).st_size
+        if size == 0:
+            return digest.hexdigest()
+        # hashlib und zlib geben bei großen Puffern den GIL frei, daher parallelisierbar
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                for offset in range(0, size, _CHUNK):
+                    digest.update(view[offset:offset + _CHUNK])
+            finally:
+                view.release()
+    return digest.hexdigest()
+
+
+def sha256_file(file_path: Path) -> str:
+    return hash_file(file_path, "sha256")
@@ -0,0 +1,33 @@
+import threading
+from contextlib import nullcontext
+from .helper import get_config
+
+
+class ContainerBudget:
+    """Process-wide limit on running containers across all flow runs."""
+
+    def __init__(self, max_containers: int):
+        self.max_containers = max_containers
+        self._semaphore = threading.BoundedSemaphore(max_containers)
+
+    def __enter__(self):
+        self._semaphore.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._semaphore.release()
+        return False
+
+
+_budget = None
+_budget_lock = threading.Lock()
+
+
+def get_container_budget():
+    """Budget from max_containers in config/runs.yaml, a no-op context if unset."""
+    global _budget
+    with _budget_lock:
+        if _budget is None:
+            max_containers = get_config("runs").get("max_containers")
+            _budget = ContainerBudget(max_containers) if max_containers else nullcontext()
+        return _budget
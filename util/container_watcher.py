@@ -0,0 +1,110 @@
+import threading
+import logging
+from typing import Optional
+from .docker_clients import get_docker_client
+
+logger = logging.getLogger(__name__)
+
+_ACTIVE_STATES = ('created', 'running', 'restarting', 'paused')
+
+
+class _Waiter:
+    def __init__(self):
+        self.event = threading.Event()
+        self.exit_code = None
+
+
+class ContainerWatcher:
+    """Wait for container exits using one shared Docker events stream.
+
+    A single background thread follows the 'die' events of the daemon and
+    wakes up the task waiting for that container. If the stream cannot be
+    opened or breaks, waiting falls back to container.wait().
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self._lock = threading.Lock()
+        self._waiters = {}
+        self._stream = None
+        self._thread = None
+
+    def _ensure_listening(self) -> bool:
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return True
+            try:
+                # der Stream ist nach diesem Aufruf beim Daemon registriert
+                self._stream = self.client.events(decode=True, filters={'type': 'container', 'event': 'die'})
+            except Exception as e:
+                logger.warning(f"Docker events stream not available, using container.wait(): {e}")
+                return False
+            self._thread = threading.Thread(target=self._listen, args=(self._stream,), name="container-watcher")
+            self._thread.daemon = True
+            self._thread.start()
+            return True
+
+    def _listen(self, stream):
+        try:
+            for event in stream:
+                container_id = event.get('id') or event.get('Actor', {}).get('ID')
+                with self._lock:
+                    waiter = self._waiters.get(container_id)
+                if waiter is None:
+                    continue
+                exit_code = event.get('Actor', {}).get('Attributes', {}).get('exitCode')
+                waiter.exit_code = int(exit_code) if exit_code is not None else None
+                waiter.event.set()
+        except Exception as e:
+            logger.warning(f"Docker events stream closed: {e}")
+        finally:
+            with self._lock:
+                if self._stream is stream:
+                    self._stream = None
+                waiters = list(self._waiters.values())
+            # Wartende aufwecken, damit sie auf container.wait() ausweichen
+            for waiter in waiters:
+                waiter.event.set()
+
+    def wait(self, container, timeout: Optional[float] = None) -> int:
+        """Block until the container has stopped and return its exit code."""
+        waiter = _Waiter()
+        with self._lock:
+            self._waiters[container.id] = waiter
+        try:
+            if self._ensure_listening():
+                # der Container kann beendet sein, bevor der Stream lief
+                container.reload()
+                if container.status not in _ACTIVE_STATES:
+                    return container.attrs['State']['ExitCode']
+
+                if not waiter.event.wait(timeout):
+                    raise TimeoutError(f"Container {container.id} still running after {timeout}s")
+                if waiter.exit_code is not None:
+                    return waiter.exit_code
+
+            return container.wait(timeout=timeout)['StatusCode']
+        finally:
+            with self._lock:
+                self._waiters.pop(container.id, None)
+
+    def close(self):
+        with self._lock:
+            stream = self._stream
+            self._stream = None
+        if stream is not None and hasattr(stream, 'close'):
+            stream.close()
+
+
+_watchers = {}
+_watcher_lock = threading.Lock()
+
+
+def get_container_watcher(base_url: Optional[str] = None) -> ContainerWatcher:
+    """Process-wide watcher per daemon, shared by all docker tasks."""
+    with _watcher_lock:
+        watcher = _watchers.get(base_url)
+        if watcher is None:
+            watcher = ContainerWatcher(get_docker_client(base_url))
+            _watchers[base_url] = watcher
+        return watcher
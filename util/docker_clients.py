@@ -0,0 +1,74 @@
+import threading
+import logging
+from typing import TYPE_CHECKING, Optional
+from .helper import get_config
+
+if TYPE_CHECKING:
+    from docker import DockerClient
+
+logger = logging.getLogger(__name__)
+
+_clients = {}
+_health_clients = {}
+_lock = threading.Lock()
+_health_lock = threading.Lock()
+
+
+def _create_client(base_url: Optional[str], timeout: Optional[float] = None) -> "DockerClient":
+    # Import lazily, docker-py (requests, urllib3) is only needed on first use
+    from docker import DockerClient
+
+    config = get_config("docker")
+    return DockerClient(
+        base_url=base_url,
+        version=config.get("api_version", "auto"),
+        timeout=timeout or config.get("timeout", 120),
+        max_pool_size=config.get("max_pool_size", 32),
+    )
+
+
+def get_docker_client(base_url: Optional[str] = None) -> "DockerClient":
+    """Shared DockerClient per daemon URL (None = local socket).
+
+    The client and its connection pool are shared by all tasks and runs
+    in the process; requests' connection pool is safe to use from the
+    Prefect task threads. Callers must not close the returned client.
+    """
+    with _lock:
+        client = _clients.get(base_url)
+        if client is None:
+            client = _create_client(base_url)
+            _clients[base_url] = client
+        return client
+
+
+def ping_docker(base_url: Optional[str] = None) -> bool:
+    """Check the daemon with a short timeout (ping_timeout in config/docker.yaml).
+
+    The ping uses a client of its own, so a slow or failing daemon never
+    closes the client shared with running steps.
+    """
+    try:
+        # eigenes Lock: ein hängender Daemon blockiert nicht get_docker_client()
+        with _health_lock:
+            client = _health_clients.get(base_url)
+            if client is None:
+                client = _create_client(base_url, timeout=get_config("docker").get("ping_timeout", 5))
+                _health_clients[base_url] = client
+        return bool(client.ping())
+    except Exception as e:
+        logger.warning(f"Docker ping failed for {base_url or 'local socket'}: {e}")
+        with _health_lock:
+            client = _health_clients.pop(base_url, None)
+        if client is not None:
+            client.close()
+        return False
+
+
+def close_docker_clients():
+    with _lock, _health_lock:
+        clients = list(_clients.values()) + list(_health_clients.values())
+        _clients.clear()
+        _health_clients.clear()
+    for client in clients:
+        client.close()
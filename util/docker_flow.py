@@ -1,16 +1,18 @@
-from typing import List
-from prefect import flow, get_run_logger
-from .helper import to_valid_container_name
+from typing import Dict, List, Optional, Union
+from prefect import flow, get_run_logger, runtime
+from prefect.futures import as_completed
 from .docker_task import docker_task
-from .process_pipeline_builder import Process
+from .flow_setup import FlowSetup, step_params, setup_flow, run_ready_queue
+from .process_pipeline_builder import Process, serialize_processes, deserialize_processes
 
 
-@flow
-def docker_flow(processes: List[Process]):
+def _submit(process: Process, upstream: dict, run_params: dict, digests: dict, wait_for=None):
+    return docker_task.with_options(name=process.name).submit(
+        step_params(process, upstream, run_params, digests), wait_for=wait_for or [])
 
-    logger = get_run_logger()
-    logger.info("Starte den Flow...")
 
+def _run_all(processes: List[Process], run_params: dict, digests: dict, logger):
+    """Submit every task at once and let Prefect resolve wait_for."""
     tasks = {}
 
     for process in processes:
@@ -21,21 +23,67 @@ def docker_flow(processes: List[Process]):
                     raise ValueError(f"Dependency {dep} not found in {tasks.keys()}.")
                 wait_for.append(tasks[dep])
 
-        tasks[process.id] = docker_task.with_options(name=process.name).submit({
-            "name": to_valid_container_name(process.name),
-            "image": process.image,
-            "command": process.command,
-            "env": process.env
-        }, wait_for=wait_for)
+        upstream = {dep: tasks[dep] for dep in (process.dependencies or [])}
+        tasks[process.id] = _submit(process, upstream, run_params, digests, wait_for)
 
     # Warten, bis alle Tasks fertig sind
     for task_id, task_x in tasks.items():
         logger.info(f"Waiting for task {task_id} to complete...")
         task_x.result()
 
+
+def _outcome(future):
+    future.wait()  # übernimmt den finalen Zustand des Task-Runs
+    if future.state.is_completed():
+        return future.result(), None
+    return None, future.state.message or f"Task run ended in state {future.state.name}"
+
+
+def _run_ready_queue(processes: List[Process], setup: FlowSetup, logger):
+    """Submit tasks from a ready queue, bounded by the configured limits."""
+    futures = []
+
+    def submit(process: Process, params: dict):
+        future = docker_task.with_options(name=process.name).submit(params)
+        futures.append(future)
+        return future
+
+    run_ready_queue(processes, setup, logger, submit,
+                    wait_any=lambda running: [next(as_completed(running))], outcome=_outcome)
+
+    # Fehler wie im Modus ohne Scheduler weiterreichen
+    for future in futures:
+        future.result()
+
+
+@flow
+def docker_flow(processes: Union[dict, List[Process]],
+                max_concurrency: Optional[int] = None,
+                max_per_image: Union[int, Dict[str, int], None] = None,
+                mmut_id: Optional[str] = None):
+
+    logger = get_run_logger()
+    logger.info("Starte den Flow...")
+
+    # Kompaktes Format aus run_docker_flow (siehe serialize_processes)
+    if isinstance(processes, dict):
+        processes = deserialize_processes(processes)
+
+    setup = setup_flow(processes, runtime.flow_run.name, logger,
+                       max_concurrency=max_concurrency, max_per_image=max_per_image, mmut_id=mmut_id)
+
+    try:
+        if not setup.bounded:
+            _run_all(processes, setup.run_params, setup.digests, logger)
+        else:
+            logger.info(f"Ready-queue scheduler: {setup.scheduler_options}")
+            _run_ready_queue(processes, setup, logger)
+    finally:
+        setup.finish()
+
     logger.info("Flow abgeschlossen.")
 
 
-def run_docker_flow(processes, flow_name: str):
+def run_docker_flow(processes: List[Process], flow_name: str, mmut_id: Optional[str] = None):
     flow = docker_flow.with_options(name=flow_name)
-    flow(processes)
+    flow(serialize_processes(processes), mmut_id=mmut_id)
@@ -0,0 +1,178 @@
+import os
+from typing import Optional
+from .helper import get_config
+from .container_watcher import get_container_watcher
+from .docker_clients import get_docker_client
+from .log_stream import follow_logs
+from .step_cache import OutputWindow, get_step_cache, get_image_digest
+from .metrics import get_metrics
+from .container_budget import get_container_budget
+from .warm_pool import get_warm_pool
+
+
+class StepResult:
+    """Outcome of a step: status is "completed", "cached" or "failed".
+
+    data is the digest of the step's outputs when the step cache is
+    enabled; downstream steps receive it as their upstream value.
+    """
+
+    def __init__(self, status: str, data: Optional[str] = None, message: str = ""):
+        self.status = status
+        self.data = data
+        self.message = message
+
+
+def _resource_options(resources: dict) -> dict:
+    """Limits of a step as keyword arguments for containers.run."""
+    options = {}
+    if resources.get("cpus") is not None:
+        options["nano_cpus"] = int(float(resources["cpus"]) * 1e9)
+    if resources.get("mem_limit") is not None:
+        options["mem_limit"] = resources["mem_limit"]
+    if resources.get("cpuset_cpus") is not None:
+        options["cpuset_cpus"] = str(resources["cpuset_cpus"])
+    if resources.get("pids_limit") is not None:
+        options["pids_limit"] = int(resources["pids_limit"])
+    return options
+
+
+def _container_options(params: dict) -> dict:
+    """Mounts and limits of a step as keyword arguments for containers.run."""
+    return {
+        'volumes': {
+            params['volumes']['models']: {
+                'bind': '/share/models',
+                'mode': 'rw'  # oder 'ro' für read-only
+            }
+        },
+        **_resource_options(params.get('resources') or {}),
+    }
+
+
+def _log_options(params: dict) -> dict:
+    """LogFollower options from config/logs.yaml."""
+    log_config = get_config("logs")
+    spool_path = None
+    if log_config.get("spool", False) and 'logs' in params['run_dirs']:
+        spool_path = os.path.join(params['run_dirs']['logs'], f"{params['name']}.log")
+    return {"batch_lines": log_config.get("batch_lines", 200),
+            "batch_interval": log_config.get("batch_interval", 2.0),
+            "tail_lines": log_config.get("tail_lines", 1000),
+            "spool_path": spool_path}
+
+
+def _run_container(client, params: dict, logger, metrics, labels: dict):
+    """Start the step's container, follow its logs and remove it, returns (exit_code, tail)."""
+    # Container starten (create + start)
+    with metrics.span("start", **labels):
+        container = client.containers.run(
+            image=params['image'],
+            name=params['name'],
+            detach=True,
+            remove=False,
+            command=params['command'],
+            auto_remove=False,  # Nicht automatisch entfernen, damit wir Logs sehen können
+            environment=params['env'],
+            **_container_options(params)
+        )
+
+    try:
+        # Logs live verfolgen, bis der Container endet
+        title = ' container logs '
+        cnt = 20
+        logger.info(cnt * '-' + title + cnt * '-')
+        # läuft bis zum Ende des Containers, entspricht also etwa der Laufzeit
+        with metrics.span("logs", **labels):
+            tail = follow_logs(container, logger, **_log_options(params))
+        logger.info((2 * cnt + len(title)) * '=')
+
+        # Auf das Ende warten (Docker-Events statt Polling)
+        with metrics.span("wait", **labels):
+            exit_code = get_container_watcher(params.get('docker_host')).wait(container)
+        logger.info("Container ist nicht mehr aktiv.")
+        logger.info(f"Container beendete sich mit Exit-Code: {exit_code}")
+    finally:
+        # Container stoppen und entfernen, auch bei Fehlern: der Name ist je Prozess fest
+        logger.info(f"Container {params['name']} wird entfernt.")
+        with metrics.span("remove", **labels):
+            container.remove(force=True)
+
+    return exit_code, tail
+
+
+def _reuse_outputs(step_cache, params: dict, logger, metrics) -> StepResult:
+    key = step_cache.latest(step_cache.output_ref(params)) if step_cache is not None else None
+    digest = step_cache.restore(key, params['run_dirs']['models']) if key is not None else None
+    if digest is None:
+        metrics.count("step_failed")
+        return StepResult("failed", message=f"No stored outputs of step {params['name']} to reuse")
+    logger.info(f"Step {params['name']} reuses the outputs of an earlier run.")
+    metrics.count("step_cached")
+    return StepResult("cached", data=digest, message="Reused outputs of an earlier run")
+
+
+def run_step(params: dict, logger, flow_run_name: str) -> StepResult:
+    """Run one step (cache lookup, container, cache store) without any orchestrator."""
+    logger.info(f"Flow Run: {flow_run_name}")
+    logger.info(f"Starte Container {params['name']} ...")
+    logger.info(f"Image {params['image']}")
+    logger.info(f"Command {params['command']}")
+
+    # docker_host: vom Host-Pool gewählter Daemon, None = lokaler Socket
+    client = get_docker_client(params.get('docker_host'))
+    metrics = get_metrics()
+    labels = {"image": params['image'], "mmut": params.get('mmut', "")}
+
+    step_cache = get_step_cache()
+    if params.get('reuse_outputs'):
+        # Teillauf: Ausgaben des letzten Laufs dieses Schritts übernehmen (siehe util/targets.py)
+        return _reuse_outputs(step_cache, params, logger, metrics)
+
+    # Schritt überspringen, wenn Image, Kommando, Umgebung und Eingaben unverändert sind
+    if step_cache is not None:
+        models_folder = params['run_dirs']['models']
+        image_digest = params.get('image_digest') or get_image_digest(client, params['image'])
+        cache_key = step_cache.key(image_digest, params)
+        if cache_key is not None:
+            with metrics.span("cache_restore", **labels):
+                digest = step_cache.restore(cache_key, models_folder)
+            if digest is not None:
+                logger.info(f"Step {params['name']} is unchanged, restored cached outputs.")
+                metrics.count("step_cached")
+                return StepResult("cached", data=digest, message="Restored cached outputs")
+
+    window = None
+    try:
+        # Container starten, Logs verfolgen, entfernen (begrenzt durch max_containers aus config/runs.yaml)
+        warm_pool = get_warm_pool()
+        with get_container_budget():
+            if step_cache is not None:
+                # erst hier, das Warten auf einen Platz zählt nicht als Schreibzugriff
+                window = OutputWindow(models_folder)
+            if warm_pool is not None and warm_pool.accepts(params['image']):
+                # Kommando per exec in einem vorhandenen Container ausführen, siehe config/warm_pool.yaml
+                exit_code, tail = warm_pool.run(client, flow_run_name, params.get('docker_host'), params['image'],
+                                                params['command'], params['env'], _container_options(params),
+                                                logger, metrics, labels, _log_options(params))
+            else:
+                exit_code, tail = _run_container(client, params, logger, metrics, labels)
+
+        if exit_code != 0:
+            metrics.count("step_failed")
+            last_lines = "\n".join(tail[-10:])
+            return StepResult("failed", message=f"Container {params['name']} failed with exit code {exit_code}\n{last_lines}".rstrip())
+
+        metrics.count("step_completed")
+        if step_cache is not None:
+            # Image ist spätestens jetzt lokal vorhanden
+            image_digest = params.get('image_digest') or get_image_digest(client, params['image'])
+            cache_key = step_cache.key(image_digest, params)
+            digest = step_cache.store(cache_key, window)
+            if cache_key is not None and digest is not None:
+                step_cache.mark_latest(step_cache.output_ref(params), cache_key)
+            return StepResult("completed", data=digest)
+        return StepResult("completed")
+    finally:
+        if window is not None:
+            window.close()
@@ -0,0 +1,68 @@
+import threading
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
+from .helper import get_config
+
+if TYPE_CHECKING:
+    from .process_pipeline_builder import Process
+
+
+class Executor(ABC):
+    """Runs the process DAG of one MMUT; run() raises if a step failed."""
+
+    @abstractmethod
+    def run(self, processes: List["Process"], flow_name: str, mmut_id: Optional[str] = None):
+        ...
+
+
+EXECUTORS: Dict[str, Callable[[dict], Executor]] = {}
+
+
+def register_executor(name: str):
+    """Register an executor factory, called with the contents of config/executor.yaml."""
+    def decorator(factory):
+        EXECUTORS[name] = factory
+        return factory
+    return decorator
+
+
+@register_executor("prefect")
+class PrefectExecutor(Executor):
+    """docker_flow as a Prefect flow, every step a Prefect task."""
+
+    def __init__(self, config: dict):
+        pass
+
+    def run(self, processes, flow_name, mmut_id=None):
+        # Prefect erst beim ersten Lauf importieren
+        from .docker_flow import run_docker_flow
+        run_docker_flow(processes, flow_name=flow_name, mmut_id=mmut_id)
+
+
+@register_executor("native")
+class NativeExecutor(Executor):
+    """Steps on a thread pool in this process, no Prefect server needed."""
+
+    def __init__(self, config: dict):
+        self.max_workers = config.get("max_workers", 32)
+
+    def run(self, processes, flow_name, mmut_id=None):
+        from .native_flow import run_native_flow
+        run_native_flow(processes, flow_name, mmut_id=mmut_id, max_workers=self.max_workers)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> Executor:
+    """Process-wide executor, backend from config/executor.yaml (default: prefect)."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            config = get_config("executor")
+            backend = config.get("backend", "prefect")
+            if backend not in EXECUTORS:
+                raise ValueError(f"Unknown executor backend: {backend}, expected one of {sorted(EXECUTORS)}")
+            _executor = EXECUTORS[backend](config)
+        return _executor
@@ -0,0 +1,215 @@
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+from .helper import to_valid_container_name, get_config, get_shared_config, prepare_run_layout
+from .docker_clients import get_docker_client
+from .image_prefetch import prefetch_images
+from .process_pipeline_builder import Process
+from .scheduler import ReadyQueueScheduler, check_limits, parse_capacity, resource_request
+from .host_pool import HostPool, get_host_pool
+from .warm_pool import get_warm_pool
+
+
+def step_params(process: Process, upstream: dict, run_params: dict, digests: dict) -> dict:
+    """Parameters of one step for run_step / docker_task."""
+    # upstream: Ergebnisse (Output-Digests) der Vorgänger, für den Step-Cache
+    # run_params: für alle Schritte gleich (Verzeichnisse des Laufs, MMUT für die Metriken)
+    return {
+        "name": to_valid_container_name(process.name),
+        "image": process.image,
+        "image_digest": digests.get(process.image),
+        "command": process.command,
+        "env": process.env,
+        "resources": process.resources,
+        "upstream": upstream,
+        "reuse_outputs": process.reuse_outputs,
+        **run_params
+    }
+
+
+def place(process: Process, run_params: dict, host_pool: HostPool, hosts: dict, logger) -> Optional[dict]:
+    """Choose a Docker host for the process, returns its run parameters or None if it fits on no host."""
+    host = host_pool.place([hosts[dep].name for dep in (process.dependencies or [])],
+                           resource_request(process))
+    if host is None:
+        return None
+    hosts[process.id] = host
+    logger.info(f"Dispatching task {process.id} to host {host.name}")
+    volumes = host_pool.volumes_for(host, run_params["volumes"], get_shared_config()["root_path"])
+    return {**run_params, "docker_host": host.base_url, "volumes": volumes}
+
+
+def prefetch(processes: List[Process], logger, host_pool: Optional[HostPool] = None) -> dict:
+    """Pull all images before the first container starts, see config/images.yaml.
+
+    With a host pool the images are pulled on every host; the digests of
+    the first host are used for the step cache.
+    """
+    config = get_config("images")
+    if not config.get("prefetch", True):
+        return {}
+    base_urls = [host.base_url for host in host_pool.hosts.values()] if host_pool else [None]
+    digests = None
+    for base_url in base_urls:
+        result = prefetch_images(get_docker_client(base_url), [p.image for p in processes],
+                                 max_pulls=config.get("max_pulls", 4))
+        where = f" on {base_url}" if base_url else ""
+        logger.info(f"Image pull time{where}: {result.seconds:.2f}s "
+                    f"({len(result.pulled)} pulled, {len(result.digests) - len(result.pulled)} local)")
+        for image in result.failed:
+            logger.warning(f"Image {image} is not available{where}, its steps will fail.")
+        if digests is None:
+            digests = result.digests
+    return digests
+
+
+def host_capacity(capacity, base_url: Optional[str] = None) -> Optional[dict]:
+    """Capacity from the config ({cpus, memory}); "auto" asks the Docker daemon at base_url."""
+    if capacity == "auto":
+        info = get_docker_client(base_url).info()
+        return {"cpus": float(info["NCPU"]), "memory": info["MemTotal"]}
+    return parse_capacity(capacity)
+
+
+class FlowSetup:
+    """Everything a backend needs to run the steps of one flow run."""
+
+    def __init__(self, flow_run_name: str, run_params: dict, digests: dict, host_pool: Optional[HostPool],
+                 scheduler_options: dict):
+        self.flow_run_name = flow_run_name
+        self.run_params = run_params
+        self.digests = digests
+        self.host_pool = host_pool
+        self.scheduler_options = scheduler_options
+
+    @property
+    def bounded(self) -> bool:
+        """Whether any limit is set, i.e. the steps must go through the ready queue."""
+        options = self.scheduler_options
+        return any(options[name] is not None for name in ("max_concurrency", "max_per_image", "capacity"))
+
+    def finish(self):
+        """Retire the run's warm containers, they count against no budget once the run is over."""
+        warm_pool = get_warm_pool()
+        if warm_pool is not None:
+            warm_pool.retire_run(self.flow_run_name)
+
+
+def setup_flow(processes: List[Process], flow_run_name: str, logger,
+               max_concurrency: Optional[int] = None,
+               max_per_image: Union[int, Dict[str, int], None] = None,
+               mmut_id: Optional[str] = None) -> FlowSetup:
+    """Read the limits, create the run's folders and prefetch the images."""
+    # Limits aus config/scheduler.yaml, falls nicht explizit übergeben
+    config = get_config("scheduler")
+    if max_concurrency is None:
+        max_concurrency = config.get("max_concurrency")
+    if max_per_image is None:
+        max_per_image = config.get("max_per_image")
+    check_limits(max_concurrency, max_per_image)
+
+    # Verzeichnisse des Laufs einmal anlegen, bevor Schritte starten
+    sub_dirs = ["logs"] if get_config("logs").get("spool", False) else []
+    layout = prepare_run_layout(flow_run_name, sub_dirs)
+    if "models" not in layout["volumes"]:
+        raise ValueError("config/shared.yaml has no shared path with key 'models'.")
+    run_params = {"volumes": layout["volumes"], "run_dirs": layout["run_dirs"], "mmut": mmut_id or ""}
+
+    # Mehrere Docker-Hosts aus config/hosts.yaml: höchstens so viele Schritte wie Plätze,
+    # Kapazität je Host (resources in hosts.yaml, sonst capacity aus scheduler.yaml)
+    host_pool = get_host_pool()
+    if host_pool is not None:
+        max_concurrency = min(max_concurrency or host_pool.total_capacity, host_pool.total_capacity)
+        host_pool.set_limits(lambda host: host_capacity(
+            host.resources if host.resources is not None else config.get("capacity"), host.base_url))
+        logger.info(f"Host pool: {', '.join(host_pool.hosts)} ({host_pool.total_capacity} slots)")
+        capacity = None
+    else:
+        capacity = host_capacity(config.get("capacity"))
+
+    digests = prefetch(processes, logger, host_pool)
+    return FlowSetup(flow_run_name, run_params, digests, host_pool, {
+        "max_concurrency": max_concurrency,
+        "max_per_image": max_per_image,
+        "capacity": capacity,
+        "priority": config.get("priority", "critical_path"),
+    })
+
+
+def run_ready_queue(processes: List[Process], setup: FlowSetup, logger,
+                    submit: Callable[[Process, dict], Any],
+                    wait_any: Callable[[list], Iterable[Any]],
+                    outcome: Callable[[Any], Tuple[Any, Optional[str]]],
+                    max_concurrency: Optional[int] = None) -> Dict[str, str]:
+    """Start the steps from a ready queue within the limits of the setup, for any backend.
+
+    submit(process, params) starts a step and returns a handle,
+    wait_any(handles) blocks until at least one has finished and returns
+    the finished ones, and outcome(handle) returns (data, error) with
+    error None on success. The downstream steps of a failed step are
+    skipped. max_concurrency further bounds the limit of the setup.
+    Returns the error message per failed process.
+    """
+    options = dict(setup.scheduler_options)
+    if max_concurrency is not None:
+        options["max_concurrency"] = min(options["max_concurrency"] or max_concurrency, max_concurrency)
+
+    host_pool = setup.host_pool
+    hosts = {}  # Prozess-ID -> Host, auf dem er lief
+    placed = {}  # Prozess-ID -> Parameter mit dem reservierten Host
+
+    def reserve(process: Process) -> bool:
+        params = place(process, setup.run_params, host_pool, hosts, logger)
+        if params is None:
+            return False
+        placed[process.id] = params
+        return True
+
+    def release(process: Process):
+        if host_pool is not None:
+            host_pool.release(hosts[process.id].name, resource_request(process))
+
+    scheduler = ReadyQueueScheduler(processes, reserve=reserve if host_pool is not None else None, **options)
+    running = {}
+    results = {}
+    failures = {}
+
+    try:
+        while not scheduler.finished():
+            for process in scheduler.dispatchable():
+                if host_pool is None:
+                    logger.info(f"Dispatching task {process.id}")
+                params = placed.pop(process.id, setup.run_params)
+                upstream = {dep: results[dep] for dep in (process.dependencies or [])}
+                try:
+                    handle = submit(process, step_params(process, upstream, params, setup.digests))
+                except Exception:
+                    release(process)
+                    raise
+                running[handle] = process
+
+            if not running:
+                if host_pool is not None:
+                    # alle Hosts durch Schritte anderer Läufe belegt
+                    host_pool.wait_for_release(timeout=1.0)
+                    continue
+                # nichts läuft und nichts kann starten: nicht als erfolgreich melden
+                waiting = len(processes) - len(scheduler.completed) - len(scheduler.failed) - len(scheduler.skipped)
+                raise RuntimeError(f"{waiting} step(s) cannot start within the limits {options}")
+
+            for handle in wait_any(list(running)):
+                process = running.pop(handle)
+                release(process)
+                data, error = outcome(handle)
+                if error is None:
+                    results[process.id] = data
+                else:
+                    failures[process.id] = error
+                    logger.error(f"Task {process.id} failed, skipping its downstream tasks: {error}")
+                scheduler.complete(process.id, success=error is None)
+    finally:
+        # Plätze im (prozessweiten) Host-Pool nicht verlieren
+        for process in running.values():
+            release(process)
+
+    for process_id in scheduler.skipped:
+        logger.warning(f"Task {process_id} was not started because an upstream task failed.")
+    return failures
@@ -1,6 +1,8 @@
 import re
 import os
 import yaml
+import threading
+from typing import Iterable
 
 
 def to_valid_container_name(name: str) -> str:
@@ -16,28 +18,80 @@ def _mkdir(path):
         pass
 
 
-def get_shared(key: str, flow_run_name: str):
-    """Get a shared configuration value."""
+def get_config_dir():
     util_dir = os.path.dirname(os.path.abspath(__file__))
-    config_path = os.path.abspath(os.path.join(util_dir, '../config'))
-    with open(os.path.join(config_path, 'shared.yaml'), 'r') as file:
-        config = yaml.safe_load(file)
+    return os.path.abspath(os.path.join(util_dir, '../config'))
 
-    root_path = config['root_path']
-    local_path = config['local_path']
-    shared_paths = config.get('shared_paths', [])
 
-    # Create local_path/flow_run_name directory
+_configs = {}  # name -> (version, config)
+_configs_lock = threading.Lock()
+
+
+def get_config(name: str) -> dict:
+    """Read an optional config/<name>.yaml, empty if it does not exist.
+
+    Parsed once and re-read only when the file changes; the returned
+    dict is shared and must not be modified.
+    """
+    path = os.path.join(get_config_dir(), f'{name}.yaml')
+    version = (path, file_version(path))
+    with _configs_lock:
+        cached = _configs.get(name)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+    config = {}
+    if version[1] is not None:
+        with open(path, 'r') as file:
+            config = yaml.safe_load(file) or {}
+    with _configs_lock:
+        _configs[name] = (version, config)
+    return config
+
+
+def file_version(path: str):
+    """(mtime_ns, size) of a file to detect changes, None if it does not exist."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def get_shared_config() -> dict:
+    """config/shared.yaml (cached like get_config), which unlike other configs must exist."""
+    path = os.path.join(get_config_dir(), 'shared.yaml')
+    if file_version(path) is None:
+        raise FileNotFoundError(f"Shared config {path} not found")
+    return get_config('shared')
+
+
+def prepare_run_layout(flow_run_name: str, sub_dirs: Iterable[str] = ()) -> dict:
+    """Create the directory tree of a flow run once, before its tasks start.
+
+    Returns the host paths to bind into the containers per shared key
+    ("volumes") and the local directories per shared key and sub dir
+    ("run_dirs").
+    """
+    config = get_shared_config()
     run_dir_name = f"flow-{flow_run_name}"
-    run_dir = os.path.join(local_path, run_dir_name)
-    _mkdir(run_dir)
-
-    for shared in shared_paths:
-        if shared['key'] == key:
-            key_dir = os.path.join(run_dir, key)
-            _mkdir(key_dir)
-            for folder in (shared.get('folder') or []):
-                _mkdir(os.path.join(key_dir, folder))
-            break
-
-    return os.path.join(root_path, local_path, run_dir_name, key)
+    run_dir = os.path.join(config['local_path'], run_dir_name)
+
+    dirs = [run_dir]
+    volumes = {}
+    run_dirs = {}
+    for shared in config.get('shared_paths', []):
+        key = shared['key']
+        key_dir = os.path.join(run_dir, key)
+        dirs.append(key_dir)
+        dirs.extend(os.path.join(key_dir, folder) for folder in (shared.get('folder') or []))
+        volumes[key] = os.path.join(config['root_path'], config['local_path'], run_dir_name, key)
+        run_dirs[key] = key_dir
+    for sub_dir in sub_dirs:
+        run_dirs[sub_dir] = os.path.join(run_dir, sub_dir)
+        dirs.append(run_dirs[sub_dir])
+
+    # Eltern vor Kindern, jedes Verzeichnis genau einmal
+    for path in dict.fromkeys(dirs):
+        _mkdir(path)
+
+    return {"volumes": volumes, "run_dirs": run_dirs}
@@ -0,0 +1,129 @@
+import os
+import threading
+from typing import Callable, Dict, List, Optional, Union
+from .helper import get_config
+
+
+class Host:
+    def __init__(self, name: str, base_url: Optional[str] = None, capacity: int = 4,
+                 root_path: Optional[str] = None, resources: Union[dict, str, None] = None):
+        self.name = name
+        self.base_url = base_url
+        self.capacity = capacity
+        self.root_path = root_path
+        # {cpus, memory} aus config/hosts.yaml oder "auto", siehe HostPool.set_limits
+        self.resources = resources
+        self.limits = None
+        self.running = 0
+        self.used = {"cpus": 0.0, "memory": 0}
+
+    @property
+    def load(self) -> float:
+        return self.running / self.capacity
+
+    def has_capacity(self) -> bool:
+        return self.running < self.capacity
+
+    def fits(self, request: Dict[str, float]) -> bool:
+        """A free slot and room for the request; a request larger than the host runs alone."""
+        if not self.has_capacity():
+            return False
+        if not self.limits or self.running == 0:
+            return True
+        return all(self.used[resource] + request.get(resource, 0) <= limit
+                   for resource, limit in self.limits.items())
+
+
+class HostPool:
+    """Docker hosts with step slots and resource limits each, see config/hosts.yaml.
+
+    place() puts a step on the host that already ran most of its upstream
+    steps, as long as the step fits there, so the step reads their
+    outputs locally; otherwise on the least-loaded host it fits on
+    (running steps relative to capacity). The pool is shared by all flow
+    runs of the process; a step that fits nowhere gets no host and waits
+    until a step releases its slot.
+    """
+
+    def __init__(self, hosts: List[Host]):
+        if not hosts:
+            raise ValueError("Host pool needs at least one host.")
+        names = [host.name for host in hosts]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Duplicate host names in {names}")
+        self.hosts = {host.name: host for host in hosts}
+        self._lock = threading.Lock()
+        self._released = threading.Condition(self._lock)
+
+    @property
+    def total_capacity(self) -> int:
+        return sum(host.capacity for host in self.hosts.values())
+
+    def set_limits(self, limits: Callable[[Host], Optional[Dict[str, float]]]):
+        """Set the resource limits ({cpus, memory}) of every host, None for unlimited."""
+        resolved = {name: limits(host) for name, host in self.hosts.items()}
+        with self._lock:
+            for name, host_limits in resolved.items():
+                self.hosts[name].limits = host_limits
+
+    def place(self, upstream_hosts: List[str], request: Optional[Dict[str, float]] = None) -> Optional[Host]:
+        """Reserve a slot for a step whose upstream steps ran on upstream_hosts, None if it fits nowhere."""
+        request = request or {}
+        with self._lock:
+            candidates = [host for host in self.hosts.values() if host.fits(request)]
+            if not candidates:
+                return None
+            affinity = {}
+            for name in upstream_hosts:
+                if any(host.name == name for host in candidates):
+                    affinity[name] = affinity.get(name, 0) + 1
+            if affinity:
+                # meiste Vorgänger zuerst, dann geringste Last
+                host = min((self.hosts[name] for name in affinity),
+                           key=lambda h: (-affinity[h.name], h.load, h.name))
+            else:
+                host = min(candidates, key=lambda h: (h.load, h.name))
+            host.running += 1
+            for resource, amount in request.items():
+                host.used[resource] += amount
+            return host
+
+    def release(self, name: str, request: Optional[Dict[str, float]] = None):
+        with self._lock:
+            host = self.hosts[name]
+            host.running -= 1
+            for resource, amount in (request or {}).items():
+                host.used[resource] -= amount
+            self._released.notify_all()
+
+    def wait_for_release(self, timeout: float):
+        """Block until some step releases its slot (or timeout)."""
+        with self._lock:
+            self._released.wait(timeout)
+
+    def volumes_for(self, host: Host, volumes: Dict[str, str], root_path: str) -> Dict[str, str]:
+        """Bind paths below root_path rebased onto the host's root_path."""
+        if host.root_path is None:
+            return volumes
+        return {key: os.path.join(host.root_path, os.path.relpath(path, root_path))
+                for key, path in volumes.items()}
+
+
+_host_pool = None
+_host_pool_lock = threading.Lock()
+
+
+def get_host_pool() -> Optional[HostPool]:
+    """Process-wide host pool from config/hosts.yaml, None if no hosts are configured."""
+    global _host_pool
+    with _host_pool_lock:
+        if _host_pool is None:
+            hosts = get_config("hosts").get("hosts")
+            if not hosts:
+                return None
+            _host_pool = HostPool([Host(name=host["name"],
+                                        base_url=host.get("base_url"),
+                                        capacity=host.get("capacity", 4),
+                                        root_path=host.get("root_path"),
+                                        resources=host.get("resources")) for host in hosts])
+        return _host_pool
@@ -0,0 +1,54 @@
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional
+from .metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+
+class PrefetchResult:
+    """Digests of the prefetched images and how long the pre-flight took."""
+
+    def __init__(self, digests: Dict[str, Optional[str]], pulled: list, seconds: float):
+        self.digests = digests
+        self.pulled = pulled
+        self.seconds = seconds
+
+    @property
+    def failed(self) -> list:
+        return [image for image, digest in self.digests.items() if digest is None]
+
+
+def _resolve(client, image: str):
+    """Digest of a local image, pulling it first if it is not local. Returns (digest, pulled)."""
+    try:
+        return client.images.get(image).id, False
+    except Exception:
+        pass
+    try:
+        with get_metrics().span("pull", image=image):
+            return client.images.pull(image).id, True
+    except Exception as e:
+        logger.warning(f"Could not pull image {image}: {e}")
+        return None, False
+
+
+def prefetch_images(client, images: Iterable[str], max_pulls: int = 4) -> PrefetchResult:
+    """Make every distinct image local and resolve it to its digest.
+
+    Images already present are only looked up; missing ones are pulled
+    concurrently, at most max_pulls at a time, so no step pulls on the
+    critical path and steps sharing an image do not pull it twice.
+    Images that cannot be pulled get the digest None.
+    """
+    distinct = list(dict.fromkeys(images))
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, min(max_pulls, len(distinct) or 1)),
+                            thread_name_prefix="image-pull") as pool:
+        resolved = list(pool.map(lambda image: _resolve(client, image), distinct))
+    seconds = time.perf_counter() - start
+
+    digests = {image: digest for image, (digest, _) in zip(distinct, resolved)}
+    pulled = [image for image, (_, was_pulled) in zip(distinct, resolved) if was_pulled]
+    return PrefetchResult(digests, pulled, seconds)
@@ -0,0 +1,113 @@
+import codecs
+import threading
+import time
+from collections import deque
+from typing import List, Optional
+
+
+class LogFollower:
+    """Collect streamed container output and forward it in batches.
+
+    Lines are passed to the logger as one record per batch (at most
+    batch_lines lines, or whatever arrived within batch_interval seconds).
+    Only the last tail_lines lines are kept in memory; the complete
+    output can optionally be spooled to a file.
+    """
+
+    def __init__(self, logger,
+                 batch_lines: int = 200,
+                 batch_interval: float = 2.0,
+                 tail_lines: int = 1000,
+                 max_line_length: int = 16384,
+                 spool_path: Optional[str] = None):
+        self.logger = logger
+        self.batch_lines = batch_lines
+        self.batch_interval = batch_interval
+        self.max_line_length = max_line_length
+        self.tail = deque(maxlen=tail_lines)
+        self.line_count = 0
+
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._partial = ""
+        self._batch = []
+        self._batch_started = None
+        self._lock = threading.Lock()
+        self._spool = open(spool_path, "w", encoding="utf-8") if spool_path else None
+
+    def feed(self, chunk: bytes):
+        text = self._partial + self._decoder.decode(chunk)
+        lines = text.split("\n")
+        self._partial = lines.pop()
+        if len(self._partial) > self.max_line_length:
+            # überlange Zeilen ohne Umbruch nicht unbegrenzt puffern
+            lines.append(self._partial)
+            self._partial = ""
+        with self._lock:
+            for line in lines:
+                self._add_line(line)
+            if len(self._batch) >= self.batch_lines or self._due():
+                self._flush()
+
+    def _add_line(self, line: str):
+        line = line.rstrip("\r")
+        if self._spool is not None:
+            self._spool.write(line + "\n")
+        if len(line) > self.max_line_length:
+            line = line[:self.max_line_length] + " [...]"
+        self.tail.append(line)
+        self.line_count += 1
+        if not self._batch:
+            self._batch_started = time.monotonic()
+        self._batch.append(line)
+
+    def _due(self) -> bool:
+        return bool(self._batch) and time.monotonic() - self._batch_started >= self.batch_interval
+
+    def _flush(self):
+        if self._batch:
+            self.logger.info("\n".join(self._batch))
+            self._batch = []
+
+    def flush_if_due(self):
+        with self._lock:
+            if self._due():
+                self._flush()
+
+    def close(self) -> List[str]:
+        """Flush pending output and return the in-memory tail."""
+        rest = self._partial + self._decoder.decode(b"", final=True)
+        self._partial = ""
+        with self._lock:
+            if rest:
+                self._add_line(rest)
+            self._flush()
+        if self._spool is not None:
+            self._spool.close()
+            self._spool = None
+        return list(self.tail)
+
+
+def follow_logs(container, logger, **options) -> List[str]:
+    """Stream the logs of a running container until it stops.
+
+    Returns the last lines of the output (see LogFollower).
+    """
+    follower = LogFollower(logger, **options)
+    stop = threading.Event()
+
+    def flush_periodically():
+        # auch bei ruhigen Containern regelmäßig ausgeben
+        while not stop.wait(follower.batch_interval):
+            follower.flush_if_due()
+
+    flusher = threading.Thread(target=flush_periodically, name="log-flusher")
+    flusher.daemon = True
+    flusher.start()
+    try:
+        for chunk in container.logs(stream=True, follow=True):
+            follower.feed(chunk)
+    finally:
+        stop.set()
+        flusher.join()
+        tail = follower.close()
+    return tail
@@ -0,0 +1,95 @@
+import json
+import time
+import logging
+import threading
+from contextlib import nullcontext
+from prometheus_client import CollectorRegistry, Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST
+from .helper import get_config
+
+logger = logging.getLogger(__name__)
+
+# Von Millisekunden (Parsen kleiner Modelle) bis Minuten (Pulls, lange Container)
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+
+_DISABLED = nullcontext()
+
+
+class _Span:
+    def __init__(self, metrics: "Metrics", phase: str, image: str, mmut: str):
+        self.metrics = metrics
+        self.phase = phase
+        self.image = image
+        self.mmut = mmut
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.perf_counter() - self.start
+        self.metrics.observe(self.phase, seconds, image=self.image, mmut=self.mmut, error=exc_type is not None)
+        return False
+
+
+class Metrics:
+    """Phase timings and counters of triggers and steps.
+
+    span(phase, image=..., mmut=...) times a block into the histogram
+    mmut_phase_duration_seconds{phase, image, mmut}; failed blocks are also
+    counted in mmut_phase_errors_total. With log_spans every span is also
+    written as one JSON log record. When disabled, span() returns a shared
+    no-op context manager.
+    """
+
+    def __init__(self, enabled: bool = True, log_spans: bool = False):
+        self.enabled = enabled
+        self.log_spans = log_spans
+        self.registry = CollectorRegistry()
+        self.durations = Histogram(
+            "mmut_phase_duration_seconds", "Duration of trigger and step phases",
+            ["phase", "image", "mmut"], buckets=BUCKETS, registry=self.registry)
+        self.errors = Counter(
+            "mmut_phase_errors_total", "Phases that raised an exception",
+            ["phase", "image", "mmut"], registry=self.registry)
+        self.events = Counter(
+            "mmut_events_total", "Counted events, e.g. step cache hits or run outcomes",
+            ["event"], registry=self.registry)
+
+    def span(self, phase: str, image: str = "", mmut: str = ""):
+        if not self.enabled:
+            return _DISABLED
+        return _Span(self, phase, image, mmut)
+
+    def observe(self, phase: str, seconds: float, image: str = "", mmut: str = "", error: bool = False):
+        if not self.enabled:
+            return
+        self.durations.labels(phase, image, mmut).observe(seconds)
+        if error:
+            self.errors.labels(phase, image, mmut).inc()
+        if self.log_spans:
+            logger.info(json.dumps({"span": phase, "seconds": round(seconds, 6),
+                                    "image": image, "mmut": mmut, "error": error}))
+
+    def count(self, event: str, amount: float = 1):
+        if self.enabled:
+            self.events.labels(event).inc(amount)
+
+    def render(self) -> bytes:
+        """Prometheus text exposition of all metrics."""
+        return generate_latest(self.registry)
+
+
+_metrics = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> Metrics:
+    """Process-wide metrics, configured in config/metrics.yaml."""
+    global _metrics
+    if _metrics is None:
+        with _metrics_lock:
+            if _metrics is None:
+                config = get_config("metrics")
+                _metrics = Metrics(enabled=config.get("enabled", True),
+                                   log_spans=config.get("log_spans", False))
+    return _metrics
@@ -0,0 +1,102 @@
+import os
+import json
+import time
+import hashlib
+import threading
+import logging
+from typing import Callable, List, Optional, Tuple
+from . import trigger_process
+from .helper import file_version
+
+logger = logging.getLogger(__name__)
+
+
+class MmutIndex:
+    """In-memory index of MMUT IDs to their info.json metadata.
+
+    refresh() lists the mmut directory only when its mtime changed and
+    re-reads an info.json only when its mtime or size changed, so an
+    unchanged tree costs one stat per MMUT. Refreshes are throttled to
+    one per min_interval seconds. The etag changes whenever the listing
+    changes.
+    """
+
+    def __init__(self, mmut_dir: Optional[Callable[[], str]] = None, min_interval: float = 2.0):
+        self._mmut_dir = mmut_dir
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._dir_version = None
+        self._ids = []
+        self._entries = {}  # id -> (info.json version, info)
+        self._etag = None
+        self._last_refresh = None
+
+    def refresh(self, force: bool = False):
+        with self._lock:
+            now = time.monotonic()
+            if not force and self._last_refresh is not None and now - self._last_refresh < self.min_interval:
+                return
+            self._last_refresh = now
+
+            mmut_dir = self._mmut_dir() if self._mmut_dir else trigger_process.get_mmut_dir()
+            dir_version = (str(mmut_dir), file_version(mmut_dir))
+            if dir_version != self._dir_version:
+                self._dir_version = dir_version
+                self._ids = sorted(f for f in os.listdir(mmut_dir) if trigger_process.is_valid_uuid(str(f)))
+
+            changed = self._etag is None
+            entries = {}
+            for mmut_id in self._ids:
+                info_json = os.path.join(mmut_dir, mmut_id, 'info.json')
+                version = file_version(info_json)
+                cached = self._entries.get(mmut_id)
+                if cached is not None and cached[0] == version:
+                    entries[mmut_id] = cached
+                    continue
+                entries[mmut_id] = (version, self._read_info(info_json, version))
+                changed = True
+
+            if changed or entries.keys() != self._entries.keys():
+                self._entries = entries
+                digest = hashlib.sha256()
+                for mmut_id, (version, _) in entries.items():
+                    digest.update(f"{mmut_id}:{version}\n".encode("utf-8"))
+                self._etag = digest.hexdigest()[:32]
+
+    def _read_info(self, info_json: str, version) -> dict:
+        if version is None:
+            return {}
+        try:
+            with open(info_json, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read {info_json}: {e}")
+            return {}
+
+    @property
+    def etag(self) -> str:
+        return self._etag
+
+    def list(self, name: Optional[str] = None, offset: int = 0,
+             limit: Optional[int] = None) -> Tuple[List[dict], int]:
+        """Entries ({id, info}) filtered by a case-insensitive name substring, and the total count."""
+        with self._lock:
+            dags = [{"id": mmut_id, "info": info} for mmut_id, (_, info) in self._entries.items()]
+        if name:
+            needle = name.lower()
+            dags = [dag for dag in dags if needle in str(dag["info"].get("name", "")).lower()]
+        total = len(dags)
+        end = None if limit is None else offset + limit
+        return dags[offset:end], total
+
+
+_mmut_index = None
+_mmut_index_lock = threading.Lock()
+
+
+def get_mmut_index() -> MmutIndex:
+    global _mmut_index
+    with _mmut_index_lock:
+        if _mmut_index is None:
+            _mmut_index = MmutIndex()
+        return _mmut_index
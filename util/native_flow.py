@@ -0,0 +1,57 @@
+import uuid
+import logging
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import List, Optional
+from .docker_step import run_step
+from .flow_setup import setup_flow, run_ready_queue
+from .helper import to_valid_container_name
+from .process_pipeline_builder import Process
+
+logger = logging.getLogger(__name__)
+
+
+class _StepLogger(logging.LoggerAdapter):
+    def process(self, msg, kwargs):
+        return f"[{self.extra['step']}] {msg}", kwargs
+
+
+def _outcome(future):
+    try:
+        result = future.result()
+    except Exception as e:
+        return None, str(e)
+    return result.data, (result.message if result.status == "failed" else None)
+
+
+def run_native_flow(processes: List[Process], flow_name: str, mmut_id: Optional[str] = None,
+                    max_workers: int = 32) -> str:
+    """Run the steps on a thread pool in this process, without Prefect.
+
+    Same setup as docker_flow (limits, run folders, image prefetch, host
+    pool) and the same semantics as its ready-queue mode: a step starts
+    once all its dependencies have completed, the downstream steps of a
+    failed step are skipped, and a RuntimeError is raised at the end if
+    any step failed. At most max_workers steps run at once. Returns the
+    name of the run (its folder is flow-<name>).
+    """
+    run_name = f"{to_valid_container_name(flow_name)}-{uuid.uuid4().hex[:8]}"
+    logger.info(f"Starting native run {run_name} with {len(processes)} steps")
+
+    setup = setup_flow(processes, run_name, logger, mmut_id=mmut_id)
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="step") as pool:
+            def submit(process: Process, params: dict):
+                return pool.submit(run_step, params, _StepLogger(logger, {"step": process.name}), run_name)
+
+            # je Schritt ein Thread, der auf seinen Container wartet
+            failures = run_ready_queue(processes, setup, logger, submit,
+                                       wait_any=lambda running: wait(running, return_when=FIRST_COMPLETED)[0],
+                                       outcome=_outcome, max_concurrency=max_workers)
+    finally:
+        setup.finish()
+
+    if failures:
+        raise RuntimeError(f"{len(failures)} step(s) failed: {', '.join(failures)}")
+    logger.info(f"Native run {run_name} completed")
+    return run_name
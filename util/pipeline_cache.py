@@ -0,0 +1,132 @@
+import os
+import json
+import pickle
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+from .process_pipeline_builder import Process
+from .helper import file_version
+from .resolver import SECRETS_PATH, dependencies_current
+
+logger = logging.getLogger(__name__)
+
+# Erhöhen, sobald sich das Format der gespeicherten Prozesse ändert
+CACHE_FORMAT_VERSION = 7
+
+
+def get_cache_dir():
+    """Directory for the persistent compiled-pipeline cache."""
+    util_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.path.abspath(os.path.join(util_dir, '../cache/pipelines'))
+
+
+def mmut_fingerprint(mmut_path: str, secrets_path: str = SECRETS_PATH) -> str:
+    """Hash of everything a compiled pipeline depends on.
+
+    Covers name, mtime and size of every .ttl file in the MMUT directory
+    and the version of the secrets file, so adding, removing or editing a
+    file yields a new key without reading any file content.
+    """
+    ttl_files = []
+    for file in sorted(os.listdir(mmut_path)):
+        if file.endswith('.ttl'):
+            ttl_files.append([file, file_version(os.path.join(mmut_path, file))])
+
+    key = {
+        "format": CACHE_FORMAT_VERSION,
+        "mmut_path": os.path.abspath(mmut_path),
+        "ttl_files": ttl_files,
+        "secrets": file_version(secrets_path),
+    }
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class PipelineCache:
+    """Compiled List[Process] cache, in memory (LRU) and on disk.
+
+    The pickled pipelines contain resolved environment values (including
+    secrets), so the files are written with owner-only permissions.
+    Environment variables and files read by the resolver are stored with
+    the entry (see Resolver.used) and checked on every hit.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_entries: int = 64, max_disk_entries: int = 512):
+        self.cache_dir = cache_dir or get_cache_dir()
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.pickle")
+
+    def get(self, key: str) -> Optional[List[Process]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+
+        if entry is None:
+            path = self._path(key)
+            try:
+                with open(path, 'rb') as f:
+                    entry = pickle.load(f)
+                os.utime(path)
+            except FileNotFoundError:
+                return None
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable pipeline cache entry {path}: {e}")
+                return None
+            self._remember(key, entry)
+
+        processes, used = entry
+        if not dependencies_current(used):
+            return None
+        return processes
+
+    def put(self, key: str, processes: List[Process], used: Optional[dict] = None):
+        entry = (processes, dict(used or {}))
+        self._remember(key, entry)
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self._path(key)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+            self._prune_disk()
+        except OSError as e:
+            logger.warning(f"Could not write pipeline cache entry: {e}")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _remember(self, key: str, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _prune_disk(self):
+        entries = []
+        for file in os.listdir(self.cache_dir):
+            if file.endswith('.pickle'):
+                path = os.path.join(self.cache_dir, file)
+                try:
+                    entries.append((os.stat(path).st_mtime_ns, path))
+                except FileNotFoundError:
+                    pass
+        if len(entries) <= self.max_disk_entries:
+            return
+        entries.sort()
+        for _, path in entries[:len(entries) - self.max_disk_entries]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
@@ -1,81 +1,238 @@
 import re
-from typing import List
-from rdflib import Graph, RDFS
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+from rdflib import Graph, Literal, Namespace, RDF, RDFS
 from obse.sparql_queries import SparQLWrapper
 from py_mmut_rdf import MMUT
 import networkx as nx
-import yaml
 import logging
+from .resolver import Resolver, get_resolver
 
 logger = logging.getLogger(__name__)
 
 
+# Begriffe, die (noch) nicht in py_mmut_rdf definiert sind
+MMUT_EXT = Namespace(str(MMUT._NS))
+
+# Optionale Ressourcen an MMUT:ContainerProperties -> Schlüssel in Process.resources
+RESOURCE_PROPERTIES = {
+    "cpus": MMUT_EXT.cpus,                # Limit in CPUs, z.B. 1.5
+    "mem_limit": MMUT_EXT.memLimit,       # Limit, z.B. "2g"
+    "cpuset_cpus": MMUT_EXT.cpusetCpus,   # erlaubte Kerne, z.B. "0-3"
+    "pids_limit": MMUT_EXT.pidsLimit,
+    "cpu_request": MMUT_EXT.cpuRequest,   # für die Platzierung, Standard: cpus
+    "mem_request": MMUT_EXT.memRequest,   # für die Platzierung, Standard: mem_limit
+}
+
+
+@dataclass(frozen=True, slots=True)
 class Process:
-    def __init__(self, id, name, image, command, env, dependencies):
-        self.id = id
-        self.name = name
-        self.image = image
-        self.command = command
-        self.env = env
-        self.dependencies = dependencies
+    id: str
+    name: str
+    image: str
+    command: List[str]
+    env: Dict[str, str]
+    dependencies: Optional[List[str]]
+    resources: Dict[str, Any] = field(default_factory=dict)
+    # Ausgaben des letzten Laufs aus dem Step-Cache übernehmen statt den Schritt auszuführen
+    reuse_outputs: bool = False
+
+
+def _plain(value):
+    """Literal value as a JSON type; xsd:decimal (e.g. MMUT:cpus 1.5) comes as Decimal."""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
 
 
-def get_secrets(domain_key, value_key):
-    """Retrieve secrets from a secure store."""
-    # This is a placeholder function. Replace with actual secret retrieval logic.
-    with open("config/secrets.yaml", "r") as f:
-        secrets = yaml.safe_load(f)
-        return secrets.get(domain_key, {}).get(value_key, None)
+# Erhöhen, sobald sich das serialisierte Format ändert
+PROCESS_FORMAT_VERSION = 2
 
 
-def resolve(value):
-    """Resolve a value, e.g., by removing prefixes or converting to string."""
+def serialize_processes(processes: List[Process]) -> dict:
+    """Compact, JSON-compatible form of a topologically sorted pipeline.
 
-    pattern = r"{{resolve:(.*)}}"
+    Every process is a list [id, name, image, command, env, dependencies,
+    resources, reuse_outputs] in which dependencies are indices of earlier processes
+    instead of repeated IRIs.
+    """
+    index = {}
+    rows = []
+    for position, process in enumerate(processes):
+        dependencies = None
+        if process.dependencies is not None:
+            try:
+                dependencies = [index[dep] for dep in process.dependencies]
+            except KeyError as e:
+                raise ValueError(f"Dependency {e.args[0]} of {process.id} is not an earlier process.") from e
+        rows.append([process.id, process.name, process.image, process.command, process.env,
+                     dependencies, process.resources, process.reuse_outputs])
+        index[process.id] = position
+    return {"version": PROCESS_FORMAT_VERSION, "processes": rows}
 
-    # Nutze eine externe Funktion als Ersatz-Callback
-    def ersetze_match(match):
-        resolve_instruction = match.group(1).split(":")
-        if len(resolve_instruction) == 3 and resolve_instruction[0] == "secrets":
-            return get_secrets(resolve_instruction[1], resolve_instruction[2])
-        if resolve_instruction[0] == "system":
-            if len(resolve_instruction) == 2 and resolve_instruction[1] == "modelpath":
-                return "/share/models/"
-        raise ValueError(f"Unknown resolve instruction: {match.group(1)}")
 
-    return re.sub(pattern, ersetze_match, value)
+def deserialize_processes(payload: dict) -> List[Process]:
+    """Inverse of serialize_processes()."""
+    if payload.get("version") != PROCESS_FORMAT_VERSION:
+        raise ValueError(f"Unsupported process format version: {payload.get('version')}")
+    processes = []
+    for id, name, image, command, env, dependencies, resources, reuse_outputs in payload["processes"]:
+        if dependencies is not None:
+            dependencies = [processes[position].id for position in dependencies]
+        processes.append(Process(id, name, image, command, env, dependencies, resources, reuse_outputs))
+    return processes
+
+
+_SEQUENCE_PREFIX = str(RDF) + "_"
+_SEQUENCE_POSITION = re.compile(r'#_(\d+)$')
 
 
 class ProcessPipelineBuilder:
-    def __init__(self, g: Graph):
+    def __init__(self, g: Graph, resolver: Optional[Resolver] = None):
+        self.graph = g
+        # Ein Secrets-Stand für den ganzen Build, nicht je Platzhalter
+        self.resolver = resolver or get_resolver()
         self.sparql_wrapper = SparQLWrapper(g)
 
         # Graph definieren
         self.G = nx.DiGraph()
 
         # Knoten (Modell-Prozesse)
-        for model in self.sparql_wrapper.get_instances_of_type(MMUT.MicroModel):
+        # Reihenfolge der Abfrage beibehalten, sie bestimmt die topologische Sortierung
+        self.models = dict.fromkeys(self.sparql_wrapper.get_instances_of_type(MMUT.MicroModel))
+        for model in self.models:
             self.G.add_node(model)
 
         # Knoten (Transformations-Prozesse)
-        for transformation in self.sparql_wrapper.get_instances_of_type(MMUT.Transformation):
+        self.transformations = dict.fromkeys(self.sparql_wrapper.get_instances_of_type(MMUT.Transformation))
+        for transformation in self.transformations:
             self.G.add_node(transformation)
 
             # Kanten (Abhängigkeiten zwischen Modellen und Transformationen)
-            for output_model in self.sparql_wrapper.get_out_references(transformation, MMUT.hasOutputModel):
+            for output_model in self._out_references(transformation, MMUT.hasOutputModel):
                 self.G.add_edge(transformation, output_model)
-            for input_model in self.sparql_wrapper.get_in_references(transformation, MMUT.isInputModelOf):
+            for input_model in self._in_references(transformation, MMUT.isInputModelOf):
                 self.G.add_edge(input_model, transformation)
 
+    def validate(self) -> List[dict]:
+        """All violations of the process model in one pass over the graph.
+
+        Each violation is a dict with kind, node(s) and message. Kinds:
+        cycle (one per strongly connected component, with one cycle
+        through it in order), missing_task_definition,
+        duplicate_task_definition, invalid_task_definition (label,
+        container properties, command, environment or one of its entries
+        missing or repeated), missing_image and
+        dangling_dependency (an input/output reference to something that
+        is not a model or transformation). Placeholders are not resolved.
+        """
+        violations = []
+
+        for component in nx.strongly_connected_components(self.G):
+            if len(component) == 1 and not any(self.G.has_edge(n, n) for n in component):
+                continue
+            cycle = [str(u) for u, _ in nx.find_cycle(self.G.subgraph(component))]
+            violations.append({
+                "kind": "cycle",
+                "nodes": cycle,
+                "message": f"Loop through {len(component)} process(es): {' -> '.join(cycle + cycle[:1])}",
+            })
+
+        for node in sorted(self.G.nodes, key=str):
+            task_definitions = self._out_references(node, MMUT.hasTaskDefinition)
+            if len(set(task_definitions)) == 0:
+                violations.append({"kind": "missing_task_definition", "node": str(node),
+                                   "message": f"Process {node} has no task definition."})
+            elif len(set(task_definitions)) > 1:
+                violations.append({"kind": "duplicate_task_definition", "node": str(node),
+                                   "task_definitions": sorted(str(t) for t in set(task_definitions)),
+                                   "message": f"Process {node} has {len(set(task_definitions))} task definitions."})
+            else:
+                violations.extend(self._validate_task_definition(node, task_definitions[0]))
+
+        # Verweise auf Knoten, die weder Modell noch Transformation sind
+        for transformation, model in sorted(self.graph.subject_objects(MMUT.hasOutputModel), key=str):
+            violations.extend(self._dangling(transformation, model, "output model"))
+        for model, transformation in sorted(self.graph.subject_objects(MMUT.isInputModelOf), key=str):
+            violations.extend(self._dangling(transformation, model, "input model"))
+
+        return violations
+
+    def _validate_task_definition(self, node, task_definition) -> List[dict]:
+        # dieselben Bedingungen wie _container_spec, damit get_processes nach validate() nicht scheitert
+        violations = []
+        labels = list(self.graph.objects(task_definition, RDFS.label))
+        if len(labels) != 1:
+            violations.append({"kind": "invalid_task_definition", "node": str(node),
+                               "message": f"Task definition {task_definition} needs exactly one rdfs:label, "
+                                          f"found {len(labels)}."})
+        container_properties = self._out_references(task_definition, MMUT.hasContainerProperties)
+        if len(container_properties) != 1:
+            return violations + [{"kind": "invalid_task_definition", "node": str(node),
+                                  "message": f"Task definition {task_definition} needs exactly one container "
+                                             f"properties, found {len(container_properties)}."}]
+        properties = container_properties[0]
+        images = [str(image) for image in self.graph.objects(properties, MMUT.image)]
+        if len(images) != 1 or not images[0].strip():
+            violations.append({"kind": "missing_image", "node": str(node),
+                               "message": f"Container properties {properties} need exactly one image, "
+                                          f"found {images}."})
+        if len(self._out_references(properties, MMUT.hasCommandSequence)) != 1:
+            violations.append({"kind": "invalid_task_definition", "node": str(node),
+                               "message": f"Container properties {properties} need exactly one command sequence."})
+        for key, prop in RESOURCE_PROPERTIES.items():
+            if len(list(self.graph.objects(properties, prop))) > 1:
+                violations.append({"kind": "invalid_task_definition", "node": str(node),
+                                   "message": f"Container properties {properties} have more than one {key}."})
+
+        environments = self._out_references(properties, MMUT.hasEnvironment)
+        if len(environments) != 1:
+            violations.append({"kind": "invalid_task_definition", "node": str(node),
+                               "message": f"Container properties {properties} need exactly one environment, "
+                                          f"found {len(environments)}."})
+            return violations
+        for key_value in self._out_references(environments[0], MMUT.hasKeyValuePair):
+            keys = list(self.graph.objects(key_value, MMUT.key))
+            values = list(self.graph.objects(key_value, MMUT.value))
+            if len(keys) != 1 or len(values) != 1:
+                violations.append({"kind": "invalid_task_definition", "node": str(node),
+                                   "message": f"Environment entry {key_value} needs exactly one key and one value, "
+                                              f"found {len(keys)} key(s) and {len(values)} value(s)."})
+        return violations
+
+    def _dangling(self, transformation, model, role: str) -> List[dict]:
+        missing = []
+        if transformation not in self.transformations:
+            missing.append(transformation)
+        if model not in self.models:
+            missing.append(model)
+        return [{"kind": "dangling_dependency", "node": str(node),
+                 "message": f"{role.capitalize()} reference {model} of {transformation}: "
+                            f"{node} is not a defined {'transformation' if node == transformation else 'model'}."}
+                for node in missing]
+
     def get_processes(self) -> List[Process]:
-        errors = []
+        # Alle Fehler auf einmal melden statt einzeln beim Abarbeiten
+        violations = self.validate()
+        invalid = [v for v in violations if v["kind"] != "dangling_dependency"]
+        for violation in violations:
+            if violation["kind"] == "dangling_dependency":
+                # wurden bisher stillschweigend ignoriert, daher kein Abbruch
+                logger.warning(violation["message"])
+        if invalid:
+            logger.error("Folgende Fehler sind aufgetreten:")
+            for violation in invalid:
+                logger.error(f" - {violation['message']}")
+            if any(violation["kind"] == "cycle" for violation in invalid):
+                raise ValueError("Die Prozesse haben Zyklen und können nicht sortiert werden.")
+            raise ValueError("Prozess-Definitionen konnten nicht erstellt werden.")
+
+        # validate() hat Zyklen und unvollständige Task-Definitionen bereits ausgeschlossen
         processes = []
-        # Topologische Sortierung der Prozesse (Reihenfolge der Abarbeitung)
-        try:
-            sorted_processes = list(nx.topological_sort(self.G))
-        except nx.exception.NetworkXUnfeasible as e:
-            logger.error("Die Prozesse haben Zyklen und können nicht sortiert werden.")
-            raise ValueError("Die Prozesse haben Zyklen und können nicht sortiert werden.") from e
+        sorted_processes = list(nx.topological_sort(self.G))
 
         logger.info(f"Reihenfolge der {len(sorted_processes)} Prozess-Schritte mit Abhängigkeiten.")
         for step in sorted_processes:
@@ -86,29 +243,9 @@ class ProcessPipelineBuilder:
             if predecessors:
                 dependencies = [str(pred) for pred in predecessors]
 
-            p_task_definitions = self.sparql_wrapper.get_out_references(step, MMUT.hasTaskDefinition)
-
-            if len(p_task_definitions) == 0:
-                errors.append(f"Prozess {step} hat keine Task-Definition.")
-                continue
-
-            assert len(p_task_definitions) == 1, f"Prozess {step} hat mehrere Task-Definitionen."
-            p_container_property = self.sparql_wrapper.get_single_out_reference(p_task_definitions[0], MMUT.hasContainerProperties)
-
-            image = self.sparql_wrapper.get_single_object_property(p_container_property, MMUT.image)
-            p_command_sequence = self.sparql_wrapper.get_single_out_reference(p_container_property, MMUT.hasCommandSequence)
-            command = []
-            for lit in self.sparql_wrapper.get_sequence(p_command_sequence):
-                command.append(resolve(str(lit)))
-            p_environment = self.sparql_wrapper.get_single_out_reference(p_container_property, MMUT.hasEnvironment)
-            env = {}
-            for p_key_value in self.sparql_wrapper.get_out_references(p_environment, MMUT.hasKeyValuePair):
-                key = self.sparql_wrapper.get_single_object_property(p_key_value, MMUT.key)
-                value = self.sparql_wrapper.get_single_object_property(p_key_value, MMUT.value)
-                env[key] = resolve(value)
-
+            p_task_definition = self._out_references(step, MMUT.hasTaskDefinition)[0]
+            process_name, image, command, env, resources = self._container_spec(p_task_definition)
             process_id = str(step)
-            process_name = self.sparql_wrapper.get_single_object_property(p_task_definitions[0], RDFS.label)
 
             processes.append(Process(
                 id=process_id,
@@ -116,13 +253,73 @@ class ProcessPipelineBuilder:
                 image=image,
                 command=command,
                 env=env,
-                dependencies=dependencies
+                dependencies=dependencies,
+                resources=resources
             ))
 
-        if errors:
-            logger.error("Folgende Fehler sind aufgetreten:")
-            for error in errors:
-                logger.error(f" - {error}")
-            raise ValueError("Prozess-Definitionen konnten nicht erstellt werden.")
-
         return processes
+
+    # Direkte Index-Zugriffe auf den Graphen statt einer SPARQL-Abfrage je
+    # Eigenschaft. Die Semantik entspricht den verwendeten SparQLWrapper-
+    # Methoden, damit die erzeugten Prozesse identisch bleiben.
+
+    def _container_spec(self, p_task_definition):
+        """Name, image, command, env and resources of a task definition."""
+        p_container_property = self._single_out_reference(p_task_definition, MMUT.hasContainerProperties)
+
+        image = self._single_object_property(p_container_property, MMUT.image)
+        p_command_sequence = self._single_out_reference(p_container_property, MMUT.hasCommandSequence)
+        command = [self.resolver.resolve(str(lit)) for lit in self._sequence(p_command_sequence)]
+
+        p_environment = self._single_out_reference(p_container_property, MMUT.hasEnvironment)
+        env = {}
+        for p_key_value in self._out_references(p_environment, MMUT.hasKeyValuePair):
+            key = self._single_object_property(p_key_value, MMUT.key)
+            value = self._single_object_property(p_key_value, MMUT.value)
+            env[key] = self.resolver.resolve(value)
+
+        resources = {}
+        for key, prop in RESOURCE_PROPERTIES.items():
+            value = self._optional_object_property(p_container_property, prop)
+            if value is not None:
+                resources[key] = _plain(value)
+
+        name = self._single_object_property(p_task_definition, RDFS.label)
+        return name, image, command, env, resources
+
+    def _out_references(self, subject, prop):
+        # wie get_out_references: nur typisierte Objekte, ein Treffer je rdf:type
+        return [o for o in self.graph.objects(subject, prop) for _ in self.graph.objects(o, RDF.type)]
+
+    def _in_references(self, obj, prop):
+        # wie get_in_references: nur typisierte Subjekte, ein Treffer je rdf:type
+        return [s for s in self.graph.subjects(prop, obj) for _ in self.graph.objects(s, RDF.type)]
+
+    def _single_out_reference(self, subject, prop):
+        r = self._out_references(subject, prop)
+        if len(r) != 1:
+            raise ValueError(f"Not a single result {str(r)} for {subject}")
+        return r[0]
+
+    def _single_object_property(self, subject, prop):
+        n = list(self.graph.objects(subject, prop))
+        if len(n) != 1:
+            raise ValueError(f"Not a single result {str(n)} for {subject} prop: {prop}")
+        if isinstance(n[0], Literal):
+            return n[0].value
+        return n[0]
+
+    def _optional_object_property(self, subject, prop):
+        n = list(self.graph.objects(subject, prop))
+        if len(n) > 1:
+            raise ValueError(f"More than one result {str(n)} for {subject} prop: {prop}")
+        if not n:
+            return None
+        return n[0].value if isinstance(n[0], Literal) else n[0]
+
+    def _sequence(self, seq):
+        items = []
+        for position, item in self.graph.predicate_objects(seq):
+            if str(position).startswith(_SEQUENCE_PREFIX):
+                items.append((int(_SEQUENCE_POSITION.search(position).group(1)), item))
+        return [item for _, item in sorted(items, key=lambda x: x[0])]
@@ -1,16 +1,25 @@
 import os
 import logging
+import threading
 from rdflib import Graph
 import importlib.resources
-from .process_pipeline_builder import ProcessPipelineBuilder
+from typing import List, Optional
+from .process_pipeline_builder import ProcessPipelineBuilder, Process
+from .pipeline_cache import PipelineCache, mmut_fingerprint
+from .resolver import Resolver, get_resolver
+from .metrics import get_metrics
 
 
 logger = logging.getLogger(__name__)
 
+_base_graph = None
+_base_graph_lock = threading.Lock()
 
-def get_processes(mmut_path: str) -> ProcessPipelineBuilder:
+_pipeline_cache = None
 
-    # RDF-Graph erzeugen
+
+def parse_base_ontology() -> Graph:
+    """Parse the packaged py_mmut_rdf ontology (mmut.ttl) into a new graph."""
     g = Graph()
 
     # Datei im Turtle-Format einlesen
@@ -19,6 +28,78 @@ def get_processes(mmut_path: str) -> ProcessPipelineBuilder:
         logger.info("Parsing Turtle data...")
         g.parse(data=ttl_data, format="turtle")
 
+    return g
+
+
+def get_base_graph() -> Graph:
+    """Return the base ontology graph, parsed once per process.
+
+    The returned graph is shared and must not be modified; use
+    new_mmut_graph() to get a graph for a single MMUT.
+    """
+    global _base_graph
+    if _base_graph is None:
+        with _base_graph_lock:
+            if _base_graph is None:
+                _base_graph = parse_base_ontology()
+    return _base_graph
+
+
+def clear_base_graph():
+    """Drop the cached base ontology (e.g. for tests or benchmarks)."""
+    global _base_graph
+    with _base_graph_lock:
+        _base_graph = None
+
+
+def new_mmut_graph() -> Graph:
+    """Create a graph pre-filled with the base ontology triples.
+
+    Copying the already parsed triples into a fresh in-memory store is
+    much cheaper than parsing the Turtle text again, and keeps the
+    shared base graph untouched by the MMUT triples.
+    """
+    g = Graph()
+    base = get_base_graph()
+    for prefix, namespace in base.namespaces():
+        g.bind(prefix, namespace, override=False)
+    g.addN((s, p, o, g) for s, p, o in base)
+    return g
+
+
+def get_pipeline_cache() -> PipelineCache:
+    """Process-wide cache of compiled pipelines."""
+    global _pipeline_cache
+    if _pipeline_cache is None:
+        _pipeline_cache = PipelineCache()
+    return _pipeline_cache
+
+
+def get_processes(mmut_path: str, use_cache: bool = True) -> List[Process]:
+    """Compiled pipeline for an MMUT directory, served from cache if unchanged."""
+    if not use_cache:
+        return compile_processes(mmut_path)
+
+    cache = get_pipeline_cache()
+    key = mmut_fingerprint(mmut_path)
+    processes = cache.get(key)
+    if processes is not None:
+        logger.info(f"Using cached pipeline for {mmut_path}")
+        get_metrics().count("pipeline_cache_hit")
+        return processes
+    get_metrics().count("pipeline_cache_miss")
+
+    resolver = get_resolver()
+    processes = compile_processes(mmut_path, resolver)
+    cache.put(key, processes, resolver.used)
+    return processes
+
+
+def parse_mmut(mmut_path: str) -> Graph:
+    """Graph of the base ontology and every .ttl file of an MMUT directory."""
+    # RDF-Graph erzeugen (Basis-Ontologie ist bereits geparst)
+    g = new_mmut_graph()
+
     for file in os.listdir(mmut_path):
 
         if file.endswith('.ttl'):
@@ -26,4 +107,18 @@ def get_processes(mmut_path: str) -> ProcessPipelineBuilder:
             ttl_file = os.path.join(mmut_path, file)
             g.parse(ttl_file, format="turtle")
 
-    return ProcessPipelineBuilder(g).get_processes()
+    return g
+
+
+def compile_processes(mmut_path: str, resolver: Optional[Resolver] = None) -> List[Process]:
+
+    metrics = get_metrics()
+    mmut_id = os.path.basename(os.path.normpath(mmut_path))
+
+    with metrics.span("parse", mmut=mmut_id):
+        g = parse_mmut(mmut_path)
+
+    with metrics.span("build", mmut=mmut_id):
+        builder = ProcessPipelineBuilder(g, resolver)
+    with metrics.span("extract", mmut=mmut_id):
+        return builder.get_processes()
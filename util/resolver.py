@@ -0,0 +1,149 @@
+import os
+import re
+import threading
+import yaml
+from typing import Callable, Dict
+from .helper import file_version, get_config
+
+SECRETS_PATH = "config/secrets.yaml"
+
+PLACEHOLDER = re.compile(r"{{resolve:(.*?)}}")
+
+_resolvers: Dict[str, Callable[["Resolver", str], str]] = {}
+
+
+def register_resolver(namespace: str):
+    """Register a function resolving {{resolve:<namespace>:<argument>}}.
+
+    The function is called with the Resolver and the argument string and
+    returns the replacement text. It should only use data the Resolver
+    has already loaded (or cache what it loads on the Resolver), so that
+    resolving stays free of per-placeholder I/O.
+    """
+    def decorator(fn):
+        _resolvers[namespace] = fn
+        return fn
+    return decorator
+
+
+class SecretsStore:
+    """config/secrets.yaml, parsed once and reloaded when the file changes."""
+
+    def __init__(self, path: str = SECRETS_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._version = None
+        self._secrets = {}
+
+    def load(self) -> dict:
+        with self._lock:
+            version = file_version(self.path)
+            if version != self._version:
+                secrets = {}
+                if version is not None:
+                    with open(self.path, "r") as f:
+                        secrets = yaml.safe_load(f) or {}
+                self._secrets = secrets
+                self._version = version
+            return self._secrets
+
+
+_secrets_store = SecretsStore()
+
+
+class Resolver:
+    """Resolves placeholders against one snapshot of the secrets.
+
+    Create one per pipeline build (see get_resolver()). Values read from
+    the environment or from files are remembered in `used`, so a cached
+    pipeline can check whether they are still current.
+    """
+
+    def __init__(self, secrets: dict):
+        self.secrets = secrets
+        self.used = {}
+        self._files = {}
+
+    def resolve(self, value: str) -> str:
+        """Replace all {{resolve:...}} placeholders in value."""
+        return PLACEHOLDER.sub(self._replace, value)
+
+    def _replace(self, match) -> str:
+        namespace, _, argument = match.group(1).partition(":")
+        resolver = _resolvers.get(namespace)
+        if resolver is None:
+            raise ValueError(f"Unknown resolve instruction: {match.group(1)}")
+        return resolver(self, argument)
+
+    def read_file(self, path: str) -> str:
+        if path not in self._files:
+            with open(path, "r") as f:
+                self._files[path] = f.read().strip()
+            self.used[f"file:{path}"] = list(file_version(path))
+        return self._files[path]
+
+
+def get_secrets_store() -> SecretsStore:
+    return _secrets_store
+
+
+def get_resolver() -> Resolver:
+    """New Resolver on the current secrets (one stat of the secrets file)."""
+    return Resolver(_secrets_store.load())
+
+
+def dependencies_current(used: dict) -> bool:
+    """Whether environment values and files recorded in Resolver.used are unchanged."""
+    for name, recorded in used.items():
+        namespace, _, argument = name.partition(":")
+        if namespace == "env" and os.environ.get(argument) != recorded:
+            return False
+        if namespace == "file":
+            version = file_version(argument)
+            if version is None or list(version) != recorded:
+                return False
+    return True
+
+
+@register_resolver("secrets")
+def _resolve_secret(resolver: Resolver, argument: str) -> str:
+    parts = argument.split(":")
+    if len(parts) != 2:
+        raise ValueError(f"Unknown resolve instruction: secrets:{argument}")
+    value = resolver.secrets.get(parts[0], {}).get(parts[1], None)
+    if value is None:
+        raise ValueError(f"Secret {argument} not found")
+    return str(value)
+
+
+@register_resolver("system")
+def _resolve_system(resolver: Resolver, argument: str) -> str:
+    if argument == "modelpath":
+        return "/share/models/"
+    raise ValueError(f"Unknown resolve instruction: system:{argument}")
+
+
+@register_resolver("env")
+def _resolve_env(resolver: Resolver, argument: str) -> str:
+    # nur freigegebene Variablen, sonst könnte jedes Modell z.B. Zugangsdaten der API auslesen
+    prefixes = get_config("placeholders").get("env_prefixes") or []
+    if not any(argument.startswith(prefix) for prefix in prefixes):
+        raise ValueError(f"Environment variable {argument} is not allowed (env_prefixes in config/placeholders.yaml)")
+    value = os.environ.get(argument)
+    if value is None:
+        raise ValueError(f"Environment variable {argument} not set")
+    resolver.used[f"env:{argument}"] = value
+    return value
+
+
+@register_resolver("file")
+def _resolve_file(resolver: Resolver, argument: str) -> str:
+    # nur Dateien unterhalb von file_root, relative Pfade beziehen sich darauf
+    file_root = get_config("placeholders").get("file_root")
+    if not file_root:
+        raise ValueError(f"File {argument} is not allowed (no file_root in config/placeholders.yaml)")
+    root = os.path.realpath(file_root)
+    path = os.path.realpath(os.path.join(root, argument))
+    if os.path.commonpath([root, path]) != root:
+        raise ValueError(f"File {argument} is outside of {file_root}")
+    return resolver.read_file(path)
@@ -0,0 +1,259 @@
+import os
+import asyncio
+import threading
+import uuid
+import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from datetime import datetime
+from typing import TYPE_CHECKING, List, Optional
+from .helper import get_config
+from .metrics import get_metrics
+from . import trigger_process
+
+if TYPE_CHECKING:
+    from .process_pipeline_builder import Process
+
+logger = logging.getLogger(__name__)
+
+
+class RunQueueFull(Exception):
+    """Raised when no further runs can be admitted."""
+
+
+def _now():
+    return datetime.utcnow().isoformat() + "Z"
+
+
+class RunRecord:
+    def __init__(self, mmut_id: str, targets: Optional[List[str]] = None):
+        self.run_id = str(uuid.uuid4())
+        self.mmut_id = mmut_id
+        self.targets = targets
+        self.flow_name = None
+        self.status = "compiling"
+        self.steps = None
+        self.error = None
+        self.created_at = _now()
+        self.started_at = None
+        self.finished_at = None
+
+    def to_dict(self) -> dict:
+        return {
+            "run_id": self.run_id,
+            "mmut_id": self.mmut_id,
+            "targets": self.targets,
+            "flow_name": self.flow_name,
+            "status": self.status,
+            "steps": self.steps,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class RunManager:
+    """Admit, compile and execute MMUT runs with bounded resources.
+
+    Pipelines are compiled in a small worker pool so the event loop is
+    never blocked by RDF parsing. At most max_running flows execute at
+    the same time and at most max_queued further runs wait (including
+    runs that are still compiling); beyond that submit() raises
+    RunQueueFull. Finished runs stay queryable until max_history newer
+    runs have been recorded.
+
+    submit_batch() admits up to max_batch MMUTs at once if they fit into
+    the same bound, returns the pending run for MMUTs that are already
+    waiting, and compiles larger batches in worker processes that are
+    started once and kept for the life of the manager.
+    """
+
+    def __init__(self, max_running: int = 4, max_queued: int = 32,
+                 compile_workers: int = 2, max_history: int = 1000,
+                 max_batch: int = 500, batch_compile_processes: Optional[int] = None,
+                 batch_process_threshold: int = 8):
+        self.max_running = max_running
+        self.max_queued = max_queued
+        self.max_history = max_history
+        self.max_batch = max_batch
+        self.batch_compile_processes = batch_compile_processes or os.cpu_count() or 1
+        self.batch_process_threshold = batch_process_threshold
+        self._compile_pool = ThreadPoolExecutor(max_workers=compile_workers, thread_name_prefix="mmut-compile")
+        self._run_pool = ThreadPoolExecutor(max_workers=max_running, thread_name_prefix="mmut-run")
+        self._batch_pool = None  # Worker-Prozesse, beim ersten großen Batch gestartet
+        self._runs = OrderedDict()
+        self._active = 0
+        self._pending = {}  # mmut_id -> Run, der kompiliert wird oder wartet
+        self._lock = threading.Lock()
+
+    def _check_capacity(self, count: int):
+        # nur mit gehaltenem self._lock aufrufen
+        if self._active + count > self.max_running + self.max_queued:
+            raise RunQueueFull(f"Run queue is full ({self._active} runs admitted, {count} requested)")
+
+    def _record(self, mmut_id: str, targets: Optional[List[str]] = None) -> RunRecord:
+        # nur mit gehaltenem self._lock aufrufen
+        self._active += 1
+        record = RunRecord(mmut_id, targets)
+        self._runs[record.run_id] = record
+        if not targets:
+            # nur vollständige Läufe werden in submit_batch wiederverwendet
+            self._pending[mmut_id] = record
+        while len(self._runs) > self.max_history:
+            self._runs.popitem(last=False)
+        return record
+
+    def _admit(self, mmut_id: str, targets: Optional[List[str]] = None) -> RunRecord:
+        with self._lock:
+            self._check_capacity(1)
+            return self._record(mmut_id, targets)
+
+    def _finish(self, record: RunRecord, status: str, error: Optional[str] = None):
+        with self._lock:
+            record.status = status
+            record.error = error
+            record.finished_at = _now()
+            self._active -= 1
+            self._unpend(record)
+        get_metrics().count(f"run_{status}")
+
+    async def submit(self, mmut_id: str, targets: Optional[List[str]] = None,
+                     reuse_outputs: bool = False) -> RunRecord:
+        """Admit a run, compile it off the event loop and queue it for execution.
+
+        With targets only those processes and their ancestors run (see
+        prepare_run). Raises RunQueueFull when admission fails and
+        ValueError when the MMUT cannot be compiled.
+        """
+        record = self._admit(mmut_id, targets=targets)
+        loop = asyncio.get_running_loop()
+        try:
+            processes, flow_name = await loop.run_in_executor(
+                self._compile_pool, partial(trigger_process.prepare_run, mmut_id,
+                                            targets=targets, reuse_outputs=reuse_outputs))
+        except Exception as e:
+            self._finish(record, "failed", str(e))
+            raise
+        self.enqueue(record, processes, flow_name)
+        return record
+
+    def submit_batch(self, mmut_ids: List[str]) -> List[dict]:
+        """Admit, compile and queue runs for many MMUTs, returns one handle per distinct ID.
+
+        Blocks while compiling (call it from a worker thread). Raises
+        RunQueueFull when the batch has more than max_batch distinct IDs
+        or its new runs do not fit into max_running + max_queued; the
+        batch is then rejected as a whole.
+        """
+        unique = list(dict.fromkeys(mmut_ids))
+        if len(unique) > self.max_batch:
+            raise RunQueueFull(f"Batch of {len(unique)} MMUTs exceeds the limit of {self.max_batch}")
+
+        handles = {}
+        with self._lock:
+            for mmut_id in unique:
+                if self._pending.get(mmut_id) is not None:
+                    handles[mmut_id] = (self._pending[mmut_id], True)
+            self._check_capacity(len(unique) - len(handles))
+            admitted = []
+            for mmut_id in unique:
+                if mmut_id not in handles:
+                    record = self._record(mmut_id)
+                    handles[mmut_id] = (record, False)
+                    admitted.append(record)
+
+        try:
+            results = self._compile_many([record.mmut_id for record in admitted])
+        except Exception as e:
+            for record in admitted:
+                self._finish(record, "failed", str(e))
+            raise
+        for record, (processes, flow_name, error) in zip(admitted, results):
+            if error is not None:
+                self._finish(record, "failed", error)
+            else:
+                self.enqueue(record, processes, flow_name)
+
+        return [{**record.to_dict(), "deduplicated": deduplicated}
+                for record, deduplicated in (handles[mmut_id] for mmut_id in unique)]
+
+    def _compile_many(self, mmut_ids: List[str]) -> list:
+        from . import batch_compile
+        if len(mmut_ids) >= self.batch_process_threshold and self.batch_compile_processes > 1:
+            with self._lock:
+                if self._batch_pool is None:
+                    self._batch_pool = batch_compile.create_pool(self.batch_compile_processes)
+                pool = self._batch_pool
+            chunksize = max(1, len(mmut_ids) // (self.batch_compile_processes * 4))
+            try:
+                return batch_compile.compile_batch(pool, mmut_ids, chunksize=chunksize)
+            except BrokenProcessPool:
+                # Worker abgestürzt: beim nächsten Batch neu starten
+                with self._lock:
+                    if self._batch_pool is pool:
+                        self._batch_pool = None
+                raise
+        return list(self._compile_pool.map(batch_compile.compile_one, mmut_ids))
+
+    def _unpend(self, record: RunRecord):
+        if self._pending.get(record.mmut_id) is record:
+            del self._pending[record.mmut_id]
+
+    def enqueue(self, record: RunRecord, processes: List["Process"], flow_name: str):
+        record.flow_name = flow_name
+        record.steps = len(processes)
+        record.status = "queued"
+        self._run_pool.submit(self._execute, record, processes)
+
+    def _execute(self, record: RunRecord, processes: List["Process"]):
+        with self._lock:
+            record.status = "running"
+            record.started_at = _now()
+            self._unpend(record)
+        try:
+            with get_metrics().span("run", mmut=record.mmut_id):
+                success = trigger_process.run_docker_flow_sync(processes, record.flow_name, mmut_id=record.mmut_id)
+        except Exception as e:
+            self._finish(record, "failed", str(e))
+            return
+        if success:
+            self._finish(record, "completed")
+        else:
+            self._finish(record, "failed", "Docker flow failed, see the Prefect UI for details")
+
+    def get(self, run_id: str) -> Optional[RunRecord]:
+        with self._lock:
+            return self._runs.get(run_id)
+
+    def list(self) -> List[RunRecord]:
+        with self._lock:
+            return list(self._runs.values())
+
+    def shutdown(self, wait: bool = True):
+        self._compile_pool.shutdown(wait=wait)
+        self._run_pool.shutdown(wait=wait)
+        if self._batch_pool is not None:
+            self._batch_pool.shutdown(wait=wait)
+
+
+_run_manager = None
+_run_manager_lock = threading.Lock()
+
+
+def get_run_manager() -> RunManager:
+    """Process-wide run manager, limits from config/runs.yaml."""
+    global _run_manager
+    with _run_manager_lock:
+        if _run_manager is None:
+            config = get_config("runs")
+            _run_manager = RunManager(
+                max_running=config.get("max_running", 4),
+                max_queued=config.get("max_queued", 32),
+                compile_workers=config.get("compile_workers", 2),
+                max_batch=config.get("max_batch", 500),
+                batch_compile_processes=config.get("batch_compile_processes"),
+            )
+        return _run_manager
@@ -0,0 +1,202 @@
+import heapq
+from typing import Callable, Dict, List, Optional, Union
+import networkx as nx
+from docker.utils import parse_bytes
+from .process_pipeline_builder import Process
+
+
+def critical_path_lengths(G: nx.DiGraph, duration: Callable[[str], float]) -> Dict[str, float]:
+    """Length of the longest chain from each node to any sink, including the node itself."""
+    lengths = {}
+    for node in reversed(list(nx.topological_sort(G))):
+        tail = max((lengths[succ] for succ in G.successors(node)), default=0.0)
+        lengths[node] = duration(node) + tail
+    return lengths
+
+
+def resource_request(process: Process) -> Dict[str, float]:
+    """CPUs and memory (bytes) a process needs on its host, 0 if undeclared."""
+    resources = process.resources
+    cpus = resources.get("cpu_request", resources.get("cpus"))
+    memory = resources.get("mem_request", resources.get("mem_limit"))
+    return {
+        "cpus": float(cpus) if cpus is not None else 0.0,
+        "memory": parse_bytes(memory) if memory is not None else 0,
+    }
+
+
+def parse_capacity(capacity: Optional[dict]) -> Optional[Dict[str, float]]:
+    """Host capacity from config ({cpus: 8, memory: 16g}), None for unlimited."""
+    if not capacity:
+        return None
+    parsed = {}
+    if capacity.get("cpus") is not None:
+        parsed["cpus"] = float(capacity["cpus"])
+    if capacity.get("memory") is not None:
+        parsed["memory"] = parse_bytes(capacity["memory"])
+    return parsed
+
+
+def check_limits(max_concurrency: Optional[int], max_per_image: Union[int, Dict[str, int], None]):
+    """Raise ValueError for a limit below 1, no step would ever start under it."""
+    if max_concurrency is not None and max_concurrency < 1:
+        raise ValueError(f"max_concurrency must be at least 1, got {max_concurrency}")
+    limits = max_per_image.items() if isinstance(max_per_image, dict) else [("every image", max_per_image)]
+    for image, limit in limits:
+        if limit is not None and limit < 1:
+            raise ValueError(f"max_per_image for {image} must be at least 1, got {limit}")
+
+
+class ReadyQueueScheduler:
+    """Ready queue over the process DAG with bounded concurrency.
+
+    Processes become ready once all their dependencies have completed.
+    Ready processes are handed out by dispatchable() as long as the
+    global limit (max_concurrency) and the per-image limit (max_per_image,
+    a single int for every image or a dict image -> limit) allow it.
+    With priority "critical_path" the process heading the longest
+    remaining chain is started first, "fifo" keeps the topological order.
+
+    With a host capacity ({"cpus": ..., "memory": bytes}) a process only
+    starts while the declared requests of the running processes plus its
+    own fit. A process requesting more than the whole capacity runs alone.
+
+    With reserve, a process that passes all other checks only starts if
+    reserve(process) returns True (e.g. a host with room was reserved for
+    it, see HostPool.place); reserve must not hold anything back when it
+    returns False.
+    """
+
+    def __init__(self,
+                 processes: List[Process],
+                 max_concurrency: Optional[int] = None,
+                 max_per_image: Union[int, Dict[str, int], None] = None,
+                 priority: str = "critical_path",
+                 durations: Optional[Dict[str, float]] = None,
+                 capacity: Optional[Dict[str, float]] = None,
+                 reserve: Optional[Callable[[Process], bool]] = None):
+
+        if priority not in ("critical_path", "fifo"):
+            raise ValueError(f"Unknown scheduler priority: {priority}")
+
+        self.processes = {process.id: process for process in processes}
+        self.max_concurrency = max_concurrency
+        self.max_per_image = max_per_image
+        self.capacity = capacity
+        self.reserve = reserve
+
+        self.G = nx.DiGraph()
+        for process in processes:
+            self.G.add_node(process.id)
+            for dep in (process.dependencies or []):
+                if dep not in self.processes:
+                    raise ValueError(f"Dependency {dep} not found in {self.processes.keys()}.")
+                self.G.add_edge(dep, process.id)
+
+        self._order = {process.id: index for index, process in enumerate(processes)}
+        if priority == "critical_path":
+            durations = durations or {}
+            lengths = critical_path_lengths(self.G, lambda node: durations.get(node, 1.0))
+            self._priority = {node: -length for node, length in lengths.items()}
+        else:
+            self._priority = {node: 0 for node in self.G.nodes}
+
+        self._waiting_for = {node: self.G.in_degree(node) for node in self.G.nodes}
+        self._ready = []
+        for node, count in self._waiting_for.items():
+            if count == 0:
+                self._push(node)
+
+        self.running = set()
+        self.completed = set()
+        self.failed = set()
+        self.skipped = set()
+        self._running_per_image = {}
+        self._requests = {node: resource_request(process) for node, process in self.processes.items()}
+        self.used = {"cpus": 0.0, "memory": 0}
+
+    def _push(self, node):
+        heapq.heappush(self._ready, (self._priority[node], self._order[node], node))
+
+    def _image_limit(self, image) -> Optional[int]:
+        if isinstance(self.max_per_image, dict):
+            return self.max_per_image.get(image)
+        return self.max_per_image
+
+    def _can_start(self, process: Process) -> bool:
+        if self.max_concurrency is not None and len(self.running) >= self.max_concurrency:
+            return False
+        limit = self._image_limit(process.image)
+        if limit is not None and self._running_per_image.get(process.image, 0) >= limit:
+            return False
+        if self.capacity and self.running:
+            request = self._requests[process.id]
+            for resource, available in self.capacity.items():
+                if self.used[resource] + request[resource] > available:
+                    return False
+        # zuletzt: reserviert bei Erfolg (z.B. einen Host)
+        if self.reserve is not None and not self.reserve(process):
+            return False
+        return True
+
+    def dispatchable(self) -> List[Process]:
+        """Take all processes that may start now and mark them as running."""
+        started = []
+        deferred = []
+        while self._ready:
+            if self.max_concurrency is not None and len(self.running) >= self.max_concurrency:
+                break
+            entry = heapq.heappop(self._ready)
+            process = self.processes[entry[2]]
+            if not self._can_start(process):
+                # durch Image-Limit oder Kapazität blockiert, später erneut versuchen
+                deferred.append(entry)
+                continue
+            self.running.add(process.id)
+            self._running_per_image[process.image] = self._running_per_image.get(process.image, 0) + 1
+            for resource, amount in self._requests[process.id].items():
+                self.used[resource] += amount
+            started.append(process)
+
+        for entry in deferred:
+            heapq.heappush(self._ready, entry)
+        return started
+
+    def complete(self, process_id: str, success: bool = True):
+        """Mark a running process as finished and release its successors."""
+        self.running.remove(process_id)
+        image = self.processes[process_id].image
+        self._running_per_image[image] -= 1
+        for resource, amount in self._requests[process_id].items():
+            self.used[resource] -= amount
+
+        if not success:
+            self.failed.add(process_id)
+            self.skipped.update(nx.descendants(self.G, process_id) - self.failed)
+            return
+
+        self.completed.add(process_id)
+        for succ in self.G.successors(process_id):
+            self._waiting_for[succ] -= 1
+            if self._waiting_for[succ] == 0 and succ not in self.skipped:
+                self._push(succ)
+
+    def finished(self) -> bool:
+        return not self.running and not self._ready
+
+
+def simulate_schedule(processes: List[Process], durations: Dict[str, float], **scheduler_options) -> float:
+    """Run the scheduler against simulated step durations and return the makespan."""
+    scheduler = ReadyQueueScheduler(processes, **scheduler_options)
+    now = 0.0
+    events = []
+    sequence = 0
+    while not scheduler.finished():
+        for process in scheduler.dispatchable():
+            heapq.heappush(events, (now + durations.get(process.id, 1.0), sequence, process.id))
+            sequence += 1
+        if not events:
+            break
+        now, _, process_id = heapq.heappop(events)
+        scheduler.complete(process_id)
+    return now
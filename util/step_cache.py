@@ -0,0 +1,295 @@
+import os
+import json
+import shutil
+import hashlib
+import logging
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from .checksums import sha256_file
+from .helper import get_config
+
+logger = logging.getLogger(__name__)
+
+
+def get_step_cache_dir():
+    util_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.path.abspath(os.path.join(util_dir, '../cache/steps'))
+
+
+def snapshot(directory: str) -> Dict[str, Tuple[int, int]]:
+    """Size and mtime of every file below directory, keyed by relative path."""
+    files = {}
+    for root, _, names in os.walk(directory):
+        for name in names:
+            path = os.path.join(root, name)
+            stat = os.stat(path)
+            files[os.path.relpath(path, directory).replace(os.sep, '/')] = (stat.st_size, stat.st_mtime_ns)
+    return files
+
+
+class _Writer:
+    """A step writing to a models folder; overlapped once another one writes there too."""
+
+    def __init__(self):
+        self.overlapped = False
+
+
+class _ConcurrentWrites:
+    """Steps currently writing to each models folder (containers and restores)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._writers = {}  # models_dir -> set of _Writer
+
+    def open(self, models_dir: str, writer: _Writer):
+        with self._lock:
+            writers = self._writers.setdefault(os.path.abspath(models_dir), set())
+            if writers:
+                writer.overlapped = True
+                for other in writers:
+                    other.overlapped = True
+            writers.add(writer)
+
+    def close(self, models_dir: str, writer: _Writer):
+        with self._lock:
+            writers = self._writers.get(os.path.abspath(models_dir))
+            if writers is not None:
+                writers.discard(writer)
+                if not writers:
+                    del self._writers[os.path.abspath(models_dir)]
+
+
+_concurrent_writes = _ConcurrentWrites()
+
+
+class OutputWindow(_Writer):
+    """The files of a models folder before a step runs, to find what it wrote.
+
+    The changes are only attributed to the step if no other step wrote to
+    the same folder while the window was open.
+    """
+
+    def __init__(self, models_dir: str):
+        super().__init__()
+        self.models_dir = models_dir
+        self._open = True
+        _concurrent_writes.open(models_dir, self)
+        self.before = snapshot(models_dir)
+
+    def changed(self) -> Optional[List[str]]:
+        """Files changed since the window was opened, None if other steps wrote meanwhile."""
+        after = snapshot(self.models_dir)
+        self.close()
+        if self.overlapped:
+            return None
+        return sorted(rel_path for rel_path, version in after.items() if self.before.get(rel_path) != version)
+
+    def close(self):
+        if self._open:
+            self._open = False
+            _concurrent_writes.close(self.models_dir, self)
+
+
+def outputs_digest(outputs: List[Tuple[str, str]]) -> str:
+    """Aggregate checksum in the format of scripts/shared_checksums.py."""
+    aggregate = hashlib.sha256()
+    for rel_path, file_hash in sorted(outputs):
+        aggregate.update(f"{rel_path}\t{file_hash}\n".encode("utf-8"))
+    return aggregate.hexdigest()
+
+
+class StepCache:
+    """Memoize docker steps by image, command, env and upstream outputs.
+
+    A step's key covers the image digest, the resolved command and env
+    and the output digests of its upstream steps in this run. The files
+    a step wrote to the shared models folder are stored under the key; on
+    a hit they are copied back instead of starting a container, and the
+    stored output digest is handed on to the downstream steps. Steps
+    without upstream steps read their input from outside the shared
+    folder and are only memoized with cache_sources enabled.
+
+    Outputs are found by comparing the models folder before and after
+    the step (see OutputWindow). A step that overlapped with another step
+    writing to the same folder is neither stored nor given an output
+    digest, so its downstream steps run as well.
+
+    At most max_entries entries and max_bytes of stored outputs are kept;
+    after each store the least recently stored or restored entries are
+    removed.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, cache_sources: bool = False,
+                 max_entries: int = 256, max_bytes: Optional[int] = None):
+        self.cache_dir = cache_dir or get_step_cache_dir()
+        self.cache_sources = cache_sources
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+    def key(self, image_digest: Optional[str], params: dict) -> Optional[str]:
+        """Cache key of a step, None if the step cannot be memoized."""
+        upstream = params.get('upstream') or {}
+        if image_digest is None:
+            return None
+        if not upstream and not self.cache_sources:
+            return None
+        if any(digest is None for digest in upstream.values()):
+            return None
+        key = {
+            "image": image_digest,
+            "command": params['command'],
+            "env": params['env'],
+            "upstream": sorted(upstream.items()),
+        }
+        return hashlib.sha256(json.dumps(key, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _entry_dir(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key)
+
+    @staticmethod
+    def output_ref(params: dict) -> str:
+        """Identity of a step regardless of its inputs (name, image, command, env)."""
+        ref = {key: params[key] for key in ("name", "image", "command", "env")}
+        return hashlib.sha256(json.dumps(ref, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def mark_latest(self, ref: str, key: str):
+        """Remember key as the most recent stored outputs of the step ref."""
+        latest_dir = os.path.join(self.cache_dir, 'latest')
+        os.makedirs(latest_dir, exist_ok=True)
+        tmp_path = os.path.join(latest_dir, f".{ref}.{os.getpid()}.{threading.get_ident()}")
+        with open(tmp_path, 'w') as f:
+            f.write(key)
+        os.replace(tmp_path, os.path.join(latest_dir, ref))
+
+    def latest(self, ref: str) -> Optional[str]:
+        """Key of the most recent stored outputs of the step ref, None if there are none."""
+        try:
+            with open(os.path.join(self.cache_dir, 'latest', ref), 'r') as f:
+                key = f.read().strip()
+        except FileNotFoundError:
+            return None
+        return key if os.path.exists(self._entry_dir(key)) else None
+
+    def restore(self, key: str, models_dir: str) -> Optional[str]:
+        """Copy the stored outputs into models_dir, returns the output digest or None on a miss."""
+        entry_dir = self._entry_dir(key)
+        try:
+            with open(os.path.join(entry_dir, 'manifest.json'), 'r') as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            return None
+
+        # zählt als Schreibzugriff für gleichzeitig laufende Schritte
+        writer = _Writer()
+        _concurrent_writes.open(models_dir, writer)
+        try:
+            for rel_path, _ in manifest['outputs']:
+                target = os.path.join(models_dir, rel_path)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                shutil.copy2(os.path.join(entry_dir, 'files', rel_path), target)
+        except FileNotFoundError:
+            # währenddessen verdrängt: der Schritt läuft und schreibt seine Ausgaben neu
+            return None
+        finally:
+            _concurrent_writes.close(models_dir, writer)
+        self._touch(key)
+        return manifest['digest']
+
+    def _touch(self, key: str):
+        # mtime des Manifests = letzte Verwendung, für die Verdrängung
+        try:
+            os.utime(os.path.join(self._entry_dir(key), 'manifest.json'))
+        except FileNotFoundError:
+            pass
+
+    def store(self, key: Optional[str], window: OutputWindow) -> Optional[str]:
+        """Record the files the step wrote in the window's folder, returns their digest.
+
+        Returns None without storing anything if the outputs cannot be
+        attributed to the step (another step wrote at the same time).
+        """
+        changed = window.changed()
+        if changed is None:
+            logger.info(f"Other steps wrote to {window.models_dir} at the same time, outputs are not cached.")
+            return None
+        models_dir = window.models_dir
+        outputs = [(rel_path, sha256_file(Path(models_dir) / rel_path)) for rel_path in changed]
+        digest = outputs_digest(outputs)
+        if key is None:
+            return digest
+        if os.path.exists(self._entry_dir(key)):
+            self._touch(key)
+            return digest
+
+        size = sum(os.path.getsize(os.path.join(models_dir, rel_path)) for rel_path, _ in outputs)
+        if self.max_bytes is not None and size > self.max_bytes:
+            logger.info(f"Outputs of {key} ({size} bytes) exceed the step cache size, not stored.")
+            return digest
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(dir=self.cache_dir, prefix='.tmp-')
+        try:
+            for rel_path, _ in outputs:
+                target = os.path.join(tmp_dir, 'files', rel_path)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                shutil.copy2(os.path.join(models_dir, rel_path), target)
+            with open(os.path.join(tmp_dir, 'manifest.json'), 'w') as f:
+                json.dump({"digest": digest, "outputs": outputs, "size": size}, f)
+            os.rename(tmp_dir, self._entry_dir(key))
+        except OSError as e:
+            # z.B. parallel von einem anderen Lauf gespeichert
+            logger.warning(f"Could not store step outputs for {key}: {e}")
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return digest
+        self._prune()
+        return digest
+
+    def _prune(self):
+        """Remove the least recently used entries beyond max_entries and max_bytes."""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.startswith('.') or name == 'latest':
+                continue
+            manifest_path = os.path.join(self._entry_dir(name), 'manifest.json')
+            try:
+                mtime = os.stat(manifest_path).st_mtime_ns
+                with open(manifest_path, 'r') as f:
+                    size = json.load(f).get('size', 0)
+            except (OSError, ValueError):
+                continue
+            entries.append((mtime, name, size))
+        entries.sort()
+        total = sum(size for _, _, size in entries)
+        while entries and (len(entries) > self.max_entries
+                           or (self.max_bytes is not None and total > self.max_bytes)):
+            _, name, size = entries.pop(0)
+            total -= size
+            # erst umbenennen, damit kein Lauf einen halb gelöschten Eintrag findet
+            trash = tempfile.mkdtemp(dir=self.cache_dir, prefix='.del-')
+            try:
+                os.rename(self._entry_dir(name), os.path.join(trash, name))
+            except OSError:
+                pass
+            shutil.rmtree(trash, ignore_errors=True)
+
+
+def get_step_cache() -> Optional[StepCache]:
+    """Step cache configured in config/step_cache.yaml, None if disabled."""
+    config = get_config("step_cache")
+    if not config.get("enabled", False):
+        return None
+    max_size = config.get("max_size")
+    if max_size is not None:
+        from docker.utils import parse_bytes
+        max_size = parse_bytes(max_size)
+    return StepCache(cache_dir=config.get("dir"), cache_sources=config.get("cache_sources", False),
+                     max_entries=config.get("max_entries", 256), max_bytes=max_size)
+
+
+def get_image_digest(client, image: str) -> Optional[str]:
+    try:
+        return client.images.get(image).id
+    except Exception:
+        return None
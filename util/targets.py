@@ -0,0 +1,56 @@
+from dataclasses import replace
+from typing import Callable, Iterable, List, Optional
+from .helper import to_valid_container_name
+from .process_pipeline_builder import Process
+from .step_cache import get_step_cache
+
+
+def select_targets(processes: List[Process], targets: Iterable[str],
+                   stop: Optional[Callable[[Process], bool]] = None) -> List[Process]:
+    """Only the target processes and the steps they depend on, in the original order.
+
+    Walks from the targets (process IRIs) along the dependencies. With a
+    stop predicate, an ancestor for which it returns True is not walked
+    past: it is kept as a source with reuse_outputs set, and its own
+    ancestors are only kept if another path needs them. Targets always run.
+    """
+    by_id = {process.id: process for process in processes}
+    targets = list(dict.fromkeys(targets))
+    unknown = [target for target in targets if target not in by_id]
+    if unknown:
+        raise ValueError(f"Unknown target(s): {', '.join(unknown)}")
+
+    keep = set()
+    stopped = set()
+    pending = list(targets)
+    while pending:
+        process_id = pending.pop()
+        if process_id in keep:
+            continue
+        keep.add(process_id)
+        process = by_id[process_id]
+        if process_id not in targets and stop is not None and stop(process):
+            stopped.add(process_id)
+            continue
+        pending.extend(process.dependencies or [])
+
+    selected = []
+    for process in processes:
+        if process.id in stopped:
+            selected.append(replace(process, dependencies=None, reuse_outputs=True))
+        elif process.id in keep:
+            selected.append(process)
+    return selected
+
+
+def outputs_exist() -> Optional[Callable[[Process], bool]]:
+    """Predicate: the step cache holds outputs of an earlier run of the step, None without a step cache."""
+    step_cache = get_step_cache()
+    if step_cache is None:
+        return None
+
+    def exists(process: Process) -> bool:
+        ref = step_cache.output_ref({"name": to_valid_container_name(process.name), "image": process.image,
+                                     "command": process.command, "env": process.env})
+        return step_cache.latest(ref) is not None
+    return exists
@@ -3,11 +3,11 @@ import os
 import asyncio
 import threading
 import logging
-from typing import List
+from typing import TYPE_CHECKING, List, Optional
 import json
 
-from .processes import get_processes
-from .process_pipeline_builder import Process
+if TYPE_CHECKING:
+    from .process_pipeline_builder import Process
 
 logger = logging.getLogger(__name__)
 
@@ -29,24 +29,25 @@ def get_mmut_dir():
     return os.path.abspath(os.path.join(util_dir, '../mmut'))
 
 
-def run_docker_flow_sync(processes: List[Process], flow_name: str):
-    """Run the docker_flow synchronously in a thread"""
+def run_docker_flow_sync(processes: List["Process"], flow_name: str, mmut_id: Optional[str] = None) -> bool:
+    """Run the docker_flow synchronously in a thread, returns whether it succeeded"""
     try:
-        # Import lazily to avoid initializing Prefect during module import
-        # (e.g. while running tests that mock this function).
-        from .docker_flow import run_docker_flow
+        # The executor imports Prefect (or the native backend) lazily, see config/executor.yaml
+        from .executors import get_executor
 
         logger.info("Starting docker_flow")
         # Execute the flow
-        run_docker_flow(processes, flow_name=flow_name)
+        get_executor().run(processes, flow_name, mmut_id=mmut_id)
         logger.info("Docker_flow completed")
+        return True
 
     except Exception as e:
         logger.error(f"Docker_flow failed, error: {str(e)}",)
+        return False
 
 
-def read_info_json(mmut_id: str) -> dict:
-    info_json = os.path.join(get_mmut_dir(), mmut_id, 'info.json')
+def read_info_json(mmut_id: str, mmut_dir: Optional[str] = None) -> dict:
+    info_json = os.path.join(mmut_dir or get_mmut_dir(), mmut_id, 'info.json')
     if os.path.exists(info_json):
         with open(info_json, 'r') as f:
             info = json.load(f)
@@ -56,26 +57,54 @@ def read_info_json(mmut_id: str) -> dict:
     return info
 
 
-def trigger_process(mmut_id : str):
+def prepare_run(mmut_id: str, mmut_dir: Optional[str] = None,
+                targets: Optional[List[str]] = None, reuse_outputs: bool = False):
+    """Validate the MMUT ID and compile its pipeline, returns (processes, flow_name).
+
+    With targets (process IRIs) only they and the steps they depend on
+    run; with reuse_outputs, ancestors whose outputs of an earlier run are
+    in the step cache are not run again (see util/targets.py).
+    """
 
     # Validate UUID format
     if not is_valid_uuid(mmut_id):
         raise ValueError(f"Invalid MMUT ID format for {mmut_id}")
 
     # Check if the MMUT directory exists
-    mmut_path = os.path.join(get_mmut_dir(), mmut_id)
+    mmut_path = os.path.join(mmut_dir or get_mmut_dir(), mmut_id)
     if not os.path.exists(mmut_path):
         raise ValueError(f"Path {mmut_path} not found")
 
     flow_name = f"mmut-{mmut_id}"
-    info = read_info_json(mmut_id)
+    info = read_info_json(mmut_id, mmut_dir)
     if 'name' in info:
         flow_name = info['name']
 
+    # Import lazily: rdflib and the MMUT ontology are only needed to compile
+    # (keeps the API and CLI startup light).
+    from .processes import get_processes
+
     processes: List[Process] = get_processes(mmut_path)
 
+    if targets:
+        from .targets import select_targets, outputs_exist
+        stop = None
+        if reuse_outputs:
+            stop = outputs_exist()
+            if stop is None:
+                raise ValueError("Reusing outputs needs the step cache (config/step_cache.yaml)")
+        processes = select_targets(processes, targets, stop)
+        logger.info(f"Running {len(processes)} steps for target(s) {', '.join(targets)}")
+
+    return processes, flow_name
+
+
+def trigger_process(mmut_id : str, targets: Optional[List[str]] = None, reuse_outputs: bool = False):
+
+    processes, flow_name = prepare_run(mmut_id, targets=targets, reuse_outputs=reuse_outputs)
+
     # Start the flow in a background thread
-    thread = threading.Thread(target=run_docker_flow_sync, args=(processes, flow_name))
+    thread = threading.Thread(target=run_docker_flow_sync, args=(processes, flow_name), kwargs={"mmut_id": mmut_id})
     thread.daemon = True
     thread.start()
 
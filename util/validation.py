@@ -0,0 +1,83 @@
+import os
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional
+from .metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+# Erhöhen, sobald der Validator andere Ergebnisse liefern kann
+VALIDATOR_VERSION = 2
+
+
+def content_hash(mmut_path: str) -> str:
+    """Hash of the names and contents of all .ttl files of an MMUT directory."""
+    digest = hashlib.sha256(f"validator-{VALIDATOR_VERSION}\n".encode("utf-8"))
+    for file in sorted(os.listdir(mmut_path)):
+        if file.endswith('.ttl'):
+            digest.update(f"{file}\n".encode("utf-8"))
+            with open(os.path.join(mmut_path, file), 'rb') as f:
+                digest.update(hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()
+
+
+def validate_mmut(mmut_path: str) -> dict:
+    """Parse an MMUT directory and report all violations (see ProcessPipelineBuilder.validate)."""
+    # Import lazily: rdflib and the MMUT ontology are only needed on a cache miss
+    from .processes import parse_mmut
+    from .process_pipeline_builder import ProcessPipelineBuilder
+    from .resolver import Resolver
+
+    mmut_id = os.path.basename(os.path.normpath(mmut_path))
+    with get_metrics().span("validate", mmut=mmut_id):
+        try:
+            g = parse_mmut(mmut_path)
+        except Exception as e:
+            violations = [{"kind": "parse_error", "message": f"Could not parse {mmut_id}: {e}"}]
+        else:
+            # Platzhalter werden nicht aufgelöst, daher keine Secrets nötig
+            violations = ProcessPipelineBuilder(g, resolver=Resolver({})).validate()
+    return {"valid": not violations, "violations": violations}
+
+
+class ValidationCache:
+    """Validation results by MMUT content hash (in memory, LRU)."""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def validate(self, mmut_path: str) -> dict:
+        """Result for the current content of mmut_path, computed at most once per content."""
+        key = content_hash(mmut_path)
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+        cached = result is not None
+        if not cached:
+            get_metrics().count("validation_cache_miss")
+            result = validate_mmut(mmut_path)
+            with self._lock:
+                self._entries[key] = result
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        else:
+            get_metrics().count("validation_cache_hit")
+        return {**result, "content_hash": key, "cached": cached}
+
+
+_validation_cache: Optional[ValidationCache] = None
+_validation_cache_lock = threading.Lock()
+
+
+def get_validation_cache() -> ValidationCache:
+    """Process-wide validation cache."""
+    global _validation_cache
+    with _validation_cache_lock:
+        if _validation_cache is None:
+            _validation_cache = ValidationCache()
+        return _validation_cache
@@ -0,0 +1,184 @@
+import json
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from .helper import get_config
+from .log_stream import LogFollower
+
+logger = logging.getLogger(__name__)
+
+KEEPALIVE = ["sleep", "infinity"]
+
+
+class Worker:
+    """A long-lived container that runs step commands through exec."""
+
+    def __init__(self, container, key: tuple, entrypoint: List[str]):
+        self.container = container
+        self.key = key
+        self.entrypoint = entrypoint
+        self.uses = 0
+        self.last_used = time.monotonic()
+
+
+def _entrypoint(client, image: str) -> List[str]:
+    """Entrypoint of the image, exec does not apply it by itself."""
+    try:
+        entrypoint = client.images.get(image).attrs.get("Config", {}).get("Entrypoint")
+    except Exception:
+        return []
+    if isinstance(entrypoint, str):
+        return [entrypoint]
+    return list(entrypoint or [])
+
+
+class WarmPool:
+    """Idle containers per flow run, daemon, image, mounts and limits.
+
+    run() takes an idle worker with the step's signature (or starts one
+    with a keep-alive entrypoint) and runs the step command in it via
+    exec, prefixed with the image's entrypoint. A worker is retired after
+    max_uses steps, after idle_timeout seconds without a step, when more
+    than max_idle workers of its signature are idle, when the exec fails,
+    or when its flow run finishes (retire_run). Retired containers are
+    removed on a background thread, so the removal is not part of any
+    step's run time.
+
+    Steps in a worker share its filesystem outside the mounted folders,
+    so only use this for steps that do not depend on a fresh container.
+    """
+
+    def __init__(self, max_uses: int = 50, idle_timeout: float = 60.0, max_idle: int = 4,
+                 keepalive: Optional[List[str]] = None, images: Optional[List[str]] = None):
+        self.max_uses = max_uses
+        self.idle_timeout = idle_timeout
+        self.max_idle = max_idle
+        self.keepalive = list(keepalive or KEEPALIVE)
+        self.images = set(images or [])
+        self._idle: Dict[tuple, List[Worker]] = {}
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._teardown = ThreadPoolExecutor(max_workers=2, thread_name_prefix="warm-teardown")
+        self._reaper = threading.Thread(target=self._reap_idle, name="warm-reaper", daemon=True)
+        self._reaper.start()
+
+    def accepts(self, image: str) -> bool:
+        return not self.images or image in self.images
+
+    @staticmethod
+    def signature(run: str, docker_host: Optional[str], image: str, options: dict) -> tuple:
+        """Workers are only shared by steps of one run with identical container options."""
+        # die Mounts zeigen auf die Ordner des Laufs, exec kann sie nicht ändern
+        return run, docker_host, image, json.dumps(options, sort_keys=True, default=str)
+
+    def _acquire(self, client, key: tuple, image: str, options: dict) -> Tuple[Worker, bool]:
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                return idle.pop(), True
+        container = client.containers.run(image=image, detach=True, entrypoint=self.keepalive,
+                                          command=[], **options)
+        return Worker(container, key, _entrypoint(client, image)), False
+
+    def _release(self, worker: Worker, healthy: bool):
+        worker.uses += 1
+        worker.last_used = time.monotonic()
+        with self._lock:
+            idle = self._idle.setdefault(worker.key, [])
+            if healthy and worker.uses < self.max_uses and len(idle) < self.max_idle \
+                    and not self._closed.is_set():
+                idle.append(worker)
+                return
+        self._retire(worker)
+
+    def _retire(self, worker: Worker):
+        self._teardown.submit(self._remove, worker.container)
+
+    @staticmethod
+    def _remove(container):
+        try:
+            container.remove(force=True)
+        except Exception as e:
+            logger.warning(f"Could not remove warm container {container.id}: {e}")
+
+    def run(self, client, run: str, docker_host: Optional[str], image: str, command: List[str], env: dict,
+            options: dict, step_logger, metrics, labels: dict, log_options: dict):
+        """Run a step command of flow run `run` in a warm worker, returns (exit_code, tail)."""
+        key = self.signature(run, docker_host, image, options)
+        with metrics.span("start", **labels):
+            worker, reused = self._acquire(client, key, image, options)
+        metrics.count("warm_reused" if reused else "warm_started")
+
+        follower = LogFollower(step_logger, **log_options)
+        healthy = False
+        try:
+            with metrics.span("exec", **labels):
+                # Low-Level-API: Ausgabe streamen und danach den Exit-Code abfragen
+                exec_id = client.api.exec_create(worker.container.id, worker.entrypoint + list(command),
+                                                 environment=env)["Id"]
+                for chunk in client.api.exec_start(exec_id, stream=True):
+                    follower.feed(chunk)
+                exit_code = client.api.exec_inspect(exec_id)["ExitCode"]
+            # ein fehlgeschlagener Schritt kann den Container verändert haben
+            healthy = exit_code == 0
+        finally:
+            tail = follower.close()
+            self._release(worker, healthy)
+        return exit_code, tail
+
+    def _reap_idle(self):
+        while not self._closed.wait(max(0.05, min(self.idle_timeout / 2, 5.0))):
+            self.reap()
+
+    def reap(self, now: Optional[float] = None):
+        """Retire workers idle for longer than idle_timeout."""
+        now = time.monotonic() if now is None else now
+        expired = []
+        with self._lock:
+            for key, idle in self._idle.items():
+                keep = [w for w in idle if now - w.last_used < self.idle_timeout]
+                expired.extend(w for w in idle if now - w.last_used >= self.idle_timeout)
+                self._idle[key] = keep
+        for worker in expired:
+            self._retire(worker)
+
+    def retire_run(self, run: str):
+        """Retire the workers of a finished flow run, they cannot serve another run."""
+        with self._lock:
+            keys = [key for key in self._idle if key[0] == run]
+            idle = [worker for key in keys for worker in self._idle.pop(key)]
+        # Nachzügler (Schritte, die nach dem Ende noch laufen) räumt reap() ab
+        for worker in idle:
+            self._retire(worker)
+
+    def close(self, wait: bool = True):
+        """Retire all idle workers and stop the background threads."""
+        self._closed.set()
+        with self._lock:
+            idle = [worker for workers in self._idle.values() for worker in workers]
+            self._idle.clear()
+        for worker in idle:
+            self._retire(worker)
+        self._teardown.shutdown(wait=wait)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_warm_pool() -> Optional[WarmPool]:
+    """Process-wide warm pool from config/warm_pool.yaml, None unless enabled."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            config = get_config("warm_pool")
+            if not config.get("enabled", False):
+                return None
+            _pool = WarmPool(max_uses=config.get("max_uses", 50),
+                             idle_timeout=config.get("idle_timeout", 60.0),
+                             max_idle=config.get("max_idle", 4),
+                             keepalive=config.get("keepalive"),
+                             images=config.get("images"))
+        return _pool
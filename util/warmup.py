@@ -0,0 +1,24 @@
+import logging
+import threading
+from .metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+
+def warm_up():
+    """Load the heavy dependencies and the base ontology, so the first trigger does not pay for it."""
+    try:
+        with get_metrics().span("warmup"):
+            from .processes import get_base_graph
+            get_base_graph()
+            from . import docker_flow  # noqa: F401  (Prefect)
+        logger.info("Warm-up finished")
+    except Exception as e:
+        logger.warning(f"Warm-up failed: {e}")
+
+
+def start_warm_up() -> threading.Thread:
+    """Run warm_up() in a background thread."""
+    thread = threading.Thread(target=warm_up, name="warm-up", daemon=True)
+    thread.start()
+    return thread